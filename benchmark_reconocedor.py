@@ -0,0 +1,1121 @@
+"""
+Benchmarks del reconocedor de gramática
+Uso:
+  python benchmark_reconocedor.py                                  # Suite por tamaños
+  python benchmark_reconocedor.py --tamanios 1K,1M,100M            # Tamaños de las cargas
+  python benchmark_reconocedor.py --salida actual.json             # Guardar resultados (JSON)
+  python benchmark_reconocedor.py --comparar anterior.json         # Comparar contra otra corrida
+  python benchmark_reconocedor.py --comparativas                   # Comparaciones entre implementaciones
+"""
+import argparse
+import asyncio
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+
+from reconocedor_gramatica_pseudocodigo_FTI_2025 import (
+    EJEMPLOS_PRUEBA, AutomataPila, AutomataReconocedor, CacheResultados, ClienteReconocedor,
+    DocumentoIncremental, Estadisticas, GeneradorProgramas, LimiteExcedido, Trazador,
+    _pool_trabajadores, _reconocer_en_trabajador, numpy, procesar_archivo, reconocer_bloques,
+    reconocer_lote, validar_archivos)
+
+CUERPO_PROGRAMA = ("leer <x>; escribir <y>; si <c> entonces <i> sino <j> finsi "
+                   "mientras <c> hacer si <d> entonces <i> finsi finmientras "
+                   "repetir <i> hastaque <c> ")
+
+
+def programa_espaciado(repeticiones):
+    """
+    Genera un programa válido con espacios repitiendo el cuerpo de ejemplo
+    """
+    return "comienza " + CUERPO_PROGRAMA * repeticiones + "termina"
+
+
+CUERPO_PASCAL = ("Leer<x>;Escribir<y>;Si<c>Entonces<i>Sino<j>FinSi"
+                 "Mientras<c>HacerSi<d>Entonces<i>FinSiFinMientras"
+                 "Repetir<i>HastaQue<c>")
+
+
+def programa_pascal(bytes_objetivo):
+    """
+    Genera un programa PascalCase sin espacios de aproximadamente el tamaño pedido
+    """
+    repeticiones = max(1, bytes_objetivo // len(CUERPO_PASCAL))
+    return "Comienza" + CUERPO_PASCAL * repeticiones + "Termina"
+
+
+# Bloques si/mientras repetidos uno al lado del otro (un nivel de anidamiento, el máximo
+# del AFND); la carga 'profundo' anida los bloques de verdad
+CUERPO_ANIDADO = ("si <c> entonces mientras <d> hacer <i> <j> finmientras sino "
+                  "mientras <e> hacer <k> finmientras finsi "
+                  "mientras <c> hacer si <d> entonces <i> sino <j> finsi finmientras ")
+
+# Apertura y cierre de tres niveles si/mientras/repetir (programa_anidado)
+APERTURA_ANIDADA = "si <c> entonces mientras <d> hacer repetir "
+CIERRE_ANIDADO = "hastaque <e> finmientras finsi "
+
+# Prefijos ambiguos para la segmentación PascalCase (Si/Sino, Hasta/HastaQue)
+PATRON_AMBIGUO = "SiSinoHastaHastaQueSiSi"
+
+
+def programa_generado(bytes_objetivo, estilo='pascal'):
+    """
+    Genera un programa aleatorio (semilla fija) de aproximadamente el tamaño pedido
+    """
+    texto = io.StringIO()
+    GeneradorProgramas(semilla=0).escribir_programa(texto, max(1, bytes_objetivo // 7), estilo)
+    return texto.getvalue()
+
+
+def programa_anidado(profundidad):
+    """
+    Genera un programa con bloques si/mientras/repetir anidados a la profundidad pedida
+    (3 * profundidad niveles; solo lo acepta AutomataPila)
+    """
+    return ("comienza " + APERTURA_ANIDADA * profundidad + "<i> " +
+            CIERRE_ANIDADO * profundidad + "termina")
+
+
+def programa_profundo(bytes_objetivo):
+    """
+    Genera un programa anidado (programa_anidado) de aproximadamente el tamaño pedido
+    """
+    return programa_anidado(max(1, bytes_objetivo // len(APERTURA_ANIDADA + CIERRE_ANIDADO)))
+
+
+def escalar(inicio, cuerpo, fin, bytes_objetivo):
+    """
+    Repite el cuerpo hasta alcanzar aproximadamente el tamaño pedido
+    """
+    return inicio + cuerpo * max(1, bytes_objetivo // len(cuerpo)) + fin
+
+
+# Cargas de trabajo: nombre -> generador según el tamaño en bytes
+CARGAS = {
+    'espaciado': lambda bytes_objetivo: escalar("comienza ", CUERPO_PROGRAMA, "termina", bytes_objetivo),
+    'pascal': programa_pascal,
+    'anidado': lambda bytes_objetivo: escalar("comienza ", CUERPO_ANIDADO, "termina", bytes_objetivo),
+    'profundo': programa_profundo,
+    'ambiguo': lambda bytes_objetivo: escalar("", PATRON_AMBIGUO, "", bytes_objetivo),
+    'generado': programa_generado,
+}
+
+# Entradas hostiles: nombre -> generador según el tamaño en caracteres
+# (casos que antes volvían a recorrer el resto de la cadena en cada posición)
+ADVERSARIOS = {
+    "'<' sin cerrar": lambda largo: '<' * largo,
+    "'<a' sin cerrar": lambda largo: '<a' * (largo // 2),
+    'sin delimitador': lambda largo: 'a' * largo,
+    "'a=' sin cerrar": lambda largo: 'a=' * (largo // 2) + '<',
+    "'<a>=<' sin cerrar": lambda largo: '<a>=<' * (largo // 5),
+    'casi reservadas': lambda largo: 'FinMientra' * (largo // 10),
+    # El token queda sin decidir hasta el final (en un flujo llegan muchos fragmentos antes)
+    'elemento abierto': lambda largo: 'ComienzaEscribir<' + ('a' * 15 + ';') * (largo // 16),
+    'segmento abierto': lambda largo: 'ComienzaLeer' + 'a' * largo,
+    'palabra gigante': lambda largo: 'comienza ' + 'a' * largo + ' termina',
+    'elemento gigante': lambda largo: 'comienza escribir <' + 'a' * largo + ' termina',
+}
+
+# Funciones medidas por la suite y las cargas que se les aplican ('AutomataPila.x' mide
+# el método x de AutomataPila: la carga 'profundo' tiene más de un nivel de anidamiento)
+MEDICIONES = [
+    ('analizar_palabras', ('espaciado', 'pascal', 'anidado', 'profundo', 'generado')),
+    ('tokenizar_cadena_sin_espacios', ('pascal', 'ambiguo')),
+    ('dividir_pascal_case', ('ambiguo',)),
+    ('procesar_cadena', ('espaciado', 'pascal', 'anidado', 'generado')),
+    ('procesar_archivo', ('espaciado', 'pascal', 'anidado')),
+    ('AutomataPila.reconocer', ('anidado', 'profundo')),
+]
+
+
+def corpus_ejemplos():
+    """
+    Devuelve las pruebas automáticas y el contenido de los archivos ejemplo*.txt
+    """
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    programas = list(EJEMPLOS_PRUEBA)
+    for ruta in sorted(glob.glob(os.path.join(directorio, 'ejemplo*.txt'))):
+        with open(ruta, encoding='utf-8') as archivo:
+            programas.append(archivo.read())
+    return programas
+
+
+def medir(funcion, *argumentos, repeticiones=5):
+    """
+    Ejecuta la función varias veces y devuelve el mejor tiempo en segundos
+    """
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(*argumentos)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def benchmark_afd_vs_afn(automata, tamanios=(10, 100, 1000)):
+    """
+    Compara procesar_cadena (AFND, sin trazas) contra reconocer (AFD compilado)
+    """
+    print("=== AFND (procesar_cadena) vs AFD compilado (reconocer) ===")
+    automata.compilar()
+    trazador_original = automata.trazador
+    automata.trazador = Trazador.apagado()
+    for repeticiones in tamanios:
+        cadena = programa_espaciado(repeticiones)
+        palabras = automata.analizar_palabras(cadena)
+        t_afn = medir(automata.procesar_cadena, cadena)
+        t_afd = medir(automata.reconocer, cadena)
+        codigos = automata._afd.codificar(palabras)
+        t_tabla = medir(automata._afd.aceptar, codigos)
+        print(f"  {len(palabras):>8} tokens | AFND {t_afn * 1000:9.2f} ms | "
+              f"AFD {t_afd * 1000:9.2f} ms | solo tabla {t_tabla * 1000:9.2f} ms | "
+              f"x{t_afn / t_afd:5.1f}")
+    automata.trazador = trazador_original
+
+
+def procesar_cadena_conjuntos(automata, cadena):
+    """
+    Simulación del AFND con conjuntos de nombres de estados (versión anterior de
+    procesar_cadena, sin trazas), como referencia para benchmark_mascaras
+    """
+    estados_actuales = {automata.estado_inicial}
+    for palabra in automata.analizar_palabras(cadena):
+        if palabra == 'INVALIDO':
+            return False
+        if palabra == 'ELEMENTO':
+            for estado, simbolo in automata.resolucion_elemento:
+                if estado in estados_actuales:
+                    palabra = simbolo
+                    break
+        nuevos_estados = set()
+        for estado in estados_actuales:
+            transicion = (estado, palabra)
+            if transicion in automata.transiciones:
+                nuevos_estados.update(automata.transiciones[transicion])
+        if not nuevos_estados:
+            return False
+        estados_actuales = nuevos_estados
+    return bool(estados_actuales.intersection(automata.estados_finales))
+
+
+def benchmark_mascaras(automata, tamanios=(10, 100, 1000, 10_000)):
+    """
+    Compara procesar_cadena (AFND con máscaras de bits, sin trazas) contra la simulación
+    con conjuntos de nombres de estados
+    """
+    print("=== AFND: máscaras de bits vs conjuntos de estados ===")
+    automata.compilar()
+    trazador_original = automata.trazador
+    automata.trazador = Trazador.apagado()
+    for nombre in ('espaciado', 'anidado'):
+        for repeticiones in tamanios:
+            cadena = escalar("comienza ", CUERPO_PROGRAMA if nombre == 'espaciado' else CUERPO_ANIDADO,
+                             "termina", repeticiones * len(CUERPO_PROGRAMA))
+            assert automata.procesar_cadena(cadena) == procesar_cadena_conjuntos(automata, cadena)
+            t_lexico = medir(automata.analizar_palabras, cadena)
+            t_conjuntos = medir(procesar_cadena_conjuntos, automata, cadena)
+            t_mascaras = medir(automata.procesar_cadena, cadena)
+            print(f"  {nombre:<10} {len(automata.analizar_palabras(cadena)):>8} tokens | "
+                  f"conjuntos {t_conjuntos * 1000:9.2f} ms | máscaras {t_mascaras * 1000:9.2f} ms | "
+                  f"(léxico {t_lexico * 1000:8.2f} ms) | simulación x{(t_conjuntos - t_lexico) / (t_mascaras - t_lexico):4.1f}")
+    automata.trazador = trazador_original
+
+
+def memoria_asignada(funcion, *argumentos):
+    """
+    Devuelve (resultado, bytes que siguen asignados por el resultado) según tracemalloc
+    """
+    tracemalloc.start()
+    try:
+        antes = tracemalloc.get_traced_memory()[0]
+        resultado = funcion(*argumentos)
+        despues = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return resultado, despues - antes
+
+
+def benchmark_flujo_compacto(automata, bytes_objetivo=2_000_000):
+    """
+    Compara la memoria por token y el tiempo de las representaciones de los tokens:
+    tuplas de lexer(), lista de analizar_palabras() y FlujoTokens (tokenizar_compacto)
+    """
+    print("=== Flujo de tokens compacto (array('B') + arrays('I')) ===")
+    automata.compilar()
+    afd = automata._afd
+    for nombre in ('espaciado', 'pascal'):
+        cadena = CARGAS[nombre](bytes_objetivo)
+        formas = (
+            ('tuplas lexer()', lambda: list(automata.lexer(cadena))),
+            ('analizar_palabras', lambda: automata.analizar_palabras(cadena)),
+            ('tokenizar_compacto', lambda: automata.tokenizar_compacto(cadena)),
+        )
+        for descripcion, construir in formas:
+            tokens, asignados = memoria_asignada(construir)
+            tiempo = medir(construir, repeticiones=3)
+            print(f"  {nombre:<10} {descripcion:<20} | {len(tokens):>8} tokens | "
+                  f"{asignados / len(tokens):6.1f} bytes/token | {tiempo * 1000:8.2f} ms")
+        flujo = automata.tokenizar_compacto(cadena)
+        palabras = afd.codificar(automata.analizar_palabras(cadena))
+        print(f"  {nombre:<10} AFD sobre códigos: lista {medir(afd.aceptar, palabras) * 1000:7.2f} ms | "
+              f"array('B') {medir(afd.aceptar, flujo.codigos) * 1000:7.2f} ms")
+
+
+def benchmark_trazas(automata, repeticiones=200):
+    """
+    Compara el rendimiento de procesar_cadena con las trazas apagadas y encendidas
+    """
+    print("=== procesar_cadena según nivel de traza ===")
+    cadena = programa_espaciado(repeticiones)
+    tokens = len(automata.analizar_palabras(cadena))
+    trazador_original = automata.trazador
+    descarte = io.StringIO()
+    configuraciones = [
+        ("apagado", Trazador.apagado()),
+        ("resumen (JSON-lines)", Trazador.jsonl(descarte, Trazador.RESUMEN)),
+        ("por token (JSON-lines)", Trazador.jsonl(descarte, Trazador.POR_TOKEN)),
+        ("por token (callback)", Trazador(Trazador.POR_TOKEN, lambda evento: None)),
+        ("por token (consola)", Trazador.consola()),
+    ]
+    for nombre, trazador in configuraciones:
+        automata.trazador = trazador
+        with contextlib.redirect_stdout(descarte):
+            tiempo = medir(automata.procesar_cadena, cadena, repeticiones=3)
+        descarte.seek(0)
+        descarte.truncate()
+        print(f"  {nombre:<24} | {tiempo * 1000:9.2f} ms | {tokens / tiempo:12,.0f} tokens/s")
+    automata.trazador = trazador_original
+
+
+def benchmark_estadisticas(automata, repeticiones=20):
+    """
+    Costo de la instrumentación: procesar_cadena y reconocer con automata.estadisticas
+    en None y con una instancia de Estadisticas, sobre el corpus y sobre entradas grandes
+    """
+    print("=== Estadisticas (instrumentación desactivada vs activada) ===")
+    automata.compilar()
+    trazador_original = automata.trazador
+    automata.trazador = Trazador.apagado()
+    corpus = corpus_ejemplos()
+    
+    def recorrer(funcion):
+        for programa in corpus:
+            funcion(programa)
+    
+    casos = (
+        ('corpus, procesar_cadena', recorrer, automata.procesar_cadena),
+        ('corpus, reconocer', recorrer, automata.reconocer),
+        ('espaciado 1 MB, procesar_cadena', automata.procesar_cadena, CARGAS['espaciado'](1_000_000)),
+        ('pascal 1 MB, procesar_cadena', automata.procesar_cadena, CARGAS['pascal'](1_000_000)),
+    )
+    for descripcion, funcion, argumento in casos:
+        automata.estadisticas = None
+        desactivada = medir(funcion, argumento, repeticiones=repeticiones)
+        automata.estadisticas = Estadisticas()
+        activada = medir(funcion, argumento, repeticiones=repeticiones)
+        print(f"  {descripcion:<34} | sin estadísticas {desactivada * 1000:8.2f} ms | "
+              f"con estadísticas {activada * 1000:8.2f} ms ({(activada / desactivada - 1) * 100:+5.1f}%)")
+    automata.estadisticas = None
+    automata.trazador = trazador_original
+
+
+def benchmark_tokenizador(automata, tamanios=(10_000, 100_000, 1_000_000, 4_000_000)):
+    """
+    Mide tokenizar_cadena_sin_espacios sobre programas PascalCase de tamaño creciente
+    El tiempo por MB debe mantenerse constante (escalado lineal)
+    """
+    print("=== tokenizar_cadena_sin_espacios (PascalCase sin espacios) ===")
+    for bytes_objetivo in tamanios:
+        cadena = programa_pascal(bytes_objetivo)
+        tiempo = medir(automata.tokenizar_cadena_sin_espacios, cadena, repeticiones=3)
+        megas = len(cadena) / 1_000_000
+        print(f"  {len(cadena):>10} caracteres | {tiempo * 1000:10.2f} ms | "
+              f"{tiempo / megas:8.3f} s/MB")
+
+
+def benchmark_segmentacion(automata, tamanios=(1_000, 10_000, 100_000, 1_000_000)):
+    """
+    Prueba de estrés de dividir_pascal_case con prefijos ambiguos (Si/Sino, Hasta/HastaQue)
+    Con backtracking estas entradas crecen exponencialmente; aquí deben escalar linealmente
+    """
+    print("=== dividir_pascal_case (corridas ambiguas) ===")
+    patron = "SiSinoHastaHastaQueSiSi"
+    for bytes_objetivo in tamanios:
+        texto = patron * max(1, bytes_objetivo // len(patron))
+        tiempo = medir(automata.dividir_pascal_case, texto, repeticiones=3)
+        palabras = automata.dividir_pascal_case(texto)
+        assert ''.join(palabras) == texto, "la división no reconstruye la entrada"
+        print(f"  {len(texto):>10} caracteres | {len(palabras):>8} palabras | "
+              f"{tiempo * 1000:10.2f} ms")
+
+
+def benchmark_adversario(automata, tamanios=(100_000, 200_000, 400_000), tam_fragmento=16):
+    """
+    Entradas hostiles (ADVERSARIOS) por cada camino de tokenización y reconocimiento:
+    con el tamaño x4 el tiempo debe crecer x4 (lineal), no x16. También mide cuánto tarda
+    en fallar una entrada que supera limite_caracteres o limite_tokens.
+    """
+    print("=== Entradas adversarias (escalado lineal) ===")
+    generado = automata.reconocedor_generado()
+    
+    def flujo(cadena):
+        modo = 'espacios' if ' ' in cadena else 'sin_espacios'
+        return automata.reconocer_flujo(io.StringIO(cadena), tam_fragmento, modo)
+    
+    def documento(cadena):
+        return DocumentoIncremental(automata, cadena).aceptada()
+    
+    caminos = [('reconocer', automata.reconocer), ('con posición', automata.reconocer_con_posicion),
+               ('generado', generado), (f'flujo ({tam_fragmento} car.)', flujo),
+               ('documento', documento)]
+    for nombre, generador in ADVERSARIOS.items():
+        for camino, funcion in caminos:
+            # DocumentoIncremental mira hasta LARGO_MAXIMO_ALCANCE caracteres por token: tamaños menores
+            escala = 10 if camino == 'documento' else 1
+            tiempos = [medir(funcion, generador(largo // escala), repeticiones=1) for largo in tamanios]
+            por_caracter = ' '.join(f"{tiempo / (largo // escala) * 1e6:6.2f}"
+                                    for tiempo, largo in zip(tiempos, tamanios))
+            print(f"  {nombre:<20} | {camino:<16} | µs/car. {por_caracter} | "
+                  f"x{tiempos[-1] / tiempos[0]:5.1f} para x{tamanios[-1] // tamanios[0]} caracteres")
+    
+    limitado = AutomataReconocedor()
+    limitado.limite_caracteres = 1 << 20
+    limitado.limite_tokens = 10_000
+    for nombre, cadena in (('64 M caracteres', 'a' * (64 << 20)), ('1 M tokens', 'a' * (1 << 20)),
+                           ('1 M tokens espaciados', 'a ' * (1 << 19))):
+        inicio = time.perf_counter()
+        try:
+            limitado.reconocer(cadena)
+        except LimiteExcedido as error:
+            print(f"  {nombre:<22} | {error} en {(time.perf_counter() - inicio) * 1000:.2f} ms")
+
+
+def contar_nodos(nodo):
+    """
+    Cantidad de nodos distintos de un trie (los hijos compartidos se cuentan una vez)
+    """
+    vistos = set()
+    pendientes = [nodo]
+    while pendientes:
+        actual = pendientes.pop()
+        if id(actual) not in vistos:
+            vistos.add(id(actual))
+            pendientes.extend(hijo for clave, hijo in actual.items() if clave)
+    return len(vistos)
+
+
+def benchmark_reservadas(automata, lexemas=200_000, posiciones=200_000):
+    """
+    Consulta de palabras reservadas sin distinguir mayúsculas: lower() sobre la tabla en
+    minúsculas (construir_tabla_reservadas) contra el diccionario con dos grafías por
+    palabra (minúsculas y PascalCase, más rápido pero no reconoce 'SI' ni 'finMientras');
+    y, por posición de una entrada sin espacios, el trie contra recorrer las palabras
+    ordenadas de la más larga a la más corta
+    """
+    print("=== Palabras reservadas sin distinguir mayúsculas ===")
+    rng = random.Random(8)
+    validas = automata.palabras_validas
+    dos_grafias = dict(validas, **{palabra.capitalize(): categoria for palabra, categoria in validas.items()})
+    tabla = automata.construir_tabla_reservadas()
+    palabras = CUERPO_PROGRAMA.split() + ['x=<y>', '<dato>', 'total']
+    muestra = [''.join(caracter.upper() if rng.random() < 0.2 else caracter for caracter in rng.choice(palabras))
+               for _ in range(lexemas)]
+    
+    def consultar(consulta):
+        return [consulta(lexema) for lexema in muestra]
+    
+    minusculas = tabla.get
+    casos = [('dos grafías (exacta)', dos_grafias.get), ('lower() + tabla', lambda lexema: minusculas(lexema.lower()))]
+    for nombre, consulta in casos:
+        tiempo = medir(consultar, consulta, repeticiones=3)
+        aciertos = sum(resultado is not None for resultado in consultar(consulta))
+        print(f"  {nombre:<24} | {tiempo / lexemas * 1e9:6.1f} ns/lexema | {aciertos} palabras reservadas reconocidas")
+    
+    cadena = programa_pascal(posiciones)
+    cadena = ''.join(caracter.upper() if rng.random() < 0.2 else caracter for caracter in cadena)
+    trie = automata.construir_trie()
+    ordenadas = sorted((palabra for palabra in dos_grafias if palabra != ';'), key=len, reverse=True)
+    
+    def por_recorrido():
+        for i in range(len(cadena)):
+            for palabra in ordenadas:
+                if cadena.startswith(palabra, i):
+                    break
+    
+    def por_trie():
+        n = len(cadena)
+        for i in range(n):
+            nodo = trie
+            j = i
+            while j < n:
+                nodo = nodo.get(cadena[j])
+                if nodo is None:
+                    break
+                j += 1
+    
+    recorrido = medir(por_recorrido, repeticiones=3)
+    con_trie = medir(por_trie, repeticiones=3)
+    print(f"  por posición: recorrido ordenado ({len(ordenadas)} grafías) {recorrido / len(cadena) * 1e9:6.1f} ns | "
+          f"trie sin mayúsculas ({len(validas) - 1} palabras) {con_trie / len(cadena) * 1e9:6.1f} ns")
+    anterior = {}
+    for palabra in dos_grafias:
+        nodo = anterior
+        for caracter in palabra:
+            nodo = nodo.setdefault(caracter, {})
+    print(f"  nodos del trie: {contar_nodos(anterior)} con dos grafías, {contar_nodos(trie)} sin distinguir mayúsculas | "
+          f"tabla de reservadas: {len(tabla)} entradas")
+
+
+def benchmark_lote(total=50_000, procesos=(1, 2, 4), tam_lote=256):
+    """
+    Mide reconocer_lote sobre el corpus de ejemplos replicado según la cantidad de procesos
+    """
+    print(f"=== reconocer_lote ({total} programas, {os.cpu_count()} núcleos) ===")
+    corpus = corpus_ejemplos()
+    programas = (corpus * (total // len(corpus) + 1))[:total]
+    base = None
+    for cantidad in procesos:
+        tiempo = medir(reconocer_lote, programas, cantidad, tam_lote, repeticiones=1)
+        base = base or tiempo
+        print(f"  {cantidad:>3} procesos | {tiempo:7.2f} s | {total / tiempo:10,.0f} programas/s | "
+              f"aceleración x{base / tiempo:4.1f}")
+
+
+def _esperar_trabajador(espera):
+    time.sleep(espera)
+
+
+def _memoria_trabajador(tarea):
+    # Reconoce los programas, hace una recolección completa (como ocurre tarde o temprano
+    # en un trabajador de larga duración) y devuelve (pid, KB privados, KB proporcionales)
+    # del proceso; la espera hace que cada trabajador tome una sola tarea
+    import gc
+    
+    programas, espera = tarea
+    for programa in programas:
+        _reconocer_en_trabajador(programa)
+    gc.collect()
+    time.sleep(espera)
+    campos = {}
+    with open('/proc/self/smaps_rollup') as archivo:
+        for linea in archivo:
+            clave, _, valor = linea.partition(':')
+            if valor.strip().endswith('kB'):
+                campos[clave] = int(valor.split()[0])
+    privados = campos.get('Private_Clean', 0) + campos.get('Private_Dirty', 0)
+    return os.getpid(), privados, campos.get('Pss', 0)
+
+
+def benchmark_compartidas(procesos=32, espera=0.5):
+    """
+    Arranca el pool de reconocer_lote con compartir=False (cada proceso compila el
+    autómata) y con compartir=True (tablas en memoria compartida, ver TablasCompartidas)
+    y mide el arranque hasta que todos los procesos respondieron y la memoria privada y
+    proporcional (PSS) de cada proceso después de reconocer el corpus y de una
+    recolección completa (solo Linux)
+    """
+    print(f"=== Pool de {procesos} procesos: autómata compilado en cada uno o tablas compartidas "
+          f"({os.cpu_count()} núcleos) ===")
+    tareas = [(corpus_ejemplos(), espera)] * procesos
+    for compartir in (False, True):
+        inicio = time.perf_counter()
+        with _pool_trabajadores(procesos, None, compartir) as pool:
+            pool.map(_esperar_trabajador, [espera] * procesos, 1)
+            arranque = time.perf_counter() - inicio - espera
+            medidas = pool.map(_memoria_trabajador, tareas, 1)
+        por_proceso = {pid: (privados, proporcional) for pid, privados, proporcional in medidas}
+        cantidad = len(por_proceso)
+        privados = sum(privados for privados, _ in por_proceso.values()) / cantidad
+        proporcional = sum(proporcional for _, proporcional in por_proceso.values())
+        modo = 'compartidas' if compartir else 'compilar'
+        print(f"  {modo:<12} | arranque {arranque * 1000:8.1f} ms | privada {privados:8.0f} KB/proceso | "
+              f"PSS total {proporcional / 1024:7.1f} MB ({cantidad} procesos)")
+
+
+def benchmark_carga_jff(repeticiones=20):
+    """
+    Compara el arranque desde .jff leyendo el XML (sin cache) contra la cache compilada
+    """
+    print("=== AutomataReconocedor.desde_jff (arranque) ===")
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as temporal:
+        exportado = os.path.join(temporal, 'tokens.jff')
+        AutomataReconocedor().exportar_jff(exportado)
+        cache = os.path.join(temporal, 'cache')
+        for ruta in (exportado, os.path.join(directorio, 'tp_final.jff')):
+            try:
+                sin_cache = medir(AutomataReconocedor.desde_jff, ruta, None, repeticiones=repeticiones)
+            except ValueError as error:  # tp_final.jff tiene etiquetas que no son de la gramática
+                print(f"  {os.path.basename(ruta):<16} | rechazado: {error}")
+                continue
+            AutomataReconocedor.desde_jff(ruta, cache)
+            con_cache = medir(AutomataReconocedor.desde_jff, ruta, cache, repeticiones=repeticiones)
+            print(f"  {os.path.basename(ruta):<16} | XML + compilar {sin_cache * 1000:8.2f} ms | "
+                  f"cache {con_cache * 1000:8.2f} ms")
+
+
+def benchmark_cache(repeticiones=20):
+    """
+    Compara reconocer() contra CacheResultados (memoria y disco) sobre el corpus repetido
+    """
+    print("=== CacheResultados ===")
+    automata = AutomataReconocedor()
+    automata.compilar()
+    corpus = corpus_ejemplos() + [programa_espaciado(1000)]
+    
+    def recorrer(reconocer):
+        for programa in corpus:
+            reconocer(programa)
+    
+    with tempfile.TemporaryDirectory() as temporal:
+        sin_cache = medir(recorrer, automata.reconocer, repeticiones=repeticiones)
+        memoria = CacheResultados(automata)
+        recorrer(memoria.reconocer)
+        en_memoria = medir(recorrer, memoria.reconocer, repeticiones=repeticiones)
+        CacheResultados(automata, directorio=temporal).limpiar()
+        recorrer(CacheResultados(automata, directorio=temporal).reconocer)
+        disco = CacheResultados(automata, capacidad=0, directorio=temporal)
+        en_disco = medir(recorrer, disco.reconocer, repeticiones=repeticiones)
+    print(f"  {len(corpus)} programas | sin cache {sin_cache * 1000:8.2f} ms | "
+          f"memoria {en_memoria * 1000:8.2f} ms | disco {en_disco * 1000:8.2f} ms")
+    print(f"  memoria: {memoria.estadisticas()}")
+    print(f"  disco:   {disco.estadisticas()}")
+
+
+def benchmark_edicion(tamanios=(100_000, 1_000_000), ediciones=2000):
+    """
+    Compara volver a reconocer todo el texto contra DocumentoIncremental.editar()
+    en ediciones chicas (tipear o borrar un caracter, cambiar una palabra reservada)
+    """
+    print("=== DocumentoIncremental (ediciones de un editor) ===")
+    automata = AutomataReconocedor()
+    automata.compilar()
+    aleatorio = random.Random(2025)
+    for nombre in ('espaciado', 'pascal'):
+        for tamanio in tamanios:
+            texto = CARGAS[nombre](tamanio)
+            completo = medir(automata.reconocer, texto, repeticiones=3)
+            inicio = time.perf_counter()
+            documento = DocumentoIncremental(automata, texto)
+            carga = time.perf_counter() - inicio
+            tiempos = []
+            reprocesados = 0
+            for _ in range(ediciones):
+                posicion = aleatorio.randrange(len(documento.texto))
+                # Insertar y luego deshacer: el documento vuelve a ser válido
+                for fin, nuevo in ((posicion, 'x'), (posicion + 1, '')):
+                    inicio = time.perf_counter()
+                    documento.editar(posicion, fin, nuevo)
+                    tiempos.append(time.perf_counter() - inicio)
+                    reprocesados += documento.tokens_reprocesados + documento.estados_reprocesados
+            tiempos.sort()
+            print(f"  {nombre:<10} {tamanio:>9} bytes | reconocer {completo * 1000:8.2f} ms | "
+                  f"carga {carga * 1000:8.2f} ms | edición mediana {tiempos[len(tiempos) // 2] * 1e6:7.1f} us "
+                  f"p99 {tiempos[int(len(tiempos) * 0.99)] * 1e6:8.1f} us | "
+                  f"{reprocesados / len(tiempos):5.1f} tokens+estados/edición | aceptada {documento.aceptada()}")
+
+
+def percentil(tiempos, fraccion):
+    """
+    Devuelve el percentil pedido (0..1) de una lista de tiempos
+    """
+    ordenados = sorted(tiempos)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * fraccion))]
+
+
+async def carga_servidor(direccion, corpus, conexiones, consultas, en_vuelo):
+    """
+    Abre varias conexiones y envía 'consultas' pedidos por conexión, con hasta 'en_vuelo'
+    pedidos sin respuesta a la vez en cada una. Devuelve (segundos, latencias)
+    """
+    latencias = []
+    
+    async def consultar(cliente, cadena):
+        inicio = time.perf_counter()
+        await cliente.reconocer(cadena)
+        latencias.append(time.perf_counter() - inicio)
+    
+    async def conexion(numero):
+        cliente = await ClienteReconocedor.conectar(direccion)
+        pendientes = set()
+        for i in range(consultas):
+            if len(pendientes) >= en_vuelo:
+                _, pendientes = await asyncio.wait(pendientes, return_when=asyncio.FIRST_COMPLETED)
+            pendientes.add(asyncio.ensure_future(consultar(cliente, corpus[(numero + i) % len(corpus)])))
+        await asyncio.gather(*pendientes)
+        await cliente.cerrar()
+    
+    inicio = time.perf_counter()
+    await asyncio.gather(*(conexion(numero) for numero in range(conexiones)))
+    return time.perf_counter() - inicio, latencias
+
+
+def benchmark_servidor(consultas_totales=20_000):
+    """
+    Prueba de carga del servidor (--servidor) en un socket Unix: pedidos por segundo y
+    latencia p50/p99 con distintas cantidades de conexiones y de pedidos en vuelo, comparado
+    con lanzar el programa una vez por validación
+    """
+    print("=== Servidor JSON por líneas ===")
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    programa = os.path.join(directorio, 'reconocedor_gramatica_pseudocodigo_FTI_2025.py')
+    corpus = corpus_ejemplos()
+    with tempfile.TemporaryDirectory() as temporal:
+        ruta = os.path.join(temporal, 'programa.txt')
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            archivo.write(EJEMPLOS_PRUEBA[-1])
+        inicio = time.perf_counter()
+        for _ in range(5):
+            subprocess.run([sys.executable, programa, ruta], stdout=subprocess.DEVNULL, check=True)
+        por_proceso = (time.perf_counter() - inicio) / 5
+        print(f"  un proceso por validación: {por_proceso * 1000:8.2f} ms/pedido ({1 / por_proceso:8.1f} pedidos/s)")
+        
+        direccion = 'unix:' + os.path.join(temporal, 'servidor.sock')
+        servidor = subprocess.Popen([sys.executable, programa, '--servidor', direccion],
+                                    stdout=subprocess.PIPE, text=True)
+        try:
+            servidor.stdout.readline()  # espera a que el socket esté escuchando
+            for conexiones, en_vuelo in ((1, 1), (1, 64), (8, 1), (32, 1), (32, 16)):
+                consultas = consultas_totales // conexiones
+                segundos, latencias = asyncio.run(
+                    carga_servidor(direccion, corpus, conexiones, consultas, en_vuelo))
+                print(f"  {conexiones:>2} conexiones x {en_vuelo:>2} en vuelo | "
+                      f"{len(latencias) / segundos:9.0f} pedidos/s | "
+                      f"p50 {percentil(latencias, 0.50) * 1e6:8.1f} us | "
+                      f"p99 {percentil(latencias, 0.99) * 1e6:8.1f} us")
+            
+            async def lote():
+                cliente = await ClienteReconocedor.conectar(direccion)
+                inicio = time.perf_counter()
+                for _ in range(consultas_totales // len(corpus)):
+                    await cliente.reconocer_varias(corpus)
+                segundos = time.perf_counter() - inicio
+                await cliente.cerrar()
+                return segundos
+            
+            segundos = asyncio.run(lote())
+            print(f"  pedidos de {len(corpus)} cadenas   | "
+                  f"{consultas_totales // len(corpus) * len(corpus) / segundos:9.0f} cadenas/s")
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+
+def benchmark_validacion(archivos=5000, procesos=(1, 2, 4)):
+    """
+    Valida un corpus de muchos archivos chicos con validar_archivos (--validar) y lo
+    compara con lanzar el programa una vez por archivo (estimado con 5 archivos)
+    """
+    print("=== Validación de muchos archivos (--validar) ===")
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    programa = os.path.join(directorio, 'reconocedor_gramatica_pseudocodigo_FTI_2025.py')
+    ejemplos = sorted(glob.glob(os.path.join(directorio, 'ejemplo*.txt')))
+    with tempfile.TemporaryDirectory() as temporal:
+        rutas = []
+        for numero in range(archivos):
+            with open(ejemplos[numero % len(ejemplos)], 'rb') as origen:
+                contenido = origen.read()
+            ruta = os.path.join(temporal, f'programa{numero:06d}.txt')
+            with open(ruta, 'wb') as destino:
+                destino.write(contenido)
+            rutas.append(ruta)
+        
+        inicio = time.perf_counter()
+        for ruta in rutas[:5]:
+            subprocess.run([sys.executable, programa, ruta], stdout=subprocess.DEVNULL, check=True)
+        por_archivo = (time.perf_counter() - inicio) / 5
+        print(f"  {'un proceso por archivo (estimado)':<36} | {por_archivo * archivos:8.2f} s | "
+              f"{1 / por_archivo:9.0f} archivos/s")
+        for cantidad in procesos:
+            inicio = time.perf_counter()
+            registros = sum(1 for _ in validar_archivos(rutas, procesos=cantidad))
+            segundos = time.perf_counter() - inicio
+            print(f"  {f'validar_archivos, {cantidad} proceso(s)':<36} | {segundos:8.2f} s | "
+                  f"{registros / segundos:9.0f} archivos/s")
+
+
+def benchmark_generador(bytes_objetivo=20_000_000, muestra=2000):
+    """
+    Mide la velocidad de GeneradorProgramas por estilo escribiendo en /dev/null, con el
+    pico de memoria asignada (no depende del tamaño), y verifica las etiquetas de una
+    muestra de programas contra reconocer()
+    """
+    print("=== Generador de programas ===")
+    automata = AutomataReconocedor()
+    for estilo in GeneradorProgramas.ESTILOS:
+        with open(os.devnull, 'w') as descarte:
+            inicio = time.perf_counter()
+            programas = GeneradorProgramas(automata, semilla=1).escribir_corpus(
+                descarte, bytes_objetivo=bytes_objetivo, estilos=(estilo,), proporcion_mutados=0.3)
+            segundos = time.perf_counter() - inicio
+            # Pico de memoria con un programa de un décimo del tamaño (tracemalloc es lento)
+            tracemalloc.start()
+            GeneradorProgramas(automata, semilla=1).escribir_programa(descarte, bytes_objetivo // 70, estilo)
+            pico = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        print(f"  {estilo:<10} | {programas:>8} programas | {bytes_objetivo / 1_000_000 / segundos:6.2f} MB/s | "
+              f"pico {pico / 1024:8.1f} KB (un programa de {bytes_objetivo // 10_000_000} MB)")
+    
+    generador = GeneradorProgramas(automata, semilla=2)
+    mutaciones = [None] + sorted(GeneradorProgramas.MUTACIONES)
+    diferencias = rechazados = 0
+    for numero in range(muestra):
+        mutacion = mutaciones[numero % len(mutaciones)]
+        texto, aceptada = generador.programa(random.randint(1, 200), GeneradorProgramas.ESTILOS[numero % 3], mutacion)
+        diferencias += automata.reconocer(texto) != aceptada
+        rechazados += mutacion is not None and not aceptada
+    print(f"  {muestra} programas verificados: {diferencias} etiquetas distintas de reconocer(), "
+          f"{rechazados} de {sum(1 for n in range(muestra) if mutaciones[n % len(mutaciones)])} mutados rechazados")
+
+
+def benchmark_bloques(programas=200_000, tokens=12):
+    """
+    Reconoce un archivo con muchos pseudocódigos separados por líneas vacías (bloques de
+    GeneradorProgramas en los tres estilos) con reconocer_bloques: velocidad, pico de
+    memoria asignada y veredictos comparados con las etiquetas del generador
+    """
+    print("=== Archivo con muchos bloques (reconocer_bloques) ===")
+    automata = AutomataReconocedor()
+    with tempfile.TemporaryDirectory() as temporal:
+        ruta = os.path.join(temporal, 'bloques.txt')
+        etiquetas = io.StringIO()
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            GeneradorProgramas(automata, semilla=4).escribir_corpus(
+                archivo, programas, tokens=tokens, estilos=GeneradorProgramas.ESTILOS,
+                proporcion_mutados=0.3, etiquetas=etiquetas)
+        esperados = [json.loads(linea)['aceptada'] for linea in etiquetas.getvalue().splitlines()]
+        tamanio = os.path.getsize(ruta)
+        
+        inicio = time.perf_counter()
+        bloques = sum(1 for _ in reconocer_bloques(automata, ruta))
+        segundos = time.perf_counter() - inicio
+        # Segunda pasada con tracemalloc (más lenta): pico de memoria y veredictos
+        tracemalloc.start()
+        diferencias = sum(resultado['aceptada'] != esperado
+                          for resultado, esperado in zip(reconocer_bloques(automata, ruta), esperados))
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    print(f"  {bloques} bloques | {tamanio / 1_000_000:6.1f} MB | {segundos:6.2f} s | "
+          f"{bloques / segundos:8.0f} bloques/s | pico {pico / 1024:7.1f} KB | "
+          f"{diferencias} veredictos distintos de las etiquetas")
+
+
+def benchmark_generado(automata, programas=20_000, bytes_objetivo=2_000_000):
+    """
+    Valida el reconocedor generado (reconocedor_generado) contra reconocer() sobre el
+    corpus de GeneradorProgramas y los ejemplos, y compara la velocidad en tokens/s
+    """
+    print("=== Reconocedor generado (generar_codigo + exec) ===")
+    with tempfile.TemporaryDirectory() as temporal:
+        tiempos = []
+        for _ in range(2):  # la primera vez genera el módulo; la segunda lo lee de la cache
+            otro = AutomataReconocedor()
+            otro.compilar()
+            inicio = time.perf_counter()
+            otro.reconocedor_generado(temporal)
+            tiempos.append(time.perf_counter() - inicio)
+        generar, cargar = tiempos
+    print(f"  generar y compilar {generar * 1000:.1f} ms | cargar desde la cache {cargar * 1000:.1f} ms")
+    
+    generado = automata.reconocedor_generado()
+    generador = GeneradorProgramas(automata, semilla=6)
+    mutaciones = [None] + sorted(GeneradorProgramas.MUTACIONES)
+    corpus = [generador.programa(random.randint(1, 80), GeneradorProgramas.ESTILOS[numero % 3],
+                                 mutaciones[numero % len(mutaciones)])[0] for numero in range(programas)]
+    corpus += corpus_ejemplos()
+    diferencias = sum(generado(cadena) != automata.reconocer(cadena) for cadena in corpus)
+    print(f"  {len(corpus)} programas: {diferencias} resultados distintos de reconocer()")
+    
+    cargas = [('programas cortos', corpus), ('espaciado grande', [CARGAS['espaciado'](bytes_objetivo)]),
+              ('pascal grande', [CARGAS['pascal'](bytes_objetivo)]),
+              ('generado grande', [programa_generado(bytes_objetivo, 'espaciado')])]
+    for nombre, cadenas in cargas:
+        tokens = sum(len(automata.analizar_palabras(cadena)) for cadena in cadenas)
+        interpretado = medir(lambda: [automata.reconocer(cadena) for cadena in cadenas], repeticiones=3)
+        especializado = medir(lambda: [generado(cadena) for cadena in cadenas], repeticiones=3)
+        print(f"  {nombre:<18} | reconocer {tokens / interpretado / 1e6:6.2f} M tokens/s | "
+              f"generado {tokens / especializado / 1e6:6.2f} M tokens/s | x{interpretado / especializado:5.2f}")
+
+
+def benchmark_vectorizado(automata, programas=200_000, tokens=30):
+    """
+    Compara la clasificación de muchos programas cortos uno por uno (AFDCompilado.rechazo)
+    con la vectorizada (NumPy, matrices con relleno) sobre los códigos ya tokenizados, y
+    de punta a punta (reconocer contra reconocer_vectorizado)
+    """
+    print("=== Clasificación vectorizada de lotes (NumPy) ===")
+    afd = automata._afd or automata.compilar()
+    generador = GeneradorProgramas(automata, semilla=3)
+    mutaciones = [None] + sorted(GeneradorProgramas.MUTACIONES)
+    cadenas = [generador.programa(random.randint(1, 2 * tokens), 'espaciado', mutaciones[numero % len(mutaciones)])[0]
+               for numero in range(programas)]
+    codigos = [array('B', afd.codificar(automata.analizar_palabras(cadena))) for cadena in cadenas]
+    plano = array('B')
+    largos = array('I')
+    for secuencia in codigos:
+        plano.extend(secuencia)
+        largos.append(len(secuencia))
+    
+    def uno_por_uno(secuencias):
+        return [afd.rechazo(secuencia) for secuencia in secuencias]
+    
+    secuencial = medir(uno_por_uno, codigos, repeticiones=3)
+    print(f"  {f'rechazo() por programa ({programas})':<36} | {secuencial * 1000:9.1f} ms | "
+          f"{programas / secuencial / 1e6:6.2f} M programas/s")
+    if numpy is None:
+        print("  NumPy no está instalado: clasificar_lote usa el mismo recorrido por programa")
+        return
+    _, fallos = afd.clasificar_plano(plano, largos)
+    assert all((esperado is None and fallo == -1) or esperado == fallo
+               for esperado, fallo in zip(uno_por_uno(codigos), fallos.tolist())), "clasificar_plano difiere de rechazo()"
+    for nombre, funcion, argumentos in (('clasificar_lote (listas de arrays)', afd.clasificar_lote, (codigos,)),
+                                        ('clasificar_plano (ya concatenados)', afd.clasificar_plano, (plano, largos))):
+        tiempo = medir(funcion, *argumentos, repeticiones=3)
+        print(f"  {nombre:<36} | {tiempo * 1000:9.1f} ms | {programas / tiempo / 1e6:6.2f} M programas/s | "
+              f"x{secuencial / tiempo:5.1f}")
+    
+    completo = medir(lambda: [automata.reconocer(cadena) for cadena in cadenas], repeticiones=1)
+    vectorizado = medir(automata.reconocer_vectorizado, cadenas, repeticiones=1)
+    print(f"  {'reconocer() por programa':<36} | {completo * 1000:9.1f} ms")
+    print(f"  {'reconocer_vectorizado':<36} | {vectorizado * 1000:9.1f} ms | x{completo / vectorizado:5.1f} "
+          f"(la tokenización sigue siendo por programa)")
+
+
+def benchmark_pila(profundidades=(1_000, 10_000, 100_000)):
+    """
+    Mide AutomataPila con anidamientos de miles de niveles (el AFND solo acepta un nivel)
+    """
+    print("=== AutomataPila (anidamiento profundo) ===")
+    automata = AutomataPila()
+    for profundidad in profundidades:
+        cadena = programa_anidado(profundidad)
+        assert automata.reconocer(cadena), "el programa anidado debe ser aceptado"
+        tiempo = medir(automata.reconocer, cadena, repeticiones=3)
+        print(f"  {3 * profundidad:>8} niveles | {len(cadena):>10} caracteres | "
+              f"{tiempo * 1000:9.2f} ms | {tiempo / len(cadena) * 1e9:6.1f} ns/caracter")
+
+
+# Mide el pico de memoria (RSS) de procesar un archivo en un proceso nuevo
+CODIGO_MEMORIA = """
+import contextlib, os, resource, sys
+sys.path.insert(0, sys.argv[3])
+from reconocedor_gramatica_pseudocodigo_FTI_2025 import AutomataReconocedor, procesar_archivo
+automata = AutomataReconocedor()
+automata.compilar()
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.argv[2] == 'mapeado':
+    with open(os.devnull, 'w') as descarte, contextlib.redirect_stdout(descarte):
+        procesar_archivo(automata, sys.argv[1])
+else:
+    # Método anterior: concatenar el archivo completo y tokenizarlo de una vez
+    lineas = ''
+    with open(sys.argv[1], 'r', encoding='utf-8') as archivo:
+        for linea in archivo:
+            lineas += linea.strip()
+    automata.reconocer(lineas.replace(' ', ''))
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base)
+"""
+
+
+def benchmark_memoria_archivo(tamanios=(5_000_000, 20_000_000, 50_000_000)):
+    """
+    Compara el pico de RSS de procesar_archivo (mapa de memoria, por trozos) contra
+    leer y concatenar el archivo completo, según el tamaño del archivo (solo Unix)
+    """
+    print("=== procesar_archivo: pico de memoria según tamaño del archivo ===")
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as temporal:
+        ruta = os.path.join(temporal, 'programa.txt')
+        for bytes_objetivo in tamanios:
+            with open(ruta, 'w', encoding='utf-8') as archivo:
+                archivo.write(programa_pascal(bytes_objetivo))
+            tamanio = os.path.getsize(ruta)
+            picos = {}
+            for metodo in ('mapeado', 'completo'):
+                salida = subprocess.run([sys.executable, '-c', CODIGO_MEMORIA, ruta, metodo, directorio],
+                                        capture_output=True, text=True, check=True).stdout
+                picos[metodo] = int(salida.split()[-1]) / 1024  # ru_maxrss está en KB en Linux
+            print(f"  {tamanio / 1_000_000:8.1f} MB | mapa de memoria +{picos['mapeado']:8.1f} MB RSS | "
+                  f"lectura completa +{picos['completo']:8.1f} MB RSS")
+
+
+def leer_tamanio(texto):
+    """
+    Convierte '1K', '10M', '2G' o '500' en bytes
+    """
+    multiplicadores = {'K': 1_000, 'M': 1_000_000, 'G': 1_000_000_000}
+    texto = texto.strip().upper()
+    if texto and texto[-1] in multiplicadores:
+        return int(float(texto[:-1]) * multiplicadores[texto[-1]])
+    return int(texto)
+
+
+def funcion_medida(automata, nombre, directorio):
+    """
+    Devuelve (preparar, ejecutar) para medir la función indicada
+    preparar(cadena) se ejecuta fuera de la medición y devuelve el argumento de ejecutar.
+    """
+    if nombre == 'procesar_archivo':
+        def preparar(cadena):
+            ruta = os.path.join(directorio, 'carga.txt')
+            with open(ruta, 'w', encoding='utf-8') as archivo:
+                archivo.write(cadena)
+            return ruta
+
+        def ejecutar(ruta):
+            with open(os.devnull, 'w') as descarte, contextlib.redirect_stdout(descarte):
+                procesar_archivo(automata, ruta)
+        return preparar, ejecutar
+    if nombre.startswith('AutomataPila.'):
+        pila = AutomataPila()
+        pila.trazador = automata.trazador
+        return (lambda cadena: cadena), getattr(pila, nombre.partition('.')[2])
+    return (lambda cadena: cadena), getattr(automata, nombre)
+
+
+def ejecutar_suite(tamanios, mediciones=MEDICIONES):
+    """
+    Mide cada función sobre cada carga y tamaño; devuelve la lista de resultados
+    """
+    automata = AutomataReconocedor()
+    automata.trazador = Trazador.apagado()
+    resultados = []
+    with tempfile.TemporaryDirectory() as directorio:
+        for nombre, cargas in mediciones:
+            preparar, ejecutar = funcion_medida(automata, nombre, directorio)
+            for carga in cargas:
+                for bytes_objetivo in tamanios:
+                    cadena = CARGAS[carga](bytes_objetivo)
+                    argumento = preparar(cadena)
+                    repeticiones = 1 if len(cadena) >= 10_000_000 else 3
+                    tiempo = medir(ejecutar, argumento, repeticiones=repeticiones)
+                    resultado = {
+                        'funcion': nombre,
+                        'carga': carga,
+                        'bytes': len(cadena),
+                        'segundos': tiempo,
+                        'mb_por_segundo': len(cadena) / 1_000_000 / tiempo if tiempo else None,
+                    }
+                    resultados.append(resultado)
+                    print(f"  {nombre:<30} {carga:<10} {len(cadena):>11} B | "
+                          f"{tiempo * 1000:11.2f} ms | {resultado['mb_por_segundo']:8.2f} MB/s")
+                    del cadena, argumento
+    return resultados
+
+
+def version_actual():
+    """
+    Devuelve el commit de git del reconocedor, si está disponible
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def comparar(resultados, ruta_anterior, umbral=0.10):
+    """
+    Compara contra una corrida guardada y marca las regresiones mayores al umbral
+    Devuelve la cantidad de regresiones
+    """
+    with open(ruta_anterior, encoding='utf-8') as archivo:
+        anteriores = json.load(archivo)
+    previos = {(r['funcion'], r['carga'], r['bytes']): r['segundos'] for r in anteriores['resultados']}
+    regresiones = 0
+    print(f"\n=== Comparación contra {ruta_anterior} ({anteriores.get('version')}) ===")
+    for resultado in resultados:
+        clave = (resultado['funcion'], resultado['carga'], resultado['bytes'])
+        if clave not in previos:
+            continue
+        relacion = resultado['segundos'] / previos[clave]
+        marca = ''
+        if relacion > 1 + umbral:
+            marca = '  <-- REGRESIÓN'
+            regresiones += 1
+        print(f"  {clave[0]:<30} {clave[1]:<10} {clave[2]:>11} B | x{relacion:6.2f}{marca}")
+    return regresiones
+
+
+def ejecutar_comparativas():
+    """
+    Comparaciones entre implementaciones (AFND/AFD, trazas, tokenizador, segmentación,
+    lote, arranque desde .jff, autómata de pila, memoria de procesar_archivo)
+    """
+    automata = AutomataReconocedor()
+    benchmark_afd_vs_afn(automata)
+    benchmark_mascaras(automata)
+    benchmark_trazas(automata)
+    benchmark_estadisticas(automata)
+    benchmark_tokenizador(automata)
+    benchmark_reservadas(automata)
+    benchmark_flujo_compacto(automata)
+    benchmark_vectorizado(automata)
+    benchmark_generado(automata)
+    benchmark_segmentacion(automata)
+    benchmark_adversario(automata)
+    benchmark_lote()
+    benchmark_compartidas()
+    benchmark_carga_jff()
+    benchmark_cache()
+    benchmark_edicion()
+    benchmark_servidor()
+    benchmark_validacion()
+    benchmark_generador()
+    benchmark_pila()
+    benchmark_memoria_archivo()
+    benchmark_bloques()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del reconocedor de gramática")
+    parser.add_argument('--tamanios', default='1K,10K,100K,1M',
+                        help="tamaños de las cargas separados por coma (p. ej. 1K,1M,100M)")
+    parser.add_argument('--funciones', help="limitar la suite a estas funciones (separadas por coma)")
+    parser.add_argument('--salida', help="archivo JSON donde guardar los resultados")
+    parser.add_argument('--comparar', help="archivo JSON de una corrida anterior")
+    parser.add_argument('--umbral', type=float, default=0.10,
+                        help="aumento relativo de tiempo considerado regresión (por defecto 0.10)")
+    parser.add_argument('--comparativas', action='store_true',
+                        help="ejecutar las comparaciones entre implementaciones en lugar de la suite")
+    argumentos = parser.parse_args()
+
+    if argumentos.comparativas:
+        ejecutar_comparativas()
+        return
+
+    tamanios = [leer_tamanio(tamanio) for tamanio in argumentos.tamanios.split(',')]
+    mediciones = MEDICIONES
+    if argumentos.funciones:
+        elegidas = argumentos.funciones.split(',')
+        mediciones = [(nombre, cargas) for nombre, cargas in MEDICIONES if nombre in elegidas]
+
+    print("=== Suite de benchmarks ===")
+    resultados = ejecutar_suite(tamanios, mediciones)
+    informe = {
+        'version': version_actual(),
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'resultados': resultados,
+    }
+    if argumentos.salida:
+        with open(argumentos.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(informe, archivo, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {argumentos.salida}")
+    if argumentos.comparar and comparar(resultados, argumentos.comparar, argumentos.umbral):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -46,6 +46,550 @@ Estados:
 - q20: Estado después de "hacer" anidado (bucle con <instrucciones>, termina con "finmientras")
 - q21: Estado después de "sino" anidado (bucle con <instrucciones>, termina con "finsi")
 """
+import contextlib
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import time
+import xml.etree.ElementTree as ET
+from array import array
+from collections import OrderedDict, deque
+
+try:
+    import numpy  # Opcional: solo lo usa la clasificación vectorizada de lotes
+except ImportError:
+    numpy = None
+
+# Lexemas que no son palabras reservadas ([^\W_] equivale a un caracter de str.isalnum())
+# - asignacion: variable=<expresion> o variable=expresion
+# - elemento: <contenido> o una palabra alfanumérica
+PATRON_LEXEMA = re.compile(
+    r'(?P<asignacion>(?P<variable>[^\W_]+)=(?:<[^\W_]+>|(?P<expresion>[^\W_]+)))'
+    r'|(?P<elemento><[^\W_]+>|[^\W_]+)')
+
+# Palabras de una entrada con espacios (mismo criterio que str.split())
+PATRON_PALABRA = re.compile(r'\S+')
+
+# Un espacio en blanco cualquiera (los que separan las palabras en str.split())
+PATRON_ESPACIO = re.compile(r'\s')
+
+# Directorio donde se guardan los autómatas compilados a partir de archivos .jff
+DIRECTORIO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache_reconocedor')
+
+# La gramática por tokens en formato JFLAP (generada con exportar_jff): tiene que coincidir
+# con las tablas de AutomataReconocedor.__init__ (ver diferencias_gramatica_jff)
+RUTA_JFF_GRAMATICA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gramatica_tokens.jff')
+
+# Caracteres del pseudocódigo que procesar_archivo muestra antes del resultado
+LARGO_VISTA_PREVIA = 120
+
+# Tamaño máximo (en bytes) de cada trozo que leer_lineas_mapeadas decodifica de una vez
+TAM_BLOQUE_LECTURA = 1 << 20
+
+# Caracteres después de un token que DocumentoIncremental examina para acotar su alcance
+LARGO_MAXIMO_ALCANCE = 1024
+
+# Caracteres sin ningún ' ' que ReconocedorIncremental (modo 'auto') guarda antes de
+# decidirse por 'sin_espacios'
+LARGO_DETECCION_MODO = 64 * 1024
+
+# Dirección por defecto del servidor de reconocimiento ('host:puerto' o 'unix:/ruta')
+DIRECCION_SERVIDOR = '127.0.0.1:8765'
+
+# Largo máximo (en bytes) de una línea del protocolo del servidor
+LARGO_MAXIMO_PEDIDO = 64 * 1024 * 1024
+
+# Espacio mínimo que ocupa una entrada de CacheResultados en disco (un bloque)
+TAM_ENTRADA_DISCO = 4096
+
+# Administrador de contexto vacío para las fases cuando las estadísticas están desactivadas
+SIN_MEDICION = contextlib.nullcontext()
+
+# Versión del formato de la cache (cambiarla invalida las entradas anteriores)
+VERSION_CACHE = 2
+
+# Versión del código que escribe generar_codigo (cambiarla invalida los módulos generados)
+VERSION_GENERADOR = 4
+
+# Lexemas distintos que el reconocedor generado recuerda ya clasificados
+LARGO_MAXIMO_MEMO = 1 << 16
+
+# Marca y versión del formato de TablasCompartidas (cambiar la versión si cambia el formato)
+MARCA_COMPARTIDA = b'AFDTABLA'
+VERSION_COMPARTIDA = 2
+
+# Plantilla del módulo que escribe AutomataReconocedor.generar_codigo
+PLANTILLA_RECONOCEDOR = """\
+# Reconocedor generado por AutomataReconocedor.generar_codigo para la gramática
+# {huella}
+# No editar: se vuelve a generar cuando cambia la gramática.
+import re
+
+PATRON_LEXEMA = re.compile({patron!r})
+
+INICIAL = {inicial}
+MUERTO = {muerto}
+FINALES = {finales!r}
+RESERVADAS = frozenset({reservadas!r})
+
+# SIGUIENTE[estado]: palabra reservada en minúsculas -> estado siguiente (solo las que no
+# van al estado muerto)
+SIGUIENTE = [
+{siguiente}
+]
+
+# Clases de los lexemas que no están en SIGUIENTE[estado]; RESERVADA es una palabra
+# reservada con mayúsculas, que se vuelve a buscar en SIGUIENTE en minúsculas
+ELEMENTO, ASIGNACION, INVALIDO, RESERVADA = 0, 1, 2, 3
+
+# OTROS[estado][clase]: estado siguiente para un lexema de las tres primeras clases
+OTROS = [
+{otros}
+]
+
+# PUNTO_COMA[estado]: estado siguiente con ';' pegado al final de una palabra
+PUNTO_COMA = {punto_coma!r}
+
+# Clase de cada lexema ya visto (hasta {largo_memo} lexemas además de las palabras reservadas)
+CLASES = dict.fromkeys(RESERVADAS, RESERVADA)
+LARGO_CLASES = len(CLASES) + {largo_memo}
+
+
+def clasificar(lexema):
+    if lexema.lower() in RESERVADAS:
+        return RESERVADA
+    coincidencia = PATRON_LEXEMA.fullmatch(lexema)
+    if coincidencia is None:
+        return INVALIDO
+    if coincidencia.lastgroup == 'elemento':
+        return ELEMENTO
+    variable, expresion = coincidencia.group('variable', 'expresion')
+    if variable.lower() in RESERVADAS or (expresion is not None and expresion.lower() in RESERVADAS):
+        return INVALIDO
+    return ASIGNACION
+
+
+def reconocer_palabras(palabras):
+    siguiente = SIGUIENTE
+    otros = OTROS
+    clases = CLASES
+    punto_coma = PUNTO_COMA
+    estado = INICIAL
+    for palabra in palabras:
+        con_punto_coma = palabra[-1] == ';' and len(palabra) > 1
+        if con_punto_coma:
+            palabra = palabra[:-1]
+        nuevo = siguiente[estado].get(palabra)
+        if nuevo is None:
+            clase = clases.get(palabra)
+            if clase is None:
+                clase = clasificar(palabra)
+                if len(clases) < LARGO_CLASES:
+                    clases[palabra] = clase
+            if clase == RESERVADA:
+                nuevo = siguiente[estado].get(palabra.lower(), MUERTO)
+            else:
+                nuevo = otros[estado][clase]
+            if nuevo == MUERTO:
+                return False
+        estado = nuevo
+        if con_punto_coma:
+            estado = punto_coma[estado]
+            if estado == MUERTO:
+                return False
+    return FINALES[estado]
+
+
+def reconocer(cadena, tokenizar_sin_espacios, dividir=str.split):
+    if ' ' in cadena:
+        return reconocer_palabras(dividir(cadena))
+    return reconocer_palabras(tokenizar_sin_espacios(cadena))
+"""
+
+
+class Trazador:
+    """
+    Destino de las trazas de procesar_cadena
+    Cada traza es un evento (diccionario con la clave 'evento') que se entrega a una
+    función. Niveles:
+    - APAGADO: no se emite nada (sin costo por token)
+    - RESUMEN: palabras procesadas, motivo del rechazo y resultado
+    - POR_TOKEN: además, el conjunto de estados después de cada token
+    """
+    APAGADO = 0
+    RESUMEN = 1
+    POR_TOKEN = 2
+    
+    def __init__(self, nivel=RESUMEN, funcion=None):
+        self.nivel = nivel if funcion is not None else Trazador.APAGADO
+        self.emitir = funcion
+        self._archivo = None
+    
+    @classmethod
+    def apagado(cls):
+        return cls(cls.APAGADO)
+    
+    @classmethod
+    def consola(cls, nivel=POR_TOKEN):
+        """
+        Imprime los eventos en la consola con el formato clásico del reconocedor
+        El resultado no se imprime: lo informan quienes llaman a procesar_cadena.
+        """
+        def imprimir(evento):
+            tipo = evento['evento']
+            if tipo == 'palabras':
+                print(f"Palabras procesadas: {evento['palabras']}")
+            elif tipo == 'invalida':
+                print(f"Palabra inválida encontrada: {evento['palabra']}")
+            elif tipo == 'sin_transicion':
+                print(f"No hay transición válida desde {formatear_estados(evento['estados'])} "
+                      f"con palabra '{evento['simbolo']}'")
+            elif tipo == 'transicion':
+                print(f"Después de '{evento['simbolo']}': estados actuales = "
+                      f"{formatear_estados(evento['estados'])}")
+        return cls(nivel, imprimir)
+    
+    @classmethod
+    def jsonl(cls, destino, nivel=RESUMEN):
+        """
+        Escribe cada evento como una línea JSON en un archivo (ruta o archivo abierto)
+        """
+        archivo = open(destino, 'w', encoding='utf-8') if isinstance(destino, str) else destino
+        
+        def escribir(evento):
+            archivo.write(json.dumps(evento, ensure_ascii=False) + '\n')
+        trazador = cls(nivel, escribir)
+        if archivo is not destino:
+            trazador._archivo = archivo
+        return trazador
+    
+    def cerrar(self):
+        """
+        Cierra el archivo abierto por Trazador.jsonl (si lo hay)
+        """
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+
+
+class Estadisticas:
+    """
+    Instrumentación opcional del reconocedor: tiempo acumulado por fase y contadores
+    Se activa asignando una instancia a automata.estadisticas; con None (por defecto)
+    el costo es una comparación por llamada (no por token).
+    Fases: tokenizacion, clasificacion, segmentacion, simulacion_afnd, afd, flujo.
+    """
+    CONTADORES = ('tokens', 'caracteres', 'intentos_palabra_reservada', 'pasos_segmentacion',
+                  'estados_visitados', 'pico_estados')
+    
+    def __init__(self):
+        self.reiniciar()
+    
+    def reiniciar(self):
+        """
+        Pone en cero los tiempos y contadores
+        """
+        self.tiempos = {}   # fase -> segundos acumulados
+        self.llamadas = {}  # fase -> cantidad de mediciones
+        self.tokens = 0
+        self.caracteres = 0
+        self.intentos_palabra_reservada = 0  # recorridos del trie de palabras reservadas
+        self.pasos_segmentacion = 0          # caracteres examinados por dividir_pascal_case
+        self.estados_visitados = 0           # suma de estados activos del AFND en cada paso
+        self.pico_estados = 0                # mayor cantidad de estados activos a la vez
+    
+    def fase(self, nombre):
+        """
+        Devuelve un administrador de contexto que suma a la fase el tiempo transcurrido
+        """
+        return _MedicionFase(self, nombre)
+    
+    def sumar_tiempo(self, nombre, segundos):
+        self.tiempos[nombre] = self.tiempos.get(nombre, 0.0) + segundos
+        self.llamadas[nombre] = self.llamadas.get(nombre, 0) + 1
+    
+    def como_dict(self):
+        """
+        Devuelve los tiempos y contadores como diccionario serializable en JSON
+        """
+        datos = {contador: getattr(self, contador) for contador in self.CONTADORES}
+        datos['fases'] = {nombre: {'segundos': self.tiempos[nombre], 'llamadas': self.llamadas[nombre]}
+                          for nombre in self.tiempos}
+        return datos
+    
+    def resumen(self):
+        """
+        Devuelve los tiempos y contadores como texto para la consola
+        """
+        lineas = ["ESTADÍSTICAS:"]
+        total = sum(self.tiempos.values())
+        for nombre, segundos in sorted(self.tiempos.items(), key=lambda item: -item[1]):
+            porcentaje = 100 * segundos / total if total else 0.0
+            lineas.append(f"  {nombre:<18} {segundos * 1000:10.3f} ms {porcentaje:5.1f}% "
+                          f"({self.llamadas[nombre]} llamadas)")
+        for contador in self.CONTADORES:
+            lineas.append(f"  {contador:<28} {getattr(self, contador)}")
+        return "\n".join(lineas)
+
+
+class _MedicionFase:
+    # Administrador de contexto de Estadisticas.fase
+    __slots__ = ('estadisticas', 'nombre', 'inicio')
+    
+    def __init__(self, estadisticas, nombre):
+        self.estadisticas = estadisticas
+        self.nombre = nombre
+    
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+    
+    def __exit__(self, *excepcion):
+        self.estadisticas.sumar_tiempo(self.nombre, time.perf_counter() - self.inicio)
+        return False
+
+
+def formatear_estados(estados):
+    """
+    Formatea un conjunto de estados como {'q1', 'q2'} en orden estable
+    """
+    return '{' + ', '.join(repr(estado) for estado in estados) + '}'
+
+
+class AFDCompilado:
+    """
+    AFD minimizado con estados y símbolos enteros
+    La tabla es plana: tabla[estado * n_simbolos + simbolo] -> estado siguiente
+    """
+    def __init__(self, simbolos, tabla, estado_inicial, estado_muerto, finales):
+        self.simbolos = simbolos  # categoría -> código entero
+        self.n_simbolos = len(simbolos)
+        self.tabla = tabla
+        self.estado_inicial = estado_inicial
+        self.estado_muerto = estado_muerto
+        self.finales = finales  # finales[estado] -> True si es de aceptación
+        self._densa = None
+    
+    def como_dict(self):
+        """
+        Devuelve el AFD como diccionario serializable en JSON
+        """
+        return {
+            'simbolos': sorted(self.simbolos, key=self.simbolos.get),
+            'tabla': list(self.tabla),
+            'estado_inicial': self.estado_inicial,
+            'estado_muerto': self.estado_muerto,
+            'finales': self.finales,
+        }
+    
+    @classmethod
+    def desde_dict(cls, datos):
+        """
+        Reconstruye el AFD a partir de como_dict()
+        """
+        simbolos = {simbolo: codigo for codigo, simbolo in enumerate(datos['simbolos'])}
+        return cls(simbolos, datos['tabla'], datos['estado_inicial'], datos['estado_muerto'],
+                   datos['finales'])
+    
+    def codificar(self, palabras):
+        """
+        Convierte la lista de categorías de analizar_palabras en códigos enteros
+        """
+        simbolos = self.simbolos
+        return [simbolos[palabra] for palabra in palabras]
+    
+    def aceptar(self, codigos):
+        """
+        Recorre el AFD con una consulta a la tabla por símbolo
+        """
+        tabla = self.tabla
+        n = self.n_simbolos
+        muerto = self.estado_muerto
+        estado = self.estado_inicial
+        for codigo in codigos:
+            estado = tabla[estado * n + codigo]
+            if estado == muerto:
+                return False
+        return self.finales[estado]
+    
+    def rechazo(self, codigos):
+        """
+        Devuelve None si el AFD acepta los códigos; si no, el índice del primer código sin
+        transición (len(codigos) si la entrada termina fuera de un estado final)
+        """
+        tabla = self.tabla
+        n = self.n_simbolos
+        muerto = self.estado_muerto
+        estado = self.estado_inicial
+        for indice, codigo in enumerate(codigos):
+            estado = tabla[estado * n + codigo]
+            if estado == muerto:
+                return indice
+        return None if self.finales[estado] else len(codigos)
+    
+    def tabla_densa(self):
+        """
+        Devuelve la tabla como array NumPy int32 con los estados multiplicados por n_simbolos
+        El estado siguiente de (e * n_simbolos, simbolo) es tabla_densa()[e * n_simbolos + simbolo],
+        ya multiplicado: un paso es una sola consulta, sin multiplicar. Requiere NumPy.
+        """
+        if self._densa is None:
+            self._densa = numpy.array(self.tabla, dtype=numpy.int32) * self.n_simbolos
+        return self._densa
+    
+    def clasificar_lote(self, secuencias, tam_bloque=16384):
+        """
+        Clasifica muchas secuencias de códigos a la vez
+        Devuelve (aceptadas, fallos): aceptadas[i] indica si la secuencia i es aceptada y
+        fallos[i] es -1 si lo es, o el índice que devolvería rechazo(). Con NumPy las
+        secuencias se concatenan y se clasifican con clasificar_plano(); sin NumPy devuelve
+        listas calculadas con rechazo().
+        """
+        if numpy is None:
+            fallos = [self.rechazo(codigos) for codigos in secuencias]
+            fallos = [-1 if fallo is None else fallo for fallo in fallos]
+            return [fallo == -1 for fallo in fallos], fallos
+        plano = array('B')
+        largos = array('I')
+        for codigos in secuencias:
+            plano.extend(codigos)
+            largos.append(len(codigos))
+        return self.clasificar_plano(plano, largos, tam_bloque)
+    
+    def clasificar_plano(self, plano, largos, tam_bloque=16384):
+        """
+        Como clasificar_lote, con las secuencias concatenadas en 'plano' y sus largos aparte
+        (array('B') y array('I'), bytes o arrays NumPy). Requiere NumPy.
+        Las secuencias se ordenan por largo y se copian por bloques a una matriz con relleno
+        (una fila por posición, contigua); cada paso avanza con tabla_densa() todas las
+        secuencias del bloque que todavía tienen símbolos, que por el orden son un prefijo
+        de la fila. El estado muerto absorbe las secuencias rechazadas.
+        """
+        plano = numpy.frombuffer(plano, dtype=numpy.uint8) if not isinstance(plano, numpy.ndarray) else plano
+        largos = numpy.asarray(largos, dtype=numpy.int64)
+        desplazamientos = numpy.cumsum(largos) - largos
+        orden = numpy.argsort(-largos, kind='stable')
+        densa = self.tabla_densa()
+        n = self.n_simbolos
+        muerto = self.estado_muerto * n
+        finales = numpy.array(self.finales, dtype=bool)
+        aceptadas = numpy.zeros(len(largos), dtype=bool)
+        fallos = numpy.full(len(largos), -1, dtype=numpy.int64)
+        
+        for desde in range(0, len(largos), tam_bloque):
+            filas = orden[desde:desde + tam_bloque]
+            largos_bloque = largos[filas]  # de mayor a menor
+            cantidad = len(filas)
+            columnas = int(largos_bloque[0])
+            # activas[c]: cantidad de secuencias con más de c símbolos
+            activas = numpy.searchsorted(-largos_bloque, -numpy.arange(columnas), side='left')
+            
+            inicios = desplazamientos[filas]
+            matriz = numpy.zeros((columnas, cantidad), dtype=numpy.uint8)
+            for columna in range(columnas):
+                k = activas[columna]
+                matriz[columna, :k] = plano.take(inicios[:k] + columna)
+            
+            estado = numpy.full(cantidad, self.estado_inicial * n, dtype=numpy.int32)
+            vivos = numpy.zeros(cantidad, dtype=numpy.int32)  # pasos antes del estado muerto
+            for columna in range(columnas):
+                k = activas[columna]
+                nuevo = densa.take(estado[:k] + matriz[columna, :k])
+                estado[:k] = nuevo
+                vivos[:k] += nuevo != muerto
+            
+            acepta = finales[estado // n]
+            aceptadas[filas] = acepta
+            fallos[filas] = numpy.where(acepta, -1, numpy.where(estado == muerto, vivos, largos_bloque))
+        return aceptadas, fallos
+
+
+class FlujoTokens:
+    """
+    Tokens de una entrada en forma compacta
+    codigos es un array('B') con el símbolo del AFD de cada token; inicios y largos son
+    arrays('I') paralelos con la posición de cada lexema en la entrada (fuente).
+    Ocupa 9 bytes por token en lugar de una tupla (categoria, inicio, fin) por token.
+    """
+    def __init__(self, fuente, codigos, inicios, largos, categorias):
+        self.fuente = fuente
+        self.codigos = codigos
+        self.inicios = inicios
+        self.largos = largos
+        self.categorias = categorias  # código -> nombre de la categoría
+    
+    def __len__(self):
+        return len(self.codigos)
+    
+    def __iter__(self):
+        # Mismas tuplas (categoria, inicio, fin) que AutomataReconocedor.lexer
+        categorias = self.categorias
+        for codigo, inicio, largo in zip(self.codigos, self.inicios, self.largos):
+            yield categorias[codigo], inicio, inicio + largo
+    
+    def categoria(self, indice):
+        """
+        Devuelve la categoría del token (p. ej. 'ELEMENTO')
+        """
+        return self.categorias[self.codigos[indice]]
+    
+    def lexema(self, indice):
+        """
+        Devuelve el texto del token en la entrada
+        """
+        inicio = self.inicios[indice]
+        return self.fuente[inicio:inicio + self.largos[indice]]
+
+
+class LimiteExcedido(ValueError):
+    """
+    La entrada supera uno de los límites del autómata (limite_caracteres o limite_tokens)
+    Se lanza en cuanto se detecta, sin terminar de tokenizar ni de reconocer la entrada.
+    """
+    def __init__(self, limite, maximo):
+        super().__init__(f"La entrada supera el límite de {maximo} {limite}")
+        self.limite = limite  # 'caracteres' o 'tokens'
+        self.maximo = maximo
+
+
+def _proxima(cadena, caracter, i, busquedas):
+    # cadena.find(caracter, i) recordando el resultado en busquedas[caracter] = (desde, hallada):
+    # entre desde y hallada no hay otro caracter igual, así que mientras i no pase de hallada
+    # (o nunca, si no se encontró) la respuesta es la misma y la cadena no se vuelve a recorrer
+    anterior = busquedas.get(caracter)
+    if anterior is not None:
+        desde, hallada = anterior
+        if desde <= i and (hallada >= i or hallada == -1):
+            return hallada
+    hallada = cadena.find(caracter, i)
+    busquedas[caracter] = (i, hallada)
+    return hallada
+
+
+# Palabras válidas del lenguaje de AutomataReconocedor, en minúsculas: se reconocen sin
+# distinguir mayúsculas de minúsculas (comienza, Comienza, COMIENZA...; ver clasificar_lexema)
+PALABRAS_VALIDAS = {
+    'comienza': 'COMIENZA',
+    'leer': 'LEER',
+    'escribir': 'ESCRIBIR',
+    'si': 'SI',
+    'entonces': 'ENTONCES',
+    'sino': 'SINO',
+    'finsi': 'FINSI',
+    'mientras': 'MIENTRAS',
+    'hacer': 'HACER',
+    'finmientras': 'FINMIENTRAS',
+    'repetir': 'REPETIR',
+    'hastaque': 'HASTAQUE',
+    'hasta': 'HASTAQUE',  # Versión corta
+    'termina': 'TERMINA',
+    ';': 'PUNTO_COMA',
+    '=': 'ASIGNACION',
+}
+
 
 class AutomataReconocedor:
     def __init__(self):
@@ -55,39 +599,8 @@ class AutomataReconocedor:
         self.estado_inicial = 'q0'
         self.estados_finales = {'q2'}
         
-        # Palabras válidas del lenguaje (incluye versiones en minúsculas y PascalCase)
-        self.palabras_validas = {
-            'comienza': 'COMIENZA',
-            'leer': 'LEER',
-            'escribir': 'ESCRIBIR',
-            'si': 'SI',
-            'entonces': 'ENTONCES',
-            'sino': 'SINO',
-            'finsi': 'FINSI',
-            'mientras': 'MIENTRAS',
-            'hacer': 'HACER',
-            'finmientras': 'FINMIENTRAS',
-            'repetir': 'REPETIR',
-            'hastaque': 'HASTAQUE',
-            'termina': 'TERMINA',
-            ';': 'PUNTO_COMA',
-            '=': 'ASIGNACION',
-            # Versiones en PascalCase
-            'Comienza': 'COMIENZA',
-            'Leer': 'LEER',
-            'Escribir': 'ESCRIBIR',
-            'Si': 'SI',
-            'Entonces': 'ENTONCES',
-            'Sino': 'SINO',
-            'FinSi': 'FINSI',
-            'Mientras': 'MIENTRAS',
-            'Hacer': 'HACER',
-            'FinMientras': 'FINMIENTRAS',
-            'Repetir': 'REPETIR',
-            'HastaQue': 'HASTAQUE',
-            'Hasta': 'HASTAQUE',  # Versión corta
-            'Termina': 'TERMINA'
-        }
+        # Palabras válidas del lenguaje (ver PALABRAS_VALIDAS)
+        self.palabras_validas = dict(PALABRAS_VALIDAS)
         
         # Transiciones del autómata
         # Formato: (estado_actual, simbolo) -> conjunto de estados siguientes
@@ -149,6 +662,58 @@ class AutomataReconocedor:
             ('q28', 'PUNTO_COMA'): {'q1'},  # asignación con punto y coma -> vuelve a q1
             ('q29', 'PUNTO_COMA'): {'q1'},  # escribir con punto y coma -> vuelve a q1
         }
+        
+        # Resolución de ELEMENTO según el contexto
+        # Formato: (estado, simbolo) en orden de prioridad; gana el primer estado activo
+        self.resolucion_elemento = [
+            ('q3', 'VARIABLE'),        # después de LEER
+            ('q4', 'EXPRESION'),       # después de ESCRIBIR
+            ('q6', 'CONDICION'),       # después de SI
+            ('q8', 'INSTRUCCIONES'),   # después de ENTONCES
+            ('q9', 'INSTRUCCIONES'),   # después de SINO
+            ('q10', 'CONDICION'),      # después de MIENTRAS
+            ('q12', 'INSTRUCCIONES'),  # después de HACER
+            ('q13', 'INSTRUCCIONES'),  # después de REPETIR
+            ('q14', 'CONDICION'),      # después de HASTAQUE
+            ('q15', 'CONDICION'),      # después de SI anidado
+            ('q17', 'INSTRUCCIONES'),  # después de ENTONCES anidado
+            ('q21', 'INSTRUCCIONES'),  # después de SINO anidado
+            ('q18', 'CONDICION'),      # después de MIENTRAS anidado
+            ('q20', 'INSTRUCCIONES'),  # después de HACER anidado
+        ]
+        
+        self._iniciar_campos()
+    
+    @classmethod
+    def _sin_tablas(cls):
+        # Instancia sin ejecutar __init__, para quien carga las tablas de la gramática desde
+        # otro lado (la cache de desde_jff, TablasCompartidas.automata)
+        automata = cls.__new__(cls)
+        automata._iniciar_campos()
+        return automata
+    
+    def _iniciar_campos(self):
+        # Campos que no son tablas de la gramática
+        # Destino de las trazas de procesar_cadena (por defecto, la consola)
+        self.trazador = Trazador.consola()
+        
+        # Instrumentación opcional (ver Estadisticas); None = desactivada
+        self.estadisticas = None
+        
+        # Tamaño máximo de una entrada en caracteres y en tokens (None = sin límite);
+        # una entrada más grande produce LimiteExcedido en cuanto se detecta
+        self.limite_caracteres = None
+        self.limite_tokens = None
+        
+        # AFD compilado, máscaras del AFND y trie de palabras reservadas (se construyen bajo demanda)
+        self._afd = None
+        self._mascaras = None
+        self._trie = None
+        self._reservadas = None
+        self._generado = None
+        
+        # Segmento de TablasCompartidas del que se leen las tablas (None = tablas propias)
+        self._compartidas = None
     
     def es_variable(self, palabra):
         """
@@ -156,7 +721,8 @@ class AutomataReconocedor:
         Solo acepta variables sin < > (para leer y lado izquierdo de asignaciones)
         """
         # Variable sin < > (para leer y asignaciones)
-        if palabra.isalnum() and palabra not in self.palabras_validas:
+        reservadas = self._reservadas or self.construir_tabla_reservadas()
+        if palabra.isalnum() and palabra.lower() not in reservadas:
             return True
         return False
     
@@ -170,7 +736,7 @@ class AutomataReconocedor:
             contenido = palabra[1:-1]  # Quita los < >
             return len(contenido) > 0 and contenido.isalnum()
         # Expresión sin < > (para escribir)
-        elif palabra.isalnum() and palabra not in self.palabras_validas:
+        elif palabra.isalnum() and palabra.lower() not in (self._reservadas or self.construir_tabla_reservadas()):
             return True
         return False
     
@@ -180,18 +746,19 @@ class AutomataReconocedor:
         La variable debe ser sin < > y la expresión puede ser con o sin < >
         Nota: El punto y coma ahora es un token separado
         """
+        reservadas = self._reservadas or self.construir_tabla_reservadas()
         if '=' in palabra:
             partes = palabra.split('=', 1)  # Dividir solo en el primer =
             if len(partes) == 2:
                 variable, expresion = partes
                 # Variable sin < > (obligatorio)
-                if variable.isalnum() and variable not in self.palabras_validas:
+                if variable.isalnum() and variable.lower() not in reservadas:
                     # Expresión con < >
                     if expresion.startswith('<') and expresion.endswith('>'):
                         exp_contenido = expresion[1:-1]  # quitar < >
                         return len(exp_contenido) > 0 and exp_contenido.isalnum()
                     # Expresión sin < >
-                    elif expresion.isalnum() and expresion not in self.palabras_validas:
+                    elif expresion.isalnum() and expresion.lower() not in reservadas:
                         return True
         return False
     
@@ -215,383 +782,3013 @@ class AutomataReconocedor:
             return len(contenido) > 0 and contenido.isalnum()
         return False
     
+    def construir_tabla_reservadas(self):
+        """
+        Construye la tabla palabra en minúsculas -> categoría de las palabras reservadas
+        Un lexema se busca una vez, como lexema.lower(): 'si', 'Si' y 'SI' son la misma
+        entrada, y la tabla tiene una por palabra sin importar el largo de las palabras.
+        """
+        self._reservadas = {palabra.lower(): categoria for palabra, categoria in self.palabras_validas.items()}
+        return self._reservadas
+    
+    def construir_trie(self):
+        """
+        Construye el trie de palabras reservadas (sin ';') para búsquedas por posición
+        Cada nodo es un diccionario caracter -> nodo; la clave '' marca fin de palabra y
+        guarda la palabra en minúsculas. La mayúscula y la minúscula de cada letra llevan
+        al mismo nodo, así que el trie tiene un camino por palabra y no distingue mayúsculas.
+        """
+        raiz = {}
+        for palabra in self.palabras_validas:
+            if palabra == ';':
+                continue
+            nodo = raiz
+            for caracter in palabra:
+                siguiente = nodo.get(caracter)
+                if siguiente is None:
+                    siguiente = {}
+                    for variante in {caracter.lower(), caracter.upper()}:
+                        nodo[variante] = siguiente
+                nodo = siguiente
+            nodo[''] = palabra
+        self._trie = raiz
+        return raiz
+    
     def dividir_pascal_case(self, texto):
         """
         Divide una cadena PascalCase concatenada en palabras individuales
         Ej: 'ComenzaSi' -> ['Comienza', 'Si']
+        Devuelve la división con más palabras (a igualdad, la de palabras más largas
+        primero). Programación dinámica de derecha a izquierda: O(n·k) con k la
+        longitud de la palabra reservada más larga, guardando una sola elección por posición.
         """
         if not texto:
             return []
-            
-        # Obtener todas las palabras válidas excluyendo símbolos especiales
-        palabras_validas = [p for p in self.palabras_validas.keys() 
-                           if p not in [';'] and not p.startswith('<')]
         
-        palabras_posibles = []
+        trie = self._trie or self.construir_trie()
+        n = len(texto)
         
-        def buscar_division(texto_restante, palabras_actuales):
-            if not texto_restante:
-                palabras_posibles.append(palabras_actuales[:])
-                return
-            
-            # Intentar encontrar palabras que empiecen en la posición actual
-            for palabra in sorted(palabras_validas, key=len, reverse=True):
-                if texto_restante.startswith(palabra):
-                    palabras_actuales.append(palabra)
-                    buscar_division(texto_restante[len(palabra):], palabras_actuales)
-                    palabras_actuales.pop()
+        # cantidad[i]: máximo de palabras en que se puede dividir texto[i:] (-1 si no se puede)
+        # elegida[i]: fin de la palabra elegida que empieza en i
+        cantidad = [-1] * (n + 1)
+        elegida = [0] * (n + 1)
+        cantidad[n] = 0
+        pasos = 0
+        
+        for i in range(n - 1, -1, -1):
+            nodo = trie
+            j = i
+            mejor = -1
+            # El trie recorre de la palabra más corta a la más larga: con >= gana la más larga
+            while j < n:
+                nodo = nodo.get(texto[j])
+                if nodo is None:
+                    break
+                j += 1
+                if '' in nodo and cantidad[j] >= 0 and cantidad[j] + 1 >= mejor:
+                    mejor = cantidad[j] + 1
+                    elegida[i] = j
+            cantidad[i] = mejor
+            pasos += j - i + 1
         
-        buscar_division(texto, [])
+        if self.estadisticas is not None:
+            self.estadisticas.pasos_segmentacion += pasos
+            self.estadisticas.caracteres += n
         
-        # Retornar la división más larga (más palabras encontradas)
-        if palabras_posibles:
-            return max(palabras_posibles, key=len)
-        return []
+        if cantidad[0] < 0:
+            return []
+        
+        palabras = []
+        i = 0
+        while i < n:
+            palabras.append(texto[i:elegida[i]])
+            i = elegida[i]
+        return palabras
 
+    def _verificar_caracteres(self, cantidad):
+        # LimiteExcedido si una entrada de 'cantidad' caracteres supera limite_caracteres
+        if self.limite_caracteres is not None and cantidad > self.limite_caracteres:
+            raise LimiteExcedido('caracteres', self.limite_caracteres)
+    
+    def _verificar_tokens(self, cantidad):
+        # LimiteExcedido si 'cantidad' tokens superan limite_tokens
+        if self.limite_tokens is not None and cantidad > self.limite_tokens:
+            raise LimiteExcedido('tokens', self.limite_tokens)
+    
+    def dividir_palabras(self, entrada):
+        """
+        Separa una entrada con espacios en palabras (str.split()) respetando los límites
+        Cada palabra es uno o dos tokens (dos si termina con ';').
+        """
+        self._verificar_caracteres(len(entrada))
+        palabras = entrada.split()
+        if self.limite_tokens is not None and 2 * len(palabras) > self.limite_tokens:
+            self._verificar_tokens(sum(2 if palabra[-1] == ';' and len(palabra) > 1 else 1
+                                       for palabra in palabras))
+        return palabras
+    
     def tokenizar_cadena_sin_espacios(self, cadena):
         """
         Tokeniza una cadena que puede estar escrita sin espacios en PascalCase
         Reconoce palabras PascalCase consecutivas como tokens separados
+        O(n): las búsquedas hacia adelante se comparten entre tokens (ver siguiente_token_sin_espacios)
         """
+        self._verificar_caracteres(len(cadena))
+        maximo = self.limite_tokens
+        siguiente_token = self.siguiente_token_sin_espacios
+        busquedas = {}
         tokens = []
         i = 0
+        n = len(cadena)
         
-        while i < len(cadena):
-            token_encontrado = False
-            
-            # Buscar asignaciones <var>=<exp> primero (más específico)
-            if cadena[i] == '<':
+        while i < n:
+            encontrados, i = siguiente_token(cadena, i, True, busquedas)
+            tokens.extend(encontrados)
+            if maximo is not None and len(tokens) > maximo:
+                raise LimiteExcedido('tokens', maximo)
+        
+        return tokens
+    
+    def siguiente_token_sin_espacios(self, cadena, i, final=True, busquedas=None):
+        """
+        Reconoce el token (y el ';' que lo sigue, si lo hay) que comienza en cadena[i]
+        Devuelve (tokens, siguiente posición).
+        Con final=False la cadena es un prefijo de la entrada: si la decisión depende
+        de caracteres que todavía no llegaron devuelve None (ver ReconocedorIncremental).
+        busquedas es un diccionario (vacío al empezar) que quien recorre la cadena pasa en
+        cada llamada: guarda dónde está el próximo '>', '<', ';' e '=' (ver _proxima), así
+        cada caracter se examina una cantidad acotada de veces aunque los tokens sean de
+        un solo caracter o haya un '<' sin cerrar. Sin busquedas, una llamada es O(n).
+        """
+        n = len(cadena)
+        if busquedas is None:
+            busquedas = {}
+        
+        def con_punto_coma(token, fin):
+            # Verificar si termina con punto y coma
+            if fin == n and not final:
+                return None
+            if fin < n and cadena[fin] == ';':
+                return [token, ';'], fin + 1
+            return [token], fin
+        
+        # Buscar asignaciones <var>=<exp> primero (más específico)
+        if cadena[i] == '<':
+            primer_cierre = _proxima(cadena, '>', i, busquedas)
+            if primer_cierre == -1:
+                if not final:
+                    return None
+            else:
                 # Buscar patrón <var>=<exp>
-                primer_cierre = cadena.find('>', i)
-                if primer_cierre != -1 and primer_cierre + 1 < len(cadena) and cadena[primer_cierre + 1] == '=':
+                if primer_cierre + 1 < n and cadena[primer_cierre + 1] == '=':
                     segundo_inicio = primer_cierre + 2
-                    if segundo_inicio < len(cadena) and cadena[segundo_inicio] == '<':
-                        segundo_cierre = cadena.find('>', segundo_inicio)
+                    if segundo_inicio == n and not final:
+                        return None
+                    if segundo_inicio < n and cadena[segundo_inicio] == '<':
+                        segundo_cierre = _proxima(cadena, '>', segundo_inicio, busquedas)
                         if segundo_cierre != -1:
-                            asignacion = cadena[i:segundo_cierre+1]
-                            # Verificar si termina con punto y coma
-                            if segundo_cierre + 1 < len(cadena) and cadena[segundo_cierre + 1] == ';':
-                                tokens.append(asignacion)
-                                tokens.append(';')
-                                i = segundo_cierre + 2
-                            else:
-                                tokens.append(asignacion)
-                                i = segundo_cierre + 1
-                            token_encontrado = True
-                
-                # Si no es asignación, buscar elementos <...> simples
-                if not token_encontrado:
-                    fin_elemento = cadena.find('>', i)
-                    if fin_elemento != -1:
-                        elemento = cadena[i:fin_elemento+1]
-                        # Verificar si termina con punto y coma
-                        if fin_elemento + 1 < len(cadena) and cadena[fin_elemento + 1] == ';':
-                            tokens.append(elemento)
-                            tokens.append(';')
-                            i = fin_elemento + 2
-                        else:
-                            tokens.append(elemento)
-                            i = fin_elemento + 1
-                        token_encontrado = True
-            
-            # Buscar punto y coma individual
-            elif cadena[i] == ';':
-                tokens.append(';')
-                i += 1
-                token_encontrado = True
-            
-            # Buscar palabras reservadas o asignaciones
-            if not token_encontrado:
-                # Primero intentar encontrar una palabra reservada al inicio
-                palabra_encontrada_inicial = None
-                for palabra in sorted(self.palabras_validas.keys(), key=len, reverse=True):
-                    if palabra != ';' and cadena[i:].startswith(palabra):
-                        palabra_encontrada_inicial = palabra
-                        break
+                            return con_punto_coma(cadena[i:segundo_cierre + 1], segundo_cierre + 1)
+                        if not final:
+                            return None
                 
-                # Si encontramos una palabra reservada al inicio, agregarla
-                if palabra_encontrada_inicial:
-                    tokens.append(palabra_encontrada_inicial)
-                    i += len(palabra_encontrada_inicial)
-                    token_encontrado = True
-                else:
-                    # Si no hay palabra reservada, buscar asignación o elemento
-                    # Buscar hacia adelante hasta encontrar un delimitador
-                    j = i
-                    while j < len(cadena) and cadena[j] not in '<;':
-                        j += 1
-                    
-                    segmento_texto = cadena[i:j]
-                    
-                    # Si contiene '=', es una asignación
-                    if '=' in segmento_texto:
-                        partes = segmento_texto.split('=', 1)
-                        variable = partes[0]
-                        
-                        # Si la expresión viene después con <
-                        if j < len(cadena) and cadena[j] == '<':
-                            fin_exp = cadena.find('>', j)
-                            if fin_exp != -1:
-                                expresion = cadena[j:fin_exp+1]
-                                asignacion_completa = variable + '=' + expresion
-                                
-                                # Verificar si termina con punto y coma
-                                if fin_exp + 1 < len(cadena) and cadena[fin_exp + 1] == ';':
-                                    tokens.append(asignacion_completa)
-                                    tokens.append(';')
-                                    i = fin_exp + 2
-                                else:
-                                    tokens.append(asignacion_completa)
-                                    i = fin_exp + 1
-                                token_encontrado = True
-                        elif len(partes) > 1 and partes[1]:
-                            # La expresión está en el mismo segmento (sin ángulos)
-                            tokens.append(segmento_texto)
-                            i = j
-                            token_encontrado = True
-            
-            if not token_encontrado:
-                # Token no reconocido, avanzar un caracter y marcarlo como inválido
-                tokens.append(cadena[i])
-                i += 1
+                # Si no es asignación, es un elemento <...> simple
+                return con_punto_coma(cadena[i:primer_cierre + 1], primer_cierre + 1)
         
-        return tokens
+        # Buscar punto y coma individual
+        elif cadena[i] == ';':
+            return [';'], i + 1
+        
+        # Buscar palabras reservadas: la más larga que empiece en i (recorriendo el trie)
+        nodo = self._trie or self.construir_trie()
+        palabra_encontrada = None
+        j = i
+        while j < n:
+            nodo = nodo.get(cadena[j])
+            if nodo is None:
+                break
+            j += 1
+            if '' in nodo:
+                palabra_encontrada = nodo['']
+        if j == n and nodo is not None and not final:
+            return None
+        if palabra_encontrada:
+            # El token es el texto de la entrada (con sus mayúsculas)
+            fin = i + len(palabra_encontrada)
+            return [cadena[i:fin]], fin
+        
+        # Si no hay palabra reservada, buscar asignación o elemento
+        # Buscar hacia adelante hasta encontrar un delimitador ('<' o ';')
+        j = _proxima(cadena, '<', i, busquedas)
+        punto_coma = _proxima(cadena, ';', i, busquedas)
+        if j == -1:
+            j = n
+        if punto_coma != -1 and punto_coma < j:
+            j = punto_coma
+        if j == n and not final:
+            return None
+        
+        # Si el segmento cadena[i:j] contiene '=', es una asignación
+        igual = _proxima(cadena, '=', i, busquedas)
+        if igual != -1 and igual < j:
+            # Si la expresión viene después con <
+            if j < n and cadena[j] == '<':
+                fin_exp = _proxima(cadena, '>', j, busquedas)
+                if fin_exp != -1:
+                    # variable + '=' + expresion, de cadena[i:igual] y cadena[j:fin_exp + 1]
+                    return con_punto_coma(cadena[i:igual + 1] + cadena[j:fin_exp + 1], fin_exp + 1)
+                if not final:
+                    return None
+            elif igual + 1 < j:
+                # La expresión está en el mismo segmento (sin ángulos)
+                return [cadena[i:j]], j
+        
+        # Token no reconocido, avanzar un caracter (se clasificará más adelante)
+        return [cadena[i]], i + 1
+
+    def clasificar_lexema(self, lexema):
+        """
+        Devuelve la categoría de un lexema sin punto y coma final
+        Una consulta a la tabla de palabras reservadas con el lexema en minúsculas (sin
+        distinguir mayúsculas) y, si no lo es, un único match contra PATRON_LEXEMA (equivale
+        a es_asignacion / es_variable / es_expresion / es_condicion / es_instrucciones)
+        """
+        reservadas = self._reservadas or self.construir_tabla_reservadas()
+        categoria = reservadas.get(lexema.lower())
+        if categoria is not None:
+            return categoria
+        coincidencia = PATRON_LEXEMA.fullmatch(lexema)
+        if coincidencia is None:
+            return 'INVALIDO'
+        if coincidencia.lastgroup == 'elemento':
+            # Las clasificamos como elementos genéricos
+            # El contexto determinará si es VARIABLE, EXPRESION, CONDICION o INSTRUCCIONES
+            return 'ELEMENTO'
+        # Asignación: ni la variable ni la expresión sin < > pueden ser palabras reservadas
+        variable, expresion = coincidencia.group('variable', 'expresion')
+        if variable.lower() in reservadas or (expresion is not None and expresion.lower() in reservadas):
+            return 'INVALIDO'
+        return 'ASIGNACION'
+    
+    def clasificar_palabra(self, palabra):
+        """
+        Devuelve las categorías de una palabra: una, o dos si termina con punto y coma
+        """
+        # Verificar si la palabra termina con punto y coma (se agrega como token separado)
+        if palabra.endswith(';') and len(palabra) > 1:
+            return [self.clasificar_lexema(palabra[:-1]), 'PUNTO_COMA']
+        return [self.clasificar_lexema(palabra)]
+    
+    def lexer(self, entrada):
+        """
+        Recorre la entrada y genera (categoria, inicio, fin) para cada token
+        inicio y fin son posiciones en la entrada (el lexema es entrada[inicio:fin]).
+        Con espacios separa por espacios en blanco; sin espacios usa el tokenizador PascalCase.
+        Respeta limite_caracteres y limite_tokens (LimiteExcedido antes de pasar el límite).
+        """
+        self._verificar_caracteres(len(entrada))
+        maximo = self.limite_tokens
+        cantidad = 0
+        clasificar = self.clasificar_lexema
+        if ' ' in entrada:
+            for coincidencia in PATRON_PALABRA.finditer(entrada):
+                palabra = coincidencia.group()
+                inicio, fin = coincidencia.span()
+                cantidad += 1
+                if palabra.endswith(';') and len(palabra) > 1:
+                    cantidad += 1
+                    if maximo is not None and cantidad > maximo:
+                        raise LimiteExcedido('tokens', maximo)
+                    yield clasificar(palabra[:-1]), inicio, fin - 1
+                    yield 'PUNTO_COMA', fin - 1, fin
+                else:
+                    if maximo is not None and cantidad > maximo:
+                        raise LimiteExcedido('tokens', maximo)
+                    yield clasificar(palabra), inicio, fin
+        else:
+            siguiente_token = self.siguiente_token_sin_espacios
+            busquedas = {}
+            i = 0
+            n = len(entrada)
+            while i < n:
+                tokens, siguiente = siguiente_token(entrada, i, True, busquedas)
+                cantidad += len(tokens)
+                if maximo is not None and cantidad > maximo:
+                    raise LimiteExcedido('tokens', maximo)
+                if len(tokens) == 2:
+                    # Token seguido de punto y coma
+                    yield clasificar(tokens[0]), i, siguiente - 1
+                    yield 'PUNTO_COMA', siguiente - 1, siguiente
+                else:
+                    yield clasificar(tokens[0]), i, siguiente
+                i = siguiente
 
+    def tokenizar_compacto(self, entrada):
+        """
+        Tokeniza la entrada en un FlujoTokens con los códigos del AFD compilado
+        Misma tokenización que lexer(); cada lexema distinto se clasifica una sola vez.
+        """
+        afd = self._afd or self.compilar()
+        simbolos = afd.simbolos
+        clasificar = self.clasificar_lexema
+        codigos = array('B')
+        inicios = array('I')
+        largos = array('I')
+        agregar_codigo = codigos.append
+        agregar_inicio = inicios.append
+        agregar_largo = largos.append
+        conocidos = {}  # lexema -> código
+        
+        self._verificar_caracteres(len(entrada))
+        if ' ' in entrada:
+            maximo = self.limite_tokens
+            punto_coma = simbolos['PUNTO_COMA']
+            for coincidencia in PATRON_PALABRA.finditer(entrada):
+                if maximo is not None and len(codigos) > maximo:
+                    raise LimiteExcedido('tokens', maximo)
+                palabra = coincidencia.group()
+                inicio = coincidencia.start()
+                largo = len(palabra)
+                if palabra[-1] == ';' and largo > 1:
+                    palabra = palabra[:-1]
+                    largo -= 1
+                    codigo = conocidos.get(palabra)
+                    if codigo is None:
+                        codigo = conocidos[palabra] = simbolos[clasificar(palabra)]
+                    agregar_codigo(codigo)
+                    agregar_inicio(inicio)
+                    agregar_largo(largo)
+                    agregar_codigo(punto_coma)
+                    agregar_inicio(inicio + largo)
+                    agregar_largo(1)
+                else:
+                    codigo = conocidos.get(palabra)
+                    if codigo is None:
+                        codigo = conocidos[palabra] = simbolos[clasificar(palabra)]
+                    agregar_codigo(codigo)
+                    agregar_inicio(inicio)
+                    agregar_largo(largo)
+            self._verificar_tokens(len(codigos))
+        else:
+            for categoria, inicio, fin in self.lexer(entrada):
+                agregar_codigo(simbolos[categoria])
+                agregar_inicio(inicio)
+                agregar_largo(fin - inicio)
+        
+        return FlujoTokens(entrada, codigos, inicios, largos, sorted(simbolos, key=simbolos.get))
+    
     def analizar_palabras(self, entrada):
         """
         Convierte la entrada en palabras/símbolos válidos
         Maneja tanto entrada con espacios como sin espacios en PascalCase
+        Misma clasificación que lexer(), sin calcular posiciones
         """
-        # Si la entrada contiene espacios, usar el método tradicional
-        if ' ' in entrada:
-            palabras = entrada.split()
-        else:
-            # Si no tiene espacios, tokenizar la cadena
-            palabras = self.tokenizar_cadena_sin_espacios(entrada)
+        self._verificar_caracteres(len(entrada))
+        if self.estadisticas is not None:
+            return self._analizar_palabras_medido(entrada, self.estadisticas)
+        if ' ' not in entrada:
+            return [categoria for categoria, _, _ in self.lexer(entrada)]
         
+        # Con espacios: separar por espacios en blanco y clasificar cada palabra una vez
+        clasificar = self.clasificar_lexema
         palabras_procesadas = []
-
-        for palabra in palabras:
-            # Verificar si la palabra termina con punto y coma
-            if palabra.endswith(';') and len(palabra) > 1:
-                palabra_sin_punto_coma = palabra[:-1]  # Quitar el punto y coma
-                
-                # Procesar la palabra sin punto y coma
-                if palabra_sin_punto_coma in self.palabras_validas:
-                    palabras_procesadas.append(self.palabras_validas[palabra_sin_punto_coma])
-                elif self.es_asignacion(palabra_sin_punto_coma):
-                    palabras_procesadas.append('ASIGNACION')
-                elif (self.es_variable(palabra_sin_punto_coma) or self.es_expresion(palabra_sin_punto_coma) or 
-                      self.es_condicion(palabra_sin_punto_coma) or self.es_instrucciones(palabra_sin_punto_coma)):
-                    palabras_procesadas.append('ELEMENTO')
-                else:
-                    palabras_procesadas.append('INVALIDO')
-                
-                # Agregar el punto y coma como token separado
-                palabras_procesadas.append('PUNTO_COMA')
-                
-            elif palabra in self.palabras_validas:
-                palabras_procesadas.append(self.palabras_validas[palabra])
-            elif palabra == ';':
-                palabras_procesadas.append('PUNTO_COMA')
-            elif self.es_asignacion(palabra):
-                palabras_procesadas.append('ASIGNACION')
-            elif (self.es_variable(palabra) or self.es_expresion(palabra) or 
-                  self.es_condicion(palabra) or self.es_instrucciones(palabra)):
-                # Las clasificamos como elementos genéricos
-                # El contexto determinará si es VARIABLE, EXPRESION, CONDICION o INSTRUCCIONES
-                palabras_procesadas.append('ELEMENTO')
+        agregar = palabras_procesadas.append
+        for palabra in self.dividir_palabras(entrada):
+            if palabra[-1] == ';' and len(palabra) > 1:
+                agregar(clasificar(palabra[:-1]))
+                agregar('PUNTO_COMA')
             else:
-                palabras_procesadas.append('INVALIDO')
-
+                agregar(clasificar(palabra))
         return palabras_procesadas
     
+    def compilar_mascaras(self):
+        """
+        Prepara la simulación del AFND con conjuntos de estados representados como enteros
+        (bit i encendido = el estado nombres[i] está activo; los nombres van en orden alfabético)
+        Devuelve (nombres, sucesores, resolucion, finales):
+        - sucesores[simbolo][i]: máscara de los destinos del estado i con ese símbolo
+        - resolucion: lista de (máscara del estado, símbolo) para resolver ELEMENTO
+        - finales: máscara de los estados finales
+        """
+        estados = set(self.estados) | set(self.estados_finales) | {self.estado_inicial}
+        for (origen, _), destinos in self.transiciones.items():
+            estados.add(origen)
+            estados.update(destinos)
+        nombres = sorted(estados)
+        posicion = {estado: i for i, estado in enumerate(nombres)}
+        bit = {estado: 1 << i for i, estado in enumerate(nombres)}
+        
+        sucesores = {}
+        for (origen, simbolo), destinos in self.transiciones.items():
+            fila = sucesores.setdefault(simbolo, [0] * len(nombres))
+            for destino in destinos:
+                fila[posicion[origen]] |= bit[destino]
+        resolucion = [(bit[estado], simbolo) for estado, simbolo in self.resolucion_elemento if estado in bit]
+        finales = 0
+        for estado in self.estados_finales:
+            finales |= bit[estado]
+        self._mascaras = (nombres, sucesores, resolucion, finales)
+        return self._mascaras
+    
+    def _analizar_palabras_medido(self, entrada, estadisticas):
+        # analizar_palabras en dos pasadas (tokenizar y clasificar) para medir cada fase
+        with estadisticas.fase('tokenizacion'):
+            if ' ' in entrada:
+                palabras = self.dividir_palabras(entrada)
+            else:
+                self._verificar_caracteres(len(entrada))
+                maximo = self.limite_tokens
+                palabras = []
+                siguiente_token = self.siguiente_token_sin_espacios
+                busquedas = {}
+                intentos = 0
+                i = 0
+                n = len(entrada)
+                while i < n:
+                    # El trie se recorre salvo en ';' y en '<' con un '>' más adelante
+                    caracter = entrada[i]
+                    if caracter != ';' and (caracter != '<' or _proxima(entrada, '>', i, busquedas) == -1):
+                        intentos += 1
+                    tokens, i = siguiente_token(entrada, i, True, busquedas)
+                    palabras.extend(tokens)
+                    if maximo is not None and len(palabras) > maximo:
+                        raise LimiteExcedido('tokens', maximo)
+                estadisticas.intentos_palabra_reservada += intentos
+        with estadisticas.fase('clasificacion'):
+            clasificar = self.clasificar_palabra
+            categorias = []
+            for palabra in palabras:
+                categorias.extend(clasificar(palabra))
+        estadisticas.tokens += len(categorias)
+        estadisticas.caracteres += len(entrada)
+        return categorias
+    
     def procesar_cadena(self, cadena):
         """
         Procesa una cadena de entrada y determina si es aceptada por el autómata
+        Informa el recorrido al trazador del autómata (self.trazador)
+        Simula el AFND con el conjunto de estados actuales como máscara de bits (compilar_mascaras)
         """
+        trazador = self.trazador
+        nivel = trazador.nivel
+        por_token = nivel >= Trazador.POR_TOKEN
         palabras = self.analizar_palabras(cadena)
-        print(f"Palabras procesadas: {palabras}")
+        if nivel >= Trazador.RESUMEN:
+            trazador.emitir({'evento': 'palabras', 'palabras': palabras})
+        nombres, sucesores, resolucion, finales = self._mascaras or self.compilar_mascaras()
+        
+        def nombres_activos(mascara):
+            return [nombre for i, nombre in enumerate(nombres) if mascara >> i & 1]
 
-        # Conjunto de estados actuales (para NFAs)
-        estados_actuales = {self.estado_inicial}
+        # Conjunto de estados actuales (para NFAs), un bit por estado
+        estados_actuales = 1 << nombres.index(self.estado_inicial)  # O(estados), una vez por cadena
 
-        for palabra in palabras:
-            if palabra == 'INVALIDO':
-                print(f"Palabra inválida encontrada: {palabra}")
-                return False
+        estadisticas = self.estadisticas
+        contar = estadisticas is not None
+        medicion = SIN_MEDICION if estadisticas is None else estadisticas.fase('simulacion_afnd')
+        with medicion:
+            for indice, palabra in enumerate(palabras):
+                if palabra == 'INVALIDO':
+                    if nivel >= Trazador.RESUMEN:
+                        trazador.emitir({'evento': 'invalida', 'indice': indice, 'palabra': palabra})
+                        trazador.emitir({'evento': 'resultado', 'aceptada': False, 'tokens': len(palabras)})
+                    return False
 
-            # Convertir ELEMENTO según el contexto
-            if palabra == 'ELEMENTO':
-                # Si estamos en q3 (después de LEER), debe ser VARIABLE
-                if 'q3' in estados_actuales:
-                    palabra = 'VARIABLE'
-                # Si estamos en q4 (después de ESCRIBIR), debe ser EXPRESION
-                elif 'q4' in estados_actuales:
-                    palabra = 'EXPRESION'
-                # Si estamos en q6 (después de SI), debe ser CONDICION
-                elif 'q6' in estados_actuales:
-                    palabra = 'CONDICION'
-                # Si estamos en q8 (después de ENTONCES), debe ser INSTRUCCIONES
-                elif 'q8' in estados_actuales:
-                    palabra = 'INSTRUCCIONES'
-                # Si estamos en q9 (después de SINO), debe ser INSTRUCCIONES
-                elif 'q9' in estados_actuales:
-                    palabra = 'INSTRUCCIONES'
-                # Si estamos en q10 (después de MIENTRAS), debe ser CONDICION
-                elif 'q10' in estados_actuales:
-                    palabra = 'CONDICION'
-                # Si estamos en q12 (después de HACER), debe ser INSTRUCCIONES
-                elif 'q12' in estados_actuales:
-                    palabra = 'INSTRUCCIONES'
-                # Si estamos en q13 (después de REPETIR), debe ser INSTRUCCIONES
-                elif 'q13' in estados_actuales:
-                    palabra = 'INSTRUCCIONES'
-                # Si estamos en q14 (después de HASTAQUE), debe ser CONDICION
-                elif 'q14' in estados_actuales:
-                    palabra = 'CONDICION'
-                    
-                # Estados anidados - IF anidado
-                elif 'q15' in estados_actuales:  # después de SI anidado
-                    palabra = 'CONDICION'
-                elif 'q17' in estados_actuales:  # después de ENTONCES anidado
-                    palabra = 'INSTRUCCIONES'
-                elif 'q21' in estados_actuales:  # después de SINO anidado
-                    palabra = 'INSTRUCCIONES'
-                    
-                # Estados anidados - WHILE anidado  
-                elif 'q18' in estados_actuales:  # después de MIENTRAS anidado
-                    palabra = 'CONDICION'
-                elif 'q20' in estados_actuales:  # después de HACER anidado
-                    palabra = 'INSTRUCCIONES'
-
-            nuevos_estados = set()
-
-            # Para cada estado actual, buscar transiciones válidas
-            for estado in estados_actuales:
-                transicion = (estado, palabra)
-                if transicion in self.transiciones:
-                    nuevos_estados.update(self.transiciones[transicion])
-
-            if not nuevos_estados:
-                print(f"No hay transición válida desde {estados_actuales} con palabra '{palabra}'")
-                return False
+                # Convertir ELEMENTO según el contexto (primer estado activo de la tabla)
+                if palabra == 'ELEMENTO':
+                    for mascara, simbolo in resolucion:
+                        if estados_actuales & mascara:
+                            palabra = simbolo
+                            break
+
+                # Unir los destinos de cada estado actual (un OR por bit encendido)
+                nuevos_estados = 0
+                fila = sucesores.get(palabra)
+                if fila is not None:
+                    if not estados_actuales & (estados_actuales - 1):
+                        nuevos_estados = fila[estados_actuales.bit_length() - 1]  # un solo estado activo
+                    else:
+                        pendientes = estados_actuales
+                        while pendientes:
+                            menor = pendientes & -pendientes
+                            nuevos_estados |= fila[menor.bit_length() - 1]
+                            pendientes ^= menor
 
-            estados_actuales = nuevos_estados
-            print(f"Después de '{palabra}': estados actuales = {estados_actuales}")
+                if not nuevos_estados:
+                    if nivel >= Trazador.RESUMEN:
+                        trazador.emitir({'evento': 'sin_transicion', 'indice': indice, 'simbolo': palabra,
+                                         'estados': nombres_activos(estados_actuales)})
+                        trazador.emitir({'evento': 'resultado', 'aceptada': False, 'tokens': len(palabras)})
+                    return False
+
+                estados_actuales = nuevos_estados
+                if contar:
+                    activos = bin(estados_actuales).count('1')
+                    estadisticas.estados_visitados += activos
+                    if activos > estadisticas.pico_estados:
+                        estadisticas.pico_estados = activos
+                if por_token:
+                    trazador.emitir({'evento': 'transicion', 'indice': indice, 'simbolo': palabra,
+                                     'estados': nombres_activos(estados_actuales)})
         
         # Verificar si algún estado actual es final
-        es_aceptada = bool(estados_actuales.intersection(self.estados_finales))
+        es_aceptada = bool(estados_actuales & finales)
+        if nivel >= Trazador.RESUMEN:
+            trazador.emitir({'evento': 'resultado', 'aceptada': es_aceptada, 'tokens': len(palabras)})
         return es_aceptada
     
-    def mostrar_automata(self):
+    def simbolos_entrada(self):
         """
-        Muestra la estructura del autómata
+        Devuelve las categorías que produce analizar_palabras, en orden fijo
         """
-        print("=== AUTÓMATA FINITO NO DETERMINISTA ===")
-        print(f"Estados: {self.estados}")
-        print(f"Estado inicial: {self.estado_inicial}")
-        print(f"Estados finales: {self.estados_finales}")
-        print("\nTransiciones:")
-        for (estado, simbolo), destinos in self.transiciones.items():
-            for destino in destinos:
-                print(f"  {estado} --({simbolo})--> {destino}")
-        print("\nPalabras del lenguaje: comienza/Comienza, leer/Leer, escribir/Escribir, si/Si, entonces/Entonces, sino/Sino, finsi/FinSi, mientras/Mientras, hacer/Hacer, finmientras/FinMientras, repetir/Repetir, hastaque/HastaQue/Hasta, <variable>, <expresion>, <condicion>, <instrucciones>, <var>=<exp>, ;, termina/Termina")
-        print("Patrones aceptados:")
-        print("  - comienza [leer <variable>]* termina")
-        print("  - comienza [escribir <expresion>;]* termina") 
-        print("  - comienza [<variable>=<expresion>;]* termina")
-        print("  - comienza [si <condicion> entonces <instrucciones>* finsi]* termina")
-        print("  - comienza [si <condicion> entonces <instrucciones>* sino <instrucciones>* finsi]* termina")
-        print("  - comienza [mientras <condicion> hacer <instrucciones>* finmientras]* termina")
-        print("  - comienza [repetir <instrucciones>* hastaque <condicion>]* termina")
-        print("  - Combinaciones de leer, escribir, asignaciones, condicionales y bucles")
-
-
-def procesar_archivo(automata, ruta_archivo):
-    """
-    Procesa cadenas desde un archivo de texto
-    """
-    try:
-        lineas = ''
-        with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
-            for line in archivo:  
-                lineas +=line.strip()
-
-        lineas =[lineas.replace(" ","")]
-        print(lineas)
-        print(f"\nPROCESANDO ARCHIVO: {ruta_archivo}")
-        print("=" * 50)
+        simbolos = []
+        for categoria in self.palabras_validas.values():
+            if categoria not in simbolos:
+                simbolos.append(categoria)
+        simbolos.extend(['ELEMENTO', 'INVALIDO'])
+        return simbolos
+    
+    def compilar(self):
+        """
+        Compila el AFND en un AFD minimizado con estados y símbolos enteros
+        Aplica construcción de subconjuntos (resolviendo ELEMENTO por contexto)
+        y luego minimiza por refinamiento de particiones.
+        Debe volver a llamarse si se modifican las tablas del autómata.
+        """
+        self.construir_tabla_reservadas()
+        self.construir_trie()
+        self.compilar_mascaras()
+        simbolos = self.simbolos_entrada()
         
-        for i, linea in enumerate(lineas, 1):
-            cadena = linea.strip()
-            if not cadena or cadena.startswith('#'):  # Ignorar líneas vacías y comentarios
-                continue
-                
-            print(f"\nLínea {i}: '{cadena}'")
-            resultado = automata.procesar_cadena(cadena)
-            print(f"Resultado: {'ACEPTADA' if resultado else 'RECHAZADA'}")
-            print("-" * 30)
+        # Construcción de subconjuntos; el conjunto vacío es el estado muerto
+        muerto = frozenset()
+        inicial = frozenset([self.estado_inicial])
+        conjuntos = [muerto, inicial]
+        indices = {muerto: 0, inicial: 1}
+        delta = []
+        pendiente = 0
+        while pendiente < len(conjuntos):
+            actual = conjuntos[pendiente]
+            pendiente += 1
+            fila = []
+            for simbolo in simbolos:
+                if simbolo == 'ELEMENTO':
+                    for estado, resuelto in self.resolucion_elemento:
+                        if estado in actual:
+                            simbolo = resuelto
+                            break
+                siguiente = set()
+                if simbolo != 'INVALIDO':
+                    for estado in actual:
+                        siguiente.update(self.transiciones.get((estado, simbolo), ()))
+                siguiente = frozenset(siguiente)
+                if siguiente not in indices:
+                    indices[siguiente] = len(conjuntos)
+                    conjuntos.append(siguiente)
+                fila.append(indices[siguiente])
+            delta.append(fila)
+        
+        # Minimización (Moore): separar por aceptación y refinar hasta estabilizar
+        clase = [1 if conjunto & self.estados_finales else 0 for conjunto in conjuntos]
+        while True:
+            firmas = {}
+            nueva = []
+            for estado, fila in enumerate(delta):
+                firma = (clase[estado],) + tuple(clase[destino] for destino in fila)
+                nueva.append(firmas.setdefault(firma, len(firmas)))
+            if len(firmas) == len(set(clase)):
+                break
+            clase = nueva
+        
+        # Renumerar: el inicial es 0 y el resto en orden de aparición
+        orden = {}
+        for estado in [1] + list(range(len(conjuntos))):
+            orden.setdefault(nueva[estado], len(orden))
+        n_estados = len(orden)
+        n_simbolos = len(simbolos)
+        tabla = [0] * (n_estados * n_simbolos)
+        finales = [False] * n_estados
+        for estado, fila in enumerate(delta):
+            origen = orden[nueva[estado]]
+            finales[origen] = bool(conjuntos[estado] & self.estados_finales)
+            for codigo, destino in enumerate(fila):
+                tabla[origen * n_simbolos + codigo] = orden[nueva[destino]]
+        
+        self._afd = AFDCompilado({simbolo: codigo for codigo, simbolo in enumerate(simbolos)},
+                                 tabla, 0, orden[nueva[0]], finales)
+        self._generado = None
+        return self._afd
+    
+    def generar_codigo(self):
+        """
+        Genera el código fuente de un módulo con un reconocedor especializado en esta gramática
+        Cada estado del AFD compilado (ELEMENTO ya resuelto por contexto) tiene un diccionario
+        palabra reservada -> estado siguiente y los destinos fijos de un elemento, una
+        asignación o un lexema inválido, así que cada token cuesta una consulta al
+        diccionario de su estado en lugar de clasificar el lexema y después consultar la tabla.
+        El módulo define reconocer(cadena, tokenizar_sin_espacios) y reconocer_palabras(palabras).
+        """
+        afd = self._afd or self.compilar()
+        n = afd.n_simbolos
+        estados = len(afd.tabla) // n
+        muerto = afd.estado_muerto
+        
+        def destino(estado, categoria):
+            return afd.tabla[estado * n + afd.simbolos[categoria]]
+        
+        siguiente = []
+        otros = []
+        for estado in range(estados):
+            transiciones = {palabra: destino(estado, categoria)
+                            for palabra, categoria in sorted(self.palabras_validas.items())
+                            if destino(estado, categoria) != muerto}
+            siguiente.append(f"    {transiciones!r},  # {estado}")
+            otros.append(f"    ({destino(estado, 'ELEMENTO')}, {destino(estado, 'ASIGNACION')}, "
+                         f"{destino(estado, 'INVALIDO')}),  # {estado}")
+        return PLANTILLA_RECONOCEDOR.format(
+            huella=self.huella_generado(), patron=PATRON_LEXEMA.pattern, inicial=afd.estado_inicial,
+            muerto=muerto, finales=tuple(afd.finales), reservadas=tuple(sorted(self.palabras_validas)),
+            siguiente='\n'.join(siguiente), otros='\n'.join(otros),
+            punto_coma=tuple(destino(estado, 'PUNTO_COMA') for estado in range(estados)),
+            largo_memo=LARGO_MAXIMO_MEMO)
+    
+    def huella_generado(self):
+        """
+        Devuelve la clave del módulo generado: la gramática, el patrón de lexemas y la versión del generador
+        """
+        texto = repr((VERSION_GENERADOR, self.huella_gramatica(), PATRON_LEXEMA.pattern))
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+    
+    def reconocedor_generado(self, directorio_cache=DIRECTORIO_CACHE):
+        """
+        Devuelve una función reconocer(cadena) generada con generar_codigo (mismo resultado
+        que reconocer()). El módulo se guarda en directorio_cache como reconocedor_<huella>.py
+        y los procesos siguientes lo compilan desde ahí; con directorio_cache=None no se guarda.
+        """
+        if self._generado is not None:
+            return self._generado
+        import functools
+        
+        ruta = None
+        fuente = None
+        if directorio_cache is not None:
+            ruta = os.path.join(directorio_cache, f"reconocedor_{self.huella_generado()}.py")
+            try:
+                with open(ruta, encoding='utf-8') as archivo:
+                    fuente = archivo.read()
+            except OSError:
+                pass
+        if fuente is None:
+            fuente = self.generar_codigo()
+            if ruta is not None:
+                try:
+                    os.makedirs(directorio_cache, exist_ok=True)
+                    temporal = f"{ruta}.{os.getpid()}.tmp"
+                    with open(temporal, 'w', encoding='utf-8') as archivo:
+                        archivo.write(fuente)
+                    os.replace(temporal, ruta)
+                except OSError:
+                    pass  # La cache es opcional
+        
+        modulo = {'__name__': 'reconocedor_generado'}
+        exec(compile(fuente, ruta or '<reconocedor generado>', 'exec'), modulo)
+        self._generado = functools.partial(modulo['reconocer'],
+                                           tokenizar_sin_espacios=self.tokenizar_cadena_sin_espacios,
+                                           dividir=self.dividir_palabras)
+        return self._generado
+    
+    def reconocer(self, cadena):
+        """
+        Determina si la cadena es aceptada usando el AFD compilado (sin trazas)
+        """
+        afd = self._afd or self.compilar()
+        palabras = self.analizar_palabras(cadena)
+        if self.estadisticas is None:
+            return afd.aceptar(afd.codificar(palabras))
+        with self.estadisticas.fase('afd'):
+            return afd.aceptar(afd.codificar(palabras))
+    
+    def reconocer_vectorizado(self, cadenas, tam_bloque=16384):
+        """
+        Clasifica muchas cadenas a la vez con AFDCompilado.clasificar_lote
+        Cada cadena se tokeniza por separado; el AFD avanza sobre todas en conjunto.
+        Devuelve (aceptadas, fallos), con fallos en índices de token (-1 si fue aceptada).
+        """
+        afd = self._afd or self.compilar()
+        if numpy is None:
+            return afd.clasificar_lote([afd.codificar(self.analizar_palabras(cadena)) for cadena in cadenas])
+        codigo = afd.simbolos.__getitem__
+        plano = array('B')
+        largos = array('I')
+        for cadena in cadenas:
+            antes = len(plano)
+            plano.extend(map(codigo, self.analizar_palabras(cadena)))
+            largos.append(len(plano) - antes)
+        return afd.clasificar_plano(plano, largos, tam_bloque)
+    
+    def reconocer_con_posicion(self, cadena):
+        """
+        Como reconocer(), pero informa también dónde se rechazó la entrada
+        Devuelve un diccionario {'aceptada', 'tokens', 'rechazo'}: tokens es la cantidad
+        de tokens consumidos y rechazo es None o {'indice', 'inicio', 'fin'} del token que
+        no tiene transición (índice = cantidad de tokens e inicio = fin = len(cadena) si la
+        entrada terminó antes de llegar a un estado final).
+        """
+        afd = self._afd or self.compilar()
+        flujo = self.tokenizar_compacto(cadena)
+        indice = afd.rechazo(flujo.codigos)
+        if indice is None:
+            return {'aceptada': True, 'tokens': len(flujo), 'rechazo': None}
+        if indice == len(flujo):
+            inicio = fin = len(cadena)
+        else:
+            inicio = flujo.inicios[indice]
+            fin = inicio + flujo.largos[indice]
+        return {'aceptada': False, 'tokens': indice,
+                'rechazo': {'indice': indice, 'inicio': inicio, 'fin': fin}}
+    
+    def reconocer_flujo(self, flujo, tam_bloque=65536, modo='auto'):
+        """
+        Reconoce un programa leído de un archivo de texto o flujo (p. ej. sys.stdin)
+        sin cargarlo completo en memoria
+        """
+        reconocedor = ReconocedorIncremental(self, modo)
+        while True:
+            fragmento = flujo.read(tam_bloque)
+            if not fragmento:
+                break
+            if not reconocedor.alimentar(fragmento):
+                break
+        return reconocedor.finalizar()
+    
+    def derivar_resolucion_elemento(self):
+        """
+        Arma la tabla de resolución de ELEMENTO a partir de las transiciones:
+        cada estado con una transición por VARIABLE, EXPRESION, CONDICION o
+        INSTRUCCIONES resuelve ELEMENTO a ese símbolo
+        """
+        resolucion = []
+        for (estado, simbolo) in self.transiciones:
+            if simbolo in SIMBOLOS_ELEMENTO and all(estado != otro for otro, _ in resolucion):
+                resolucion.append((estado, simbolo))
+        return resolucion
+    
+    @classmethod
+    def desde_jff(cls, ruta, directorio_cache=DIRECTORIO_CACHE):
+        """
+        Crea el autómata a partir de un archivo de JFLAP (.jff)
+        Las etiquetas de las transiciones pueden ser categorías (COMIENZA, PUNTO_COMA,
+        VARIABLE, ...), palabras reservadas (comienza, FinSi, ;, =) o elementos como
+        <condicion>. Una etiqueta que no es ninguna de esas produce ValueError.
+        tp_final.jff (el diseño original, que lee caracter por caracter) no se puede
+        cargar; la misma gramática por tokens está en RUTA_JFF_GRAMATICA.
+        El autómata compilado se guarda en directorio_cache con el hash del archivo como
+        clave, así los procesos siguientes no vuelven a leer el XML (ni ejecutan __init__).
+        Con directorio_cache=None no se usa la cache.
+        """
+        with open(ruta, 'rb') as archivo:
+            contenido = archivo.read()
+        
+        ruta_cache = None
+        if directorio_cache is not None:
+            huella = hashlib.sha256(contenido)
+            clave = (VERSION_CACHE, cls.__module__, cls.__qualname__, sorted(PALABRAS_VALIDAS.items()))
+            huella.update(repr(clave).encode('utf-8'))
+            ruta_cache = os.path.join(directorio_cache, huella.hexdigest() + '.json')
+            try:
+                with open(ruta_cache, encoding='utf-8') as archivo:
+                    datos = json.load(archivo)
+                automata = cls._sin_tablas()
+                automata._cargar_tablas(datos)
+                automata._afd = AFDCompilado.desde_dict(datos['afd'])
+                return automata
+            except (OSError, ValueError, KeyError):
+                pass  # Sin cache válida: leer el XML
+        
+        automata = cls()
+        estados, inicial, finales, transiciones = cargar_jff(contenido, automata.palabras_validas)
+        automata.estados = estados
+        automata.estado_inicial = inicial
+        automata.estados_finales = finales
+        automata.transiciones = transiciones
+        automata.resolucion_elemento = automata.derivar_resolucion_elemento()
+        automata.compilar()
+        
+        if ruta_cache is not None:
+            datos = automata._tablas_serializables()
+            datos['afd'] = automata._afd.como_dict()
+            try:
+                os.makedirs(directorio_cache, exist_ok=True)
+                temporal = f"{ruta_cache}.{os.getpid()}.tmp"
+                with open(temporal, 'w', encoding='utf-8') as archivo:
+                    json.dump(datos, archivo)
+                os.replace(temporal, ruta_cache)
+            except OSError:
+                pass  # La cache es opcional
+        return automata
+    
+    def _tablas_serializables(self):
+        return {
+            'palabras_validas': self.palabras_validas,
+            'estados': sorted(self.estados),
+            'estado_inicial': self.estado_inicial,
+            'estados_finales': sorted(self.estados_finales),
+            'transiciones': [[origen, simbolo, sorted(destinos)]
+                             for (origen, simbolo), destinos in self.transiciones.items()],
+            'resolucion_elemento': [list(par) for par in self.resolucion_elemento],
+        }
+    
+    def _cargar_tablas(self, datos):
+        self.palabras_validas = datos['palabras_validas']
+        self.estados = set(datos['estados'])
+        self.estado_inicial = datos['estado_inicial']
+        self.estados_finales = set(datos['estados_finales'])
+        self.transiciones = {(origen, simbolo): set(destinos)
+                             for origen, simbolo, destinos in datos['transiciones']}
+        self.resolucion_elemento = [tuple(par) for par in datos['resolucion_elemento']]
+    
+    def exportar_jff(self, ruta):
+        """
+        Guarda el autómata en formato JFLAP (.jff) con las categorías como etiquetas
+        El archivo se puede editar en JFLAP y volver a cargar con desde_jff().
+        Si cambian las tablas de __init__, hay que volver a exportar RUTA_JFF_GRAMATICA.
+        """
+        estructura = ET.Element('structure')
+        ET.SubElement(estructura, 'type').text = 'fa'
+        automaton = ET.SubElement(estructura, 'automaton')
+        ordenados = sorted(self.estados, key=lambda estado: (len(estado), estado))
+        identificadores = {estado: str(i) for i, estado in enumerate(ordenados)}
+        for i, estado in enumerate(ordenados):
+            nodo = ET.SubElement(automaton, 'state', id=identificadores[estado], name=estado)
+            ET.SubElement(nodo, 'x').text = str(float(100 * (i % 6)))
+            ET.SubElement(nodo, 'y').text = str(float(100 * (i // 6)))
+            if estado == self.estado_inicial:
+                ET.SubElement(nodo, 'initial')
+            if estado in self.estados_finales:
+                ET.SubElement(nodo, 'final')
+        for (origen, simbolo), destinos in self.transiciones.items():
+            for destino in sorted(destinos):
+                transicion = ET.SubElement(automaton, 'transition')
+                ET.SubElement(transicion, 'from').text = identificadores[origen]
+                ET.SubElement(transicion, 'to').text = identificadores[destino]
+                ET.SubElement(transicion, 'read').text = simbolo
+        ET.ElementTree(estructura).write(ruta, encoding='UTF-8', xml_declaration=True)
+    
+    def tablas_gramatica(self):
+        """
+        Devuelve las tablas de las que depende el resultado de reconocer()
+        """
+        return (self.palabras_validas, self.transiciones, self.resolucion_elemento,
+                self.estado_inicial, self.estados_finales)
+    
+    def huella_gramatica(self):
+        """
+        Devuelve un hash (hex) de las tablas de la gramática; cambia si cambia cualquiera de ellas
+        """
+        def normalizar(valor):
+            if isinstance(valor, dict):
+                return sorted((normalizar(clave), normalizar(dato)) for clave, dato in valor.items())
+            if isinstance(valor, (set, frozenset)):
+                return sorted(normalizar(elemento) for elemento in valor)
+            if isinstance(valor, (list, tuple)):
+                return [normalizar(elemento) for elemento in valor]
+            return repr(valor)
+        texto = repr((type(self).__name__, normalizar(self.tablas_gramatica())))
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+    
+    def __getstate__(self):
+        # El trazador puede contener funciones que no se serializan: las copias
+        # enviadas a otros procesos (reconocer_lote) no emiten trazas
+        estado = self.__dict__.copy()
+        estado['trazador'] = None
+        estado['estadisticas'] = None
+        estado['_generado'] = None  # funciones de exec(): se vuelven a cargar en el otro proceso
+        if self._compartidas is not None:
+            # La tabla del AFD es una vista del segmento: el otro proceso compila la suya
+            estado['_compartidas'] = None
+            estado['_afd'] = None
+        return estado
+    
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self.trazador = Trazador.apagado()
+    
+    def mostrar_automata(self):
+        """
+        Muestra la estructura del autómata
+        """
+        print("=== AUTÓMATA FINITO NO DETERMINISTA ===")
+        print(f"Estados: {self.estados}")
+        print(f"Estado inicial: {self.estado_inicial}")
+        print(f"Estados finales: {self.estados_finales}")
+        print("\nTransiciones:")
+        for (estado, simbolo), destinos in self.transiciones.items():
+            for destino in destinos:
+                print(f"  {estado} --({simbolo})--> {destino}")
+        print("\nPalabras del lenguaje (sin distinguir mayúsculas de minúsculas: si, Si, SI): comienza, leer, escribir, si, entonces, sino, finsi, mientras, hacer, finmientras, repetir, hastaque/hasta, <variable>, <expresion>, <condicion>, <instrucciones>, <var>=<exp>, ;, termina")
+        print("Patrones aceptados:")
+        print("  - comienza [leer <variable>]* termina")
+        print("  - comienza [escribir <expresion>;]* termina") 
+        print("  - comienza [<variable>=<expresion>;]* termina")
+        print("  - comienza [si <condicion> entonces <instrucciones>* finsi]* termina")
+        print("  - comienza [si <condicion> entonces <instrucciones>* sino <instrucciones>* finsi]* termina")
+        print("  - comienza [mientras <condicion> hacer <instrucciones>* finmientras]* termina")
+        print("  - comienza [repetir <instrucciones>* hastaque <condicion>]* termina")
+        print("  - Combinaciones de leer, escribir, asignaciones, condicionales y bucles")
+
+
+# Acciones sobre la pila de AutomataPila
+PILA_NADA = 0
+PILA_APILAR = 1
+PILA_DESAPILAR = 2
+
+
+class AutomataPila(AutomataReconocedor):
+    """
+    Autómata de pila para estructuras anidadas a cualquier profundidad
+    En lugar de copiar estados por cada nivel (q15-q21 en el AFND), cada bloque
+    si/mientras/repetir apila el contexto desde el que se abrió y finsi/finmientras/
+    <condicion> de hastaque lo desapilan. La tabla tiene tamaño fijo y la memoria es
+    proporcional a la profundidad de anidamiento.
+    Dentro de un bloque se aceptan <instrucciones> y bloques anidados de cualquier tipo.
+    procesar_cadena sigue usando el AFND (anidamiento de un nivel).
+    """
+    def __init__(self):
+        super().__init__()
+        
+        # Transiciones del autómata de pila
+        # Formato: (estado_actual, simbolo) -> (estado_siguiente, accion)
+        # PILA_APILAR guarda el estado actual (contexto al que se vuelve al cerrar el bloque);
+        # PILA_DESAPILAR vuelve al estado guardado (se ignora estado_siguiente)
+        self.transiciones_pila = {
+            ('q0', 'COMIENZA'): ('q1', PILA_NADA),
+            ('q1', 'LEER'): ('q3', PILA_NADA),
+            ('q1', 'ESCRIBIR'): ('q4', PILA_NADA),
+            ('q1', 'ASIGNACION'): ('q28', PILA_NADA),
+            ('q1', 'TERMINA'): ('q2', PILA_NADA),
+            ('q3', 'VARIABLE'): ('q30', PILA_NADA),
+            ('q30', 'PUNTO_COMA'): ('q1', PILA_NADA),
+            ('q4', 'EXPRESION'): ('q29', PILA_NADA),
+            ('q29', 'PUNTO_COMA'): ('q1', PILA_NADA),
+            ('q28', 'PUNTO_COMA'): ('q1', PILA_NADA),
+            
+            # Condicional: si <condicion> entonces <instrucciones> [sino <instrucciones>] finsi
+            ('q6', 'CONDICION'): ('q7', PILA_NADA),
+            ('q7', 'ENTONCES'): ('q8', PILA_NADA),
+            ('q8', 'INSTRUCCIONES'): ('q8', PILA_NADA),
+            ('q8', 'SINO'): ('q9', PILA_NADA),
+            ('q8', 'FINSI'): (None, PILA_DESAPILAR),
+            ('q9', 'INSTRUCCIONES'): ('q9', PILA_NADA),
+            ('q9', 'FINSI'): (None, PILA_DESAPILAR),
+            
+            # Bucle while: mientras <condicion> hacer <instrucciones> finmientras
+            ('q10', 'CONDICION'): ('q11', PILA_NADA),
+            ('q11', 'HACER'): ('q12', PILA_NADA),
+            ('q12', 'INSTRUCCIONES'): ('q12', PILA_NADA),
+            ('q12', 'FINMIENTRAS'): (None, PILA_DESAPILAR),
+            
+            # Bucle do-while: repetir <instrucciones> hastaque <condicion>
+            ('q13', 'INSTRUCCIONES'): ('q13', PILA_NADA),
+            ('q13', 'HASTAQUE'): ('q14', PILA_NADA),
+            ('q14', 'CONDICION'): (None, PILA_DESAPILAR),
+        }
+        
+        # Apertura de bloques desde el programa y desde el cuerpo de cualquier bloque
+        for contexto in ('q1', 'q8', 'q9', 'q12', 'q13'):
+            self.transiciones_pila[(contexto, 'SI')] = ('q6', PILA_APILAR)
+            self.transiciones_pila[(contexto, 'MIENTRAS')] = ('q10', PILA_APILAR)
+            self.transiciones_pila[(contexto, 'REPETIR')] = ('q13', PILA_APILAR)
+    
+    def _iniciar_campos(self):
+        super()._iniciar_campos()
+        self._pila = None
+    
+    def _tablas_serializables(self):
+        datos = super()._tablas_serializables()
+        datos['transiciones_pila'] = [[origen, simbolo, destino, accion]
+                                      for (origen, simbolo), (destino, accion) in self.transiciones_pila.items()]
+        return datos
+    
+    def _cargar_tablas(self, datos):
+        super()._cargar_tablas(datos)
+        self.transiciones_pila = {(origen, simbolo): (destino, accion)
+                                  for origen, simbolo, destino, accion in datos['transiciones_pila']}
+    
+    def compilar_pila(self):
+        """
+        Compila transiciones_pila en una tabla plana de enteros
+        tabla[estado * n_simbolos + simbolo] = (destino << 2) | accion, o -1 si no hay transición.
+        ELEMENTO se resuelve al compilar según el símbolo que acepte cada estado.
+        """
+        simbolos = {simbolo: codigo for codigo, simbolo in enumerate(self.simbolos_entrada())}
+        estados = [self.estado_inicial]
+        for (origen, _), (destino, _) in self.transiciones_pila.items():
+            for estado in (origen, destino):
+                if estado is not None and estado not in estados:
+                    estados.append(estado)
+        indices = {estado: i for i, estado in enumerate(estados)}
+        n = len(simbolos)
+        
+        tabla = [-1] * (len(estados) * n)
+        for (origen, simbolo), (destino, accion) in self.transiciones_pila.items():
+            entrada = ((indices[destino] if destino is not None else 0) << 2) | accion
+            if simbolo in SIMBOLOS_ELEMENTO:
+                simbolo = 'ELEMENTO'
+            tabla[indices[origen] * n + simbolos[simbolo]] = entrada
+        finales = [estado in self.estados_finales for estado in estados]
+        
+        self._pila = (simbolos, tabla, n, finales)
+        return self._pila
+    
+    def tablas_gramatica(self):
+        return super().tablas_gramatica() + (self.transiciones_pila,)
+    
+    def reconocer(self, cadena):
+        """
+        Determina si la cadena es aceptada: O(n) en tiempo y O(profundidad) en memoria
+        """
+        simbolos, tabla, n, finales = self._pila or self.compilar_pila()
+        estado = 0
+        pila = []
+        for palabra in self.analizar_palabras(cadena):
+            entrada = tabla[estado * n + simbolos[palabra]]
+            if entrada < 0:
+                return False
+            accion = entrada & 3
+            if accion == PILA_NADA:
+                estado = entrada >> 2
+            elif accion == PILA_APILAR:
+                pila.append(estado)
+                estado = entrada >> 2
+            else:
+                estado = pila.pop()
+        return not pila and finales[estado]
+    
+    def reconocer_con_posicion(self, cadena):
+        simbolos, tabla, n, finales = self._pila or self.compilar_pila()
+        estado = 0
+        pila = []
+        tokens = 0
+        for categoria, inicio, fin in self.lexer(cadena):
+            entrada = tabla[estado * n + simbolos[categoria]]
+            if entrada < 0:
+                return {'aceptada': False, 'tokens': tokens,
+                        'rechazo': {'indice': tokens, 'inicio': inicio, 'fin': fin}}
+            accion = entrada & 3
+            if accion == PILA_NADA:
+                estado = entrada >> 2
+            elif accion == PILA_APILAR:
+                pila.append(estado)
+                estado = entrada >> 2
+            else:
+                estado = pila.pop()
+            tokens += 1
+        if not pila and finales[estado]:
+            return {'aceptada': True, 'tokens': tokens, 'rechazo': None}
+        return {'aceptada': False, 'tokens': tokens,
+                'rechazo': {'indice': tokens, 'inicio': len(cadena), 'fin': len(cadena)}}
+
+
+# Símbolos en los que se resuelve ELEMENTO según el contexto
+SIMBOLOS_ELEMENTO = ('VARIABLE', 'EXPRESION', 'CONDICION', 'INSTRUCCIONES')
+
+
+def simbolo_jff(etiqueta, palabras_validas):
+    """
+    Convierte la etiqueta de una transición de JFLAP en un símbolo del autómata
+    'FinSi ' -> 'FINSI', ';' -> 'PUNTO_COMA', '<condicion>' -> 'CONDICION', 'HACER' -> 'HACER'
+    """
+    etiqueta = (etiqueta or '').strip()
+    if etiqueta.lower() in palabras_validas:
+        return palabras_validas[etiqueta.lower()]
+    if len(etiqueta) > 2 and etiqueta[0] == '<' and etiqueta[-1] == '>':
+        return etiqueta[1:-1].upper()
+    return etiqueta
+
+
+def cargar_jff(contenido, palabras_validas):
+    """
+    Lee un autómata finito de JFLAP (contenido XML del .jff)
+    Devuelve (estados, estado_inicial, estados_finales, transiciones) con la misma
+    estructura que AutomataReconocedor: (estado, simbolo) -> conjunto de estados
+    Cada etiqueta tiene que ser un símbolo de la gramática (ver simbolo_jff): una palabra
+    reservada o su categoría, o un elemento (VARIABLE, EXPRESION, CONDICION, INSTRUCCIONES);
+    si no, ValueError con la etiqueta y la transición.
+    """
+    raiz = ET.fromstring(contenido)
+    tipo = raiz.findtext('type')
+    if tipo != 'fa':
+        raise ValueError(f"El archivo no es un autómata finito de JFLAP (tipo: {tipo})")
+    automaton = raiz.find('automaton')
+    if automaton is None:
+        automaton = raiz
+    
+    nombres = {}
+    estado_inicial = None
+    estados_finales = set()
+    for nodo in automaton.iter('state'):
+        nombre = nodo.get('name') or 'q' + nodo.get('id')
+        nombres[nodo.get('id')] = nombre
+        if nodo.find('initial') is not None:
+            estado_inicial = nombre
+        if nodo.find('final') is not None:
+            estados_finales.add(nombre)
+    if estado_inicial is None:
+        raise ValueError("El autómata no tiene estado inicial")
+    
+    validos = set(palabras_validas.values()).union(SIMBOLOS_ELEMENTO)
+    transiciones = {}
+    for nodo in automaton.iter('transition'):
+        origen = nombres[nodo.findtext('from').strip()]
+        destino = nombres[nodo.findtext('to').strip()]
+        etiqueta = nodo.findtext('read') or ''
+        simbolo = simbolo_jff(etiqueta, palabras_validas)
+        if simbolo not in validos:
+            if len(etiqueta.strip()) == 1:
+                # Un caracter suelto: es un autómata por caracteres, como tp_final.jff
+                raise ValueError(f"Etiqueta desconocida {etiqueta!r} en la transición "
+                                 f"{origen} -> {destino}: el autómata lee caracteres y se "
+                                 f"esperan tokens (la gramática por tokens está en "
+                                 f"{os.path.basename(RUTA_JFF_GRAMATICA)})")
+            raise ValueError(f"Etiqueta desconocida {etiqueta!r} en la transición "
+                             f"{origen} -> {destino} (se esperaba una palabra reservada, una "
+                             f"categoría o un elemento como <condicion>)")
+        transiciones.setdefault((origen, simbolo), set()).add(destino)
+    
+    return set(nombres.values()), estado_inicial, estados_finales, transiciones
+
+
+def diferencias_gramatica_jff(ruta=RUTA_JFF_GRAMATICA, automata=None):
+    """
+    Compara las tablas del autómata (por defecto el de __init__) con las del .jff
+    Devuelve los nombres de las tablas que difieren; una lista vacía si coinciden.
+    """
+    automata = automata if automata is not None else AutomataReconocedor()
+    del_jff = type(automata).desde_jff(ruta, directorio_cache=None)
+    nombres = ('palabras_validas', 'transiciones', 'resolucion_elemento',
+               'estado_inicial', 'estados_finales')
+    return [nombre for nombre, propia, otra
+            in zip(nombres, automata.tablas_gramatica(), del_jff.tablas_gramatica())
+            if propia != otra]
+
+
+class ReconocedorIncremental:
+    """
+    Reconocedor por empuje para entradas que llegan por partes
+    alimentar(fragmento) tokeniza lo recibido (un elemento <...> o una palabra reservada
+    pueden quedar cortados entre fragmentos) y avanza el AFD compilado token a token;
+    finalizar() procesa lo pendiente y devuelve si la entrada fue aceptada.
+    
+    Modos de tokenización (los mismos criterios que analizar_palabras):
+    - 'espacios': palabras separadas por espacios en blanco
+    - 'sin_espacios': PascalCase concatenado (tokenizar_cadena_sin_espacios)
+    - 'auto': 'espacios' si aparece un ' ' antes de recibir más de largo_deteccion
+      caracteres (por defecto LARGO_DETECCION_MODO), si no 'sin_espacios'. Hasta
+      decidir guarda lo recibido, así que la memoria queda acotada aunque el flujo no
+      tenga espacios. A diferencia de analizar_palabras, un ' ' que llega después de
+      ese prefijo ya no cambia el modo (en 'sin_espacios' es un lexema inválido).
+    
+    cortar() termina el token pendiente sin terminar la entrada, y modo se puede cambiar
+    entre 'espacios' y 'sin_espacios' en cualquier momento (lo pendiente se tokeniza con
+    el modo nuevo): así reconocer_bloques elige el tokenizador de cada línea.
+    
+    Si el token pendiente no se puede decidir hasta que llegue un caracter determinado
+    (un espacio, el '>' de un elemento o un '<' o ';' que cierre un segmento), los
+    fragmentos que no lo traen solo se guardan: un token largo que llega en muchos
+    fragmentos se tokeniza una vez, y el costo total es lineal en el largo de la entrada.
+    Respeta limite_caracteres y limite_tokens del autómata (LimiteExcedido).
+    """
+    def __init__(self, automata, modo='auto', largo_deteccion=LARGO_DETECCION_MODO):
+        if modo not in ('auto', 'espacios', 'sin_espacios'):
+            raise ValueError(f"Modo de tokenización desconocido: {modo}")
+        self.automata = automata
+        self.afd = automata._afd or automata.compilar()
+        self.modo = modo
+        self.largo_deteccion = largo_deteccion
+        self.pendiente = ''  # texto recibido que todavía no forma un token completo
+        self.recibidos = []  # fragmentos que llegaron después de pendiente, sin tokenizar
+        self.esperado = None  # caracteres sin los que pendiente sigue indeciso (None: cualquiera)
+        self.largo_palabra = max(map(len, automata.palabras_validas))
+        self.caracteres = 0
+        self.consumidos = 0  # caracteres recibidos antes de pendiente (ya tokenizados)
+        self.estado = self.afd.estado_inicial
+        self.rechazada = False
+        self.tokens = 0
+        self.rechazo = None  # {'indice', 'lexema'} del token rechazado (lexema None: fin de la entrada)
+        self.inicio_rechazo = None  # posición en la entrada del primer caracter del token rechazado
+    
+    def alimentar(self, fragmento):
+        """
+        Procesa un fragmento de la entrada
+        Devuelve False si la entrada ya fue rechazada (no hace falta seguir leyendo)
+        """
+        if self.rechazada:
+            return False
+        self.caracteres += len(fragmento)
+        self.automata._verificar_caracteres(self.caracteres)
+        self.recibidos.append(fragmento)
+        if self.modo == 'auto':
+            if ' ' in fragmento:
+                self.modo = 'espacios'
+            elif self.caracteres <= self.largo_deteccion:
+                return True
+            else:
+                self.modo = 'sin_espacios'  # prefijo sin espacios: no guardar más
+        elif self.modo == 'espacios':
+            if PATRON_ESPACIO.search(fragmento) is None:
+                return True  # la última palabra sigue sin terminar
+        elif self.esperado is not None and not any(caracter in fragmento for caracter in self.esperado):
+            return True
+        self._procesar(final=False)
+        return not self.rechazada
+    
+    def cortar(self):
+        """
+        Procesa el texto pendiente como si ahí terminara la entrada (lo que llegue después
+        empieza un token nuevo), sin verificar el estado final
+        Devuelve False si la entrada ya fue rechazada.
+        """
+        if self.modo == 'auto':
+            self.modo = 'sin_espacios'
+        if not self.rechazada:
+            self._procesar(final=True)
+            self.recibidos = []
+        return not self.rechazada
+    
+    def finalizar(self):
+        """
+        Procesa el texto pendiente y devuelve True si la entrada es aceptada
+        """
+        if not self.cortar():
+            return False
+        if not self.afd.finales[self.estado]:
+            self.rechazo = {'indice': self.tokens, 'lexema': None}
+            return False
+        return True
+    
+    # Alias con los nombres habituales de las APIs de flujo
+    feed = alimentar
+    finish = finalizar
+    
+    def _procesar(self, final):
+        if self.recibidos:
+            self.pendiente += ''.join(self.recibidos)
+            self.recibidos = []
+        estadisticas = self.automata.estadisticas
+        if estadisticas is None:
+            self._procesar_texto(final)
+        else:
+            tokens = self.tokens
+            caracteres = len(self.pendiente)
+            with estadisticas.fase('flujo'):
+                self._procesar_texto(final)
+            estadisticas.tokens += self.tokens - tokens
+            estadisticas.caracteres += caracteres - len(self.pendiente)
+    
+    def _procesar_texto(self, final):
+        texto = self.pendiente
+        if self.modo == 'espacios':
+            palabras = texto.split()
+            # La última palabra puede continuar en el próximo fragmento
+            if not final and palabras and not texto[-1].isspace():
+                self.pendiente = palabras.pop()
+            else:
+                self.pendiente = ''
+            for numero, palabra in enumerate(palabras):
+                self._avanzar(self.automata.clasificar_palabra(palabra), palabra)
+                if self.rechazada:
+                    coincidencias = PATRON_PALABRA.finditer(texto)
+                    for _ in range(numero + 1):
+                        coincidencia = next(coincidencias)
+                    self._ubicar_rechazo(coincidencia.start(), palabra)
+                    return
+            self.consumidos += len(texto) - len(self.pendiente)
+        else:
+            i = 0
+            n = len(texto)
+            siguiente_token = self.automata.siguiente_token_sin_espacios
+            busquedas = {}
+            while i < n:
+                resultado = siguiente_token(texto, i, final, busquedas)
+                if resultado is None:
+                    break
+                palabras, fin = resultado
+                for numero, palabra in enumerate(palabras):
+                    self._avanzar(self.automata.clasificar_palabra(palabra), palabra)
+                    if self.rechazada:
+                        # El ';' que sigue a un token es el último caracter del grupo
+                        self._ubicar_rechazo(fin - 1 if numero else i, palabra)
+                        return
+                i = fin
+            self.pendiente = texto[i:]
+            self.consumidos += i
+            self.esperado = self._esperado()
+    
+    def _ubicar_rechazo(self, inicio, palabra):
+        # inicio: posición de palabra en el texto procesado; si lo rechazado fue el ';'
+        # con el que termina la palabra, el token empieza en ese ';'
+        if self.rechazo['lexema'] == ';' and len(palabra) > 1:
+            inicio += len(palabra) - 1
+        self.inicio_rechazo = self.consumidos + inicio
+    
+    def _esperado(self):
+        # Caracteres que pueden decidir el token pendiente (ver siguiente_token_sin_espacios);
+        # None si cualquier caracter puede hacerlo
+        pendiente = self.pendiente
+        if len(pendiente) <= self.largo_palabra:
+            return None  # puede ser el comienzo de una palabra reservada
+        if pendiente[0] == '<':
+            # Elemento o asignación <var>=<exp>: falta un '>' salvo que ya esté completo
+            # (hay que ver si sigue un ';') o termine en '>=' (hay que ver si sigue un '<')
+            return None if pendiente.endswith(('>', '>=')) else '>'
+        if '<' in pendiente:
+            # Asignación var=<exp>: falta el '>' salvo que ya esté completa
+            return None if pendiente[-1] == '>' else '>'
+        return '<;'  # Segmento sin delimitador
+    
+    def _avanzar(self, categorias, palabra):
+        afd = self.afd
+        for categoria in categorias:
+            self.tokens += 1
+            self.automata._verificar_tokens(self.tokens)
+            self.estado = afd.tabla[self.estado * afd.n_simbolos + afd.simbolos[categoria]]
+            if self.estado == afd.estado_muerto:
+                self.rechazada = True
+                self.pendiente = ''
+                lexema = ';' if categoria == 'PUNTO_COMA' else palabra.rstrip(';') or palabra
+                self.rechazo = {'indice': self.tokens - 1, 'lexema': lexema}
+                return
+
+
+class DocumentoIncremental:
+    """
+    Reconocimiento incremental de un texto que se edita (p. ej. desde un editor)
+    Para cada token guarda dónde termina, su símbolo, hasta qué posición miró el
+    tokenizador para decidirlo (alcance) y el estado del AFD después de él (punto de control).
+    editar() vuelve a tokenizar desde el último token que la edición no afecta hasta que
+    un token nuevo termina donde terminaba uno anterior; después recorre el AFD sobre los
+    símbolos guardados hasta que el estado coincide con el de la vez anterior.
+    
+    Los estados guardados siguen una variante del AFD que, en lugar de pasar al estado
+    muerto, se queda en el estado anterior y marca el token como rechazo (bit 0 del valor
+    guardado). Así, después de un error de tipeo, el recorrido vuelve a coincidir con el
+    anterior en pocos tokens y deshacerlo no obliga a recorrer el resto del documento.
+    El desplazamiento de las posiciones de los tokens que siguen a la última edición se
+    aplica en forma diferida (_corte, _desplazamiento).
+    """
+    def __init__(self, automata, texto=''):
+        self.automata = automata
+        self.reemplazar(texto)
+    
+    def reemplazar(self, texto):
+        """
+        Reemplaza todo el texto y lo tokeniza completo
+        """
+        self.automata._verificar_caracteres(len(texto))
+        self.afd = self.automata._afd or self.automata.compilar()
+        self.texto = texto
+        self.espacios = texto.count(' ')  # con al menos un ' ' se tokeniza por palabras
+        self.fines = []      # posición donde termina cada token
+        self.alcances = []   # mayor alcance de los tokens hasta cada uno (inclusive)
+        self.codigos = []    # símbolo del AFD de cada token
+        self.estados = []    # estado después de cada token * 2 + 1 si el token fue un rechazo
+        self.rechazos = 0    # tokens marcados como rechazo
+        self._corte = 0      # a las posiciones desde el token _corte les falta sumar _desplazamiento
+        self._desplazamiento = 0
+        self.tokens_reprocesados = 0
+        self.estados_reprocesados = 0
+        self._retokenizar(0, 0, 0)
+    
+    def editar(self, inicio, fin, texto_nuevo):
+        """
+        Reemplaza texto[inicio:fin] por texto_nuevo
+        Devuelve True si el texto resultante es aceptado
+        """
+        texto = self.texto
+        if not 0 <= inicio <= fin <= len(texto):
+            raise ValueError(f"Rango de edición inválido: {inicio}:{fin} (largo {len(texto)})")
+        self.automata._verificar_caracteres(len(texto) - (fin - inicio) + len(texto_nuevo))
+        espacios = self.espacios - texto.count(' ', inicio, fin) + texto_nuevo.count(' ')
+        self.texto = texto[:inicio] + texto_nuevo + texto[fin:]
+        if (espacios > 0) != (self.espacios > 0):
+            # Cambia el modo de tokenización: todos los tokens pueden cambiar
+            self.reemplazar(self.texto)
+        else:
+            self.espacios = espacios
+            self._retokenizar(inicio, fin, len(texto_nuevo) - (fin - inicio))
+        return self.aceptada()
+    
+    def aceptada(self):
+        """
+        Devuelve True si el texto actual es aceptado
+        """
+        if self.rechazos:
+            return False
+        estado = self.estados[-1] >> 1 if self.estados else self.afd.estado_inicial
+        return self.afd.finales[estado]
+    
+    def primer_rechazo(self):
+        """
+        Devuelve (índice, posición) del primer token con el que el AFD llega al estado muerto,
+        o None si eso no ocurre
+        """
+        if not self.rechazos:
+            return None
+        indice = next(j for j, estado in enumerate(self.estados) if estado & 1)
+        posicion = self._real(self.fines, indice - 1) if indice else 0
+        if self.espacios:
+            posicion = PATRON_PALABRA.search(self.texto, posicion).start()
+        return indice, posicion
+    
+    def _real(self, lista, j):
+        # Posición actual del token j (fines o alcances), con el desplazamiento pendiente
+        if j >= self._corte:
+            return lista[j] + self._desplazamiento
+        return lista[j]
+    
+    def _contar_hasta(self, lista, valor):
+        # Cantidad de elementos de la lista (no decreciente) que valen a lo sumo 'valor'
+        bajo, alto = 0, len(lista)
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if self._real(lista, medio) <= valor:
+                bajo = medio + 1
+            else:
+                alto = medio
+        return bajo
+    
+    def _retokenizar(self, inicio, fin, delta):
+        # texto[inicio:fin] fue reemplazado por un texto de (fin - inicio + delta) caracteres
+        simbolos = self.afd.simbolos
+        fines = self.fines
+        alcances = self.alcances
+        total = len(fines)
+        
+        # Los tokens que no miraron nada desde 'inicio' siguen igual
+        primero = self._contar_hasta(alcances, inicio)
+        if primero:
+            posicion = self._real(fines, primero - 1)
+            alcance = self._real(alcances, primero - 1)
+        else:
+            posicion, alcance = 0, 0
+        
+        fin_edicion = fin + delta
+        viejo = max(primero, self._contar_hasta(fines, fin - 1))  # primer token viejo que termina desde fin
+        nuevos_fines = []
+        nuevos_alcances = []
+        nuevos_codigos = []
+        sincronizado = None
+        for fin_token, alcance_token, categoria in self._tokens(posicion):
+            if alcance_token > alcance:
+                alcance = alcance_token
+            nuevos_fines.append(fin_token)
+            nuevos_alcances.append(alcance)
+            nuevos_codigos.append(simbolos[categoria])
+            if fin_token < fin_edicion:
+                continue
+            # Después de la edición: buscar un token viejo que termine en el mismo lugar
+            fin_viejo = fin_token - delta
+            while viejo < total and self._real(fines, viejo) < fin_viejo:
+                viejo += 1
+            if viejo < total and self._real(fines, viejo) == fin_viejo:
+                # Los alcances acumulados de los tokens siguientes también tienen que seguir valiendo
+                alcance_viejo = self._real(alcances, viejo)
+                if alcance_viejo + delta == alcance or (alcance_viejo <= fin_viejo + 1 and
+                                                        alcance <= fin_token + 1):
+                    sincronizado = viejo
+                    break
+        
+        fin_reemplazo = total if sincronizado is None else sincronizado + 1
+        cantidad = len(nuevos_fines)
+        self.tokens_reprocesados = cantidad
+        
+        # Aplicar el desplazamiento pendiente a los tokens que quedan fuera del nuevo corte
+        corte, desplazamiento = self._corte, self._desplazamiento
+        if desplazamiento:
+            for j in range(corte, primero):
+                fines[j] += desplazamiento
+                alcances[j] += desplazamiento
+            for j in range(fin_reemplazo, corte):
+                fines[j] -= desplazamiento
+                alcances[j] -= desplazamiento
+        fines[primero:fin_reemplazo] = nuevos_fines
+        alcances[primero:fin_reemplazo] = nuevos_alcances
+        self.codigos[primero:fin_reemplazo] = nuevos_codigos
+        reemplazados = self.estados[primero:fin_reemplazo]
+        self.rechazos -= sum(estado & 1 for estado in reemplazados)
+        self.estados[primero:fin_reemplazo] = [0] * cantidad
+        self._corte = primero + cantidad
+        self._desplazamiento = desplazamiento + delta
+        self._propagar(primero, primero + cantidad)
+    
+    def _propagar(self, desde, hasta):
+        # Recalcula los estados desde el token 'desde'; pasado 'hasta' se detiene en cuanto
+        # el estado coincide con el guardado (los siguientes tampoco cambian)
+        afd = self.afd
+        tabla = afd.tabla
+        n_simbolos = afd.n_simbolos
+        muerto = afd.estado_muerto
+        codigos = self.codigos
+        estados = self.estados
+        total = len(estados)
+        estado = estados[desde - 1] >> 1 if desde else afd.estado_inicial
+        rechazos = 0
+        j = desde
+        while j < total:
+            siguiente = tabla[estado * n_simbolos + codigos[j]]
+            if siguiente == muerto:
+                guardado = estado << 1 | 1  # rechazo: seguir desde el mismo estado
+            else:
+                guardado = siguiente << 1
+                estado = siguiente
+            anterior = estados[j]
+            if j >= hasta and anterior == guardado:
+                break
+            rechazos += (guardado & 1) - (anterior & 1)
+            estados[j] = guardado
+            j += 1
+        self.rechazos += rechazos
+        self.estados_reprocesados = j - desde
+    
+    def _tokens(self, posicion):
+        # Genera (fin, alcance, categoria) de los tokens desde 'posicion'
+        # El alcance es la primera posición que el tokenizador no necesitó mirar
+        texto = self.texto
+        clasificar = self.automata.clasificar_lexema
+        if self.espacios:
+            # Una palabra depende de sus caracteres y del siguiente (que debe ser un espacio)
+            for coincidencia in PATRON_PALABRA.finditer(texto, posicion):
+                palabra = coincidencia.group()
+                fin = coincidencia.end()
+                if palabra[-1] == ';' and len(palabra) > 1:
+                    yield fin - 1, fin + 1, clasificar(palabra[:-1])
+                    yield fin, fin + 1, 'PUNTO_COMA'
+                else:
+                    yield fin, fin + 1, clasificar(palabra)
+        else:
+            siguiente_token = self.automata.siguiente_token_sin_espacios
+            busquedas = {}
+            i = posicion
+            n = len(texto)
+            while i < n:
+                tokens, siguiente = siguiente_token(texto, i, True, busquedas)
+                alcance = self._alcance_sin_espacios(i, siguiente)
+                if len(tokens) == 2:
+                    yield siguiente - 1, alcance, clasificar(tokens[0])
+                    yield siguiente, alcance, 'PUNTO_COMA'
+                else:
+                    yield siguiente, alcance, clasificar(tokens[0])
+                i = siguiente
+    
+    def _alcance_sin_espacios(self, i, siguiente):
+        # Menor prefijo (a saltos crecientes) con el que el token que empieza en i ya se
+        # decide con final=False; si mira más allá de LARGO_MAXIMO_ALCANCE se toma todo el texto
+        texto = self.texto
+        n = len(texto)
+        siguiente_token = self.automata.siguiente_token_sin_espacios
+        paso = 1
+        while paso <= LARGO_MAXIMO_ALCANCE and siguiente + paso <= n:
+            if siguiente_token(texto[i:siguiente + paso], 0, False) is not None:
+                return siguiente + paso
+            paso *= 2
+        return n + 1
+
+
+class GeneradorProgramas:
+    """
+    Generador de programas aleatorios (reproducible con una semilla) a partir del autómata
+    Recorre el AFD compilado desde transiciones (con ELEMENTO ya resuelto por contexto)
+    eligiendo en cada estado una transición al azar según los pesos por categoría, y se
+    dirige al estado final por el camino más corto al acercarse a la cantidad de tokens pedida.
+    Las mutaciones quitan un token de una categoría (un ';', un finsi, un hacer, ...) para
+    obtener programas casi válidos; la etiqueta 'aceptada' se calcula con el AFD, no se supone.
+    Los programas se escriben por partes: la memoria no depende de su tamaño.
+    Estilos: 'espaciado' (una línea), 'multilinea' (una instrucción por línea, sin líneas
+    vacías) y 'pascal' (PascalCase sin espacios).
+    """
+    ESTILOS = ('espaciado', 'multilinea', 'pascal')
+    MUTACIONES = {
+        'falta_punto_coma': 'PUNTO_COMA',
+        'falta_finsi': 'FINSI',
+        'falta_hacer': 'HACER',
+        'falta_entonces': 'ENTONCES',
+        'falta_finmientras': 'FINMIENTRAS',
+        'falta_termina': 'TERMINA',
+    }
+    NOMBRES = ('x', 'y', 'n', 'i', 'contador', 'total', 'valor1', 'resultado', 'condicion', 'dato')
+    ABREN = ('COMIENZA', 'ENTONCES', 'SINO', 'HACER', 'REPETIR')   # aumentan la sangría
+    CIERRAN = ('SINO', 'FINSI', 'FINMIENTRAS', 'HASTAQUE', 'TERMINA')  # la reducen
+    TERMINAN_LINEA = ('PUNTO_COMA', 'FINSI', 'FINMIENTRAS')
+    
+    def __init__(self, automata=None, semilla=None, pesos=None):
+        import random
+        
+        self.automata = automata if automata is not None else AutomataReconocedor()
+        self.aleatorio = random.Random(semilla)
+        self.afd = afd = self.automata._afd or self.automata.compilar()
+        self.categorias = sorted(afd.simbolos, key=afd.simbolos.get)
+        pesos = pesos or {}
+        n = afd.n_simbolos
+        estados = len(afd.tabla) // n
+        
+        # Transiciones útiles de cada estado: (categoría, destino) sin pasar al estado muerto
+        self.salidas = [[(categoria, afd.tabla[estado * n + codigo])
+                         for codigo, categoria in enumerate(self.categorias)
+                         if afd.tabla[estado * n + codigo] != afd.estado_muerto and pesos.get(categoria, 1) > 0]
+                        for estado in range(estados)]
+        
+        # distancia[estado]: tokens mínimos hasta un estado final (búsqueda hacia atrás)
+        infinito = float('inf')
+        self.distancia = [0 if afd.finales[estado] else infinito for estado in range(estados)]
+        cambio = True
+        while cambio:
+            cambio = False
+            for estado in range(estados):
+                for _, destino in self.salidas[estado]:
+                    if self.distancia[destino] + 1 < self.distancia[estado]:
+                        self.distancia[estado] = self.distancia[destino] + 1
+                        cambio = True
+        self.pesos = {categoria: pesos.get(categoria, 1) for categoria in self.categorias}
+        self._hacia = {}
+        
+        # Lejos del final (más tokens restantes que 'holgura') las opciones de cada estado no
+        # dependen de los tokens restantes: se precalculan con sus pesos acumulados
+        self.holgura = max(d for d in self.distancia if d != infinito) + 2
+        self.libres = []
+        for salidas in self.salidas:
+            opciones = [(categoria, destino) for categoria, destino in salidas
+                        if self.distancia[destino] != infinito and self.salidas[destino]]
+            acumulados = []
+            total = 0
+            for categoria, _ in opciones:
+                total += self.pesos[categoria]
+                acumulados.append(total)
+            self.libres.append((opciones, acumulados, total))
+        
+        # Lexemas de las palabras reservadas (la más larga) en minúsculas y con mayúscula inicial
+        self.lexemas = {'espaciado': {}}
+        for palabra, categoria in self.automata.palabras_validas.items():
+            if len(palabra) > len(self.lexemas['espaciado'].get(categoria, '')):
+                self.lexemas['espaciado'][categoria] = palabra
+        self.lexemas['pascal'] = {categoria: palabra.capitalize()
+                                  for categoria, palabra in self.lexemas['espaciado'].items()}
+        self.lexemas['multilinea'] = self.lexemas['espaciado']
+    
+    def _distancias_hacia(self, objetivo):
+        """
+        Tokens mínimos desde cada estado hasta poder emitir la categoría objetivo
+        """
+        if objetivo not in self._hacia:
+            infinito = float('inf')
+            hacia = [0 if any(categoria == objetivo for categoria, _ in salidas) else infinito
+                     for salidas in self.salidas]
+            cambio = True
+            while cambio:
+                cambio = False
+                for estado, salidas in enumerate(self.salidas):
+                    for _, destino in salidas:
+                        if hacia[destino] + 1 < hacia[estado]:
+                            hacia[estado] = hacia[destino] + 1
+                            cambio = True
+            self._hacia[objetivo] = hacia
+        return self._hacia[objetivo]
+    
+    def simbolos(self, tokens, objetivo=None, desde=0):
+        """
+        Genera las categorías de un programa aceptado de aproximadamente 'tokens' tokens
+        Si se indica 'objetivo', a partir del token 'desde' el recorrido se desvía por el
+        camino más corto hasta emitir esa categoría (una vez), para que la mutación que la
+        quita tenga dónde aplicarse.
+        """
+        from bisect import bisect_right as bisect
+        
+        aleatorio = self.aleatorio
+        azar = aleatorio.random
+        salidas = self.salidas
+        libres = self.libres
+        holgura = self.holgura
+        distancia = self.distancia
+        finales = self.afd.finales
+        pesos = self.pesos
+        estado = self.afd.estado_inicial
+        restantes = tokens
+        hacia = self._distancias_hacia(objetivo) if objetivo is not None else None
+        indice = 0
+        while not (finales[estado] and (restantes <= 0 or not salidas[estado])):
+            if hacia is not None and indice >= desde and hacia[estado] != float('inf'):
+                if hacia[estado] == 0:
+                    hacia = None
+                    destino = next(destino for categoria, destino in salidas[estado] if categoria == objetivo)
+                    estado = destino
+                    restantes -= 1
+                    indice += 1
+                    yield objetivo
+                    continue
+                opciones = [(categoria, destino) for categoria, destino in salidas[estado]
+                            if hacia[destino] == hacia[estado] - 1]
+                categoria, estado = aleatorio.choice(opciones)
+                restantes -= 1
+                indice += 1
+                yield categoria
+                continue
+            if restantes > holgura:
+                opciones, acumulados, total = libres[estado]
+                categoria, estado = opciones[bisect(acumulados, azar() * total)]
+                restantes -= 1
+                indice += 1
+                yield categoria
+                continue
+            opciones = [(categoria, destino) for categoria, destino in salidas[estado]
+                        if distancia[destino] <= restantes - 1 and (salidas[destino] or restantes == 1)]
+            if not opciones:
+                # Sin margen: seguir el camino más corto al estado final
+                opciones = [(categoria, destino) for categoria, destino in salidas[estado]
+                            if distancia[destino] == distancia[estado] - 1]
+            categoria, estado = aleatorio.choices(opciones, [pesos[categoria] for categoria, _ in opciones])[0]
+            restantes -= 1
+            indice += 1
+            yield categoria
+    
+    def escribir_programa(self, archivo, tokens=50, estilo='espaciado', mutacion=None):
+        """
+        Escribe un programa en el archivo (o flujo de texto) por partes
+        Devuelve True si el programa escrito es aceptado por el autómata.
+        """
+        if estilo not in self.ESTILOS:
+            raise ValueError(f"Estilo desconocido: {estilo}")
+        quitar = self.MUTACIONES[mutacion] if mutacion is not None else None
+        desde = self.aleatorio.randrange(max(1, tokens // 2))  # la mutación se aplica desde ahí
+        afd = self.afd
+        tabla = afd.tabla
+        n = afd.n_simbolos
+        codigos = afd.simbolos
+        estado = afd.estado_inicial
+        lexemas = self.lexemas[estilo]
+        azar = self.aleatorio.random
+        elementos = ['<' + nombre + '>' for nombre in self.NOMBRES]
+        nombres = len(elementos)
+        espaciado = estilo != 'pascal'
+        multilinea = estilo == 'multilinea'
+        sangria = 0
+        salto = False   # salto de línea pendiente antes del próximo token
+        cortar = False  # salto pendiente tras la condición de hastaque
+        con_espacios = estilo == 'espaciado'
+        partes = []
+        largo = 0
+        primero = True
+        
+        for indice, categoria in enumerate(self.simbolos(tokens, quitar, desde)):
+            if categoria == quitar and indice >= desde:
+                quitar = None  # Mutación: este token no se escribe
+                continue
+            if estado != afd.estado_muerto:
+                estado = tabla[estado * n + codigos[categoria]]
+            
+            if categoria == 'ELEMENTO':
+                lexema = elementos[int(azar() * nombres)]
+            elif categoria == 'ASIGNACION':
+                lexema = self.NOMBRES[int(azar() * nombres)] + '=' + elementos[int(azar() * nombres)]
+            else:
+                lexema = lexemas[categoria]
+            
+            if multilinea and categoria in self.CIERRAN:
+                sangria = max(0, sangria - 1)
+                salto = salto or not primero
+            if salto and (sangria or con_espacios):
+                partes.append('\n' + '    ' * sangria)
+                con_espacios = con_espacios or sangria > 0
+            elif salto:
+                # 'comienza termina': sin ningún espacio se reconocería como texto sin espacios
+                partes.append(' ')
+            elif espaciado and not primero and categoria != 'PUNTO_COMA':
+                partes.append(' ')
+            partes.append(lexema)
+            primero = False
+            if multilinea:
+                if categoria in self.ABREN:
+                    sangria += 1
+                salto = categoria in self.ABREN or categoria in self.TERMINAN_LINEA or cortar
+                cortar = categoria == 'HASTAQUE'
+            
+            largo += 1
+            if largo >= 4096:
+                archivo.write(''.join(partes))
+                partes = []
+                largo = 0
+        archivo.write(''.join(partes))
+        return estado != afd.estado_muerto and afd.finales[estado]
+    
+    def programa(self, tokens=50, estilo='espaciado', mutacion=None):
+        """
+        Devuelve (texto, aceptada) de un programa generado
+        """
+        import io
+        
+        texto = io.StringIO()
+        aceptada = self.escribir_programa(texto, tokens, estilo, mutacion)
+        return texto.getvalue().rstrip(), aceptada
+    
+    def escribir_corpus(self, archivo, programas=None, bytes_objetivo=None, tokens=50,
+                        estilos=('espaciado',), proporcion_mutados=0.0, etiquetas=None):
+        """
+        Escribe programas en el archivo hasta completar 'programas' o 'bytes_objetivo'
+        Los programas se separan con una línea vacía: cada uno es un bloque para
+        reconocer_bloques. La cantidad de tokens de cada programa varía entre tokens/2 y 3·tokens/2.
+        Si se indica 'etiquetas' (flujo de texto) se escribe una línea JSON por programa
+        con {indice, estilo, tokens, mutacion, aceptada}. Devuelve la cantidad de programas.
+        """
+        if programas is None and bytes_objetivo is None:
+            raise ValueError("Indicar la cantidad de programas o bytes_objetivo")
+        aleatorio = self.aleatorio
+        mutaciones = sorted(self.MUTACIONES)
+        escritos = 0
+        contador = _ContadorEscritura(archivo)
+        while True:
+            if programas is not None and escritos >= programas:
+                break
+            if bytes_objetivo is not None and contador.caracteres >= bytes_objetivo:
+                break
+            estilo = aleatorio.choice(estilos)
+            cantidad = aleatorio.randint(max(1, tokens // 2), max(1, tokens * 3 // 2))
+            mutacion = aleatorio.choice(mutaciones) if aleatorio.random() < proporcion_mutados else None
+            if escritos:
+                contador.write('\n\n')
+            aceptada = self.escribir_programa(contador, cantidad, estilo, mutacion)
+            if etiquetas is not None:
+                etiquetas.write(json.dumps({'indice': escritos, 'estilo': estilo, 'tokens': cantidad,
+                                            'mutacion': mutacion, 'aceptada': aceptada}) + '\n')
+            escritos += 1
+        if escritos:
+            contador.write('\n')
+        return escritos
+
+
+class _ContadorEscritura:
+    # Envuelve un flujo de texto contando los caracteres escritos
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self.caracteres = 0
+    
+    def write(self, texto):
+        self.caracteres += len(texto)
+        return self.archivo.write(texto)
+
+
+# Ejemplos de las pruebas automáticas (también sirven como carga para los benchmarks)
+EJEMPLOS_PRUEBA = [
+    "comienza termina",
+    "comienza leer <x> termina",
+    "comienza leer <variable1> leer <y> termina",
+    "comienza leer <a> leer <b> leer <c> termina",
+    "comienza escribir <mensaje>; termina",  # Nuevo: usando escribir con punto y coma
+    "comienza escribir <resultado>; termina",  # Nuevo: escribir expresión con punto y coma
+    "comienza leer <x> escribir <x>; termina",  # Nuevo: combinando leer y escribir
+    "comienza escribir <saludo>; leer <nombre> escribir <despedida>; termina",  # Nuevo: múltiples operaciones
+    "comienza <x>=<5>; termina",  # Nuevo: asignación simple con punto y coma
+    "comienza <resultado>=<suma>; termina",  # Nuevo: asignación con nombres largos
+    "comienza leer <a> <b>=<a>; termina",  # Nuevo: combinando leer y asignación
+    "comienza <x>=<10>; escribir <x>; termina",  # Nuevo: asignación y escritura
+    "comienza <a>=<1>; <b>=<2>; <c>=<suma>; termina",  # Nuevo: múltiples asignaciones
+    "comienza si <condicion1> entonces <accion1> finsi termina",  # Nuevo: condicional simple
+    "comienza si <x> entonces <y>=<10> finsi termina",  # Nuevo: condicional con asignación
+    "comienza si <edad> entonces escribir <mensaje> finsi termina",  # Nuevo: condicional con escritura
+    "comienza si <test> entonces <inst1> <inst2> finsi termina",  # Nuevo: múltiples instrucciones
+    "comienza leer <x> si <x> entonces escribir <x> finsi termina",  # Nuevo: combinando todo
+    "comienza si <condicion> entonces <accion1> sino <accion2> finsi termina",  # Nuevo: condicional doble
+    "comienza si <x> entonces <inst1> sino <inst2> finsi termina",  # Nuevo: if-else simple
+    "comienza si <edad> entonces <msg1> <msg2> sino <msg3> finsi termina",  # Nuevo: múltiples instrucciones en ambas ramas
+    "comienza leer <x> si <x> entonces <y> sino <z> finsi termina",  # Nuevo: combinando leer con if-else
+    "comienza mientras <condicion1> hacer <accion1> finmientras termina",  # Nuevo: bucle while simple
+    "comienza mientras <x> hacer <inst1> <inst2> finmientras termina",  # Nuevo: múltiples instrucciones en while
+    "comienza leer <x> mientras <x> hacer <y>=<10> finmientras termina",  # Nuevo: combinando leer con while
+    "comienza mientras <contador> hacer <incremento> finmientras escribir <resultado> termina",  # Nuevo: while con escritura
+    "comienza repetir <accion1> hastaque <condicion1> termina",  # Nuevo: do-while simple
+    "comienza repetir <inst1> <inst2> hastaque <test> termina",  # Nuevo: múltiples instrucciones en do-while
+    "comienza leer <x> repetir <proceso> hastaque <fin> termina",  # Nuevo: combinando leer con do-while
+    "comienza repetir <calculo> hastaque <limite> escribir <resultado> termina",  # Nuevo: do-while con escritura
+    "comienza si <condicion> entonces mientras <cond2> hacer <inst> finmientras finsi termina",  # Nuevo: while dentro de if
+    "comienza mientras <condicion> hacer si <cond2> entonces <inst> finsi finmientras termina",  # Nuevo: if dentro de while
+    "comienza mientras <condicion> hacer si <cond2> entonces <inst1> sino <inst2> finsi finmientras termina",  # Nuevo: if-else dentro de while
+    # Ejemplos con PascalCase sin espacios
+    "ComenzaLeer<x>Termina",  # Nuevo: PascalCase sin espacios
+    "ComenzaEscribir<mensaje>;Termina",  # Nuevo: PascalCase escribir con punto y coma
+    "Comienza<x>=<5>;Termina",  # Nuevo: PascalCase asignación con punto y coma
+    "ComenzaSi<condicion>Entonces<accion>FinSiTermina",  # Nuevo: PascalCase condicional
+    "ComenzaMientras<contador>Hacer<incremento>FinMientrasTermina",  # Nuevo: PascalCase while
+    "ComenzaRepetir<calculo>Hasta<limite>Termina",  # Nuevo: PascalCase do-while
+    "leer <x> termina",  # Inválido: no comienza con "comienza"
+    "comienza leer termina",  # Inválido: falta variable después de leer
+    "comienza escribir termina",  # Inválido: falta expresión después de escribir
+    "comienza escribir <mensaje> termina",  # Inválido: falta punto y coma después de expresión
+    "comienza <x>=<5> termina",  # Inválido: falta punto y coma después de asignación
+    "comienza <x>= termina",  # Inválido: asignación incompleta
+    "comienza =<5> termina",  # Inválido: falta variable en asignación
+    "comienza si <cond> entonces finsi termina",  # Inválido: falta instrucción
+    "comienza si entonces <inst> finsi termina",  # Inválido: falta condición
+    "comienza si <cond> <inst> finsi termina",  # Inválido: falta 'entonces'
+    "comienza si <cond> entonces <inst> termina",  # Inválido: falta 'finsi'
+    "comienza si <cond> entonces <inst1> sino termina",  # Inválido: falta instrucción después de sino
+    "comienza si <cond> entonces sino <inst> finsi termina",  # Inválido: falta instrucción antes de sino
+    "comienza si <cond> sino <inst> finsi termina",  # Inválido: falta 'entonces'
+    "comienza mientras <cond> <inst> finmientras termina",  # Inválido: falta 'hacer'
+    "comienza mientras hacer <inst> finmientras termina",  # Inválido: falta condición
+    "comienza mientras <cond> hacer finmientras termina",  # Inválido: falta instrucción
+    "comienza mientras <cond> hacer <inst> termina",  # Inválido: falta 'finmientras'
+    "comienza repetir hastaque <cond> termina",  # Inválido: falta instrucción
+    "comienza repetir <inst> <cond> termina",  # Inválido: falta 'hastaque'
+    "comienza repetir <inst> hastaque termina",  # Inválido: falta condición
+    "comienza leer <x>",  # Inválido: no termina con "termina" 
+    "comienza termina leer <x>",  # Inválido: orden incorrecto
+]
+
+
+class CacheResultados:
+    """
+    Cache de resultados de reconocer() direccionada por contenido
+    La clave es el hash de la entrada normalizada (las palabras, si tiene espacios; la
+    cadena tal cual, si no); en disco, junto con la huella de las tablas de la gramática.
+    - Memoria: LRU acotado a 'capacidad' entradas
+    - Disco (opcional): un archivo por entrada en 'directorio'; cuando se supera
+      tam_max_disco bytes se borran las entradas usadas hace más tiempo
+    Después de modificar las tablas del autómata (palabras_validas, transiciones, ...)
+    hay que llamar a automata.compilar(), como para reconocer(), o a invalidar(): la
+    cache lo detecta porque cambia el AFD compilado, vacía la memoria y las entradas
+    anteriores del disco dejan de coincidir. Las tablas no se comparan en cada consulta.
+    """
+    def __init__(self, automata=None, capacidad=4096, directorio=None, tam_max_disco=64 * 1024 * 1024):
+        self.automata = automata if automata is not None else AutomataReconocedor()
+        self.capacidad = capacidad
+        self.directorio = directorio
+        self.tam_max_disco = tam_max_disco
+        self.memoria = OrderedDict()
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+        self._afd = None  # AFD compilado para el que se calculó la huella
+        self._huella = None
+        self._bytes_disco = None
+        if directorio is not None:
+            os.makedirs(directorio, exist_ok=True)
+    
+    def invalidar(self):
+        """
+        Vuelve a compilar el autómata y a calcular la huella de la gramática
+        Hace falta si se modificaron las tablas del autómata sin llamar a compilar().
+        """
+        self.automata.compilar()
+        self._verificar_gramatica()
+    
+    def _verificar_gramatica(self):
+        # compilar() crea un AFD nuevo: solo entonces se recalcula la huella (una
+        # comparación de identidad por consulta, en lugar de comparar las tablas)
+        afd = self.automata._afd or self.automata.compilar()
+        if afd is self._afd:
+            return
+        huella = self.automata.huella_gramatica().encode('ascii')
+        if self._huella is not None and huella != self._huella:
+            self.invalidaciones += 1
+            self.memoria.clear()
+        self._afd = afd
+        self._huella = huella
+    
+    def _normalizar(self, cadena):
+        if ' ' in cadena:
+            normalizada = 'E' + ' '.join(cadena.split())  # entrada con espacios: solo importan las palabras
+        else:
+            normalizada = 'S' + cadena
+        return normalizada.encode('utf-8', 'surrogatepass')
+    
+    def clave(self, cadena):
+        """
+        Devuelve la clave (hex) de la cadena para la gramática actual (la de la cache en disco)
+        """
+        self._verificar_gramatica()
+        return hashlib.sha256(self._huella + self._normalizar(cadena)).hexdigest()
+    
+    def reconocer(self, cadena):
+        """
+        Devuelve el resultado de automata.reconocer(cadena), usando la cache si es posible
+        """
+        self._verificar_gramatica()
+        normalizada = self._normalizar(cadena)
+        # En memoria no hace falta la huella: se vacía cuando cambia la gramática
+        clave_memoria = hashlib.sha256(normalizada).digest()
+        resultado = self.memoria.get(clave_memoria)
+        if resultado is not None:
+            self.memoria.move_to_end(clave_memoria)
+            self.aciertos_memoria += 1
+            return resultado
+        
+        clave = None
+        if self.directorio is not None:
+            clave = hashlib.sha256(self._huella + normalizada).hexdigest()
+        resultado = self._leer_disco(clave)
+        if resultado is not None:
+            self.aciertos_disco += 1
+        else:
+            self.fallos += 1
+            resultado = self.automata.reconocer(cadena)
+            self._escribir_disco(clave, resultado)
+        
+        self.memoria[clave_memoria] = resultado
+        if len(self.memoria) > self.capacidad:
+            self.memoria.popitem(last=False)
+        return resultado
+    
+    def estadisticas(self):
+        """
+        Devuelve los contadores de aciertos y fallos
+        """
+        consultas = self.aciertos_memoria + self.aciertos_disco + self.fallos
+        return {
+            'consultas': consultas,
+            'aciertos_memoria': self.aciertos_memoria,
+            'aciertos_disco': self.aciertos_disco,
+            'fallos': self.fallos,
+            'tasa_aciertos': (consultas - self.fallos) / consultas if consultas else 0.0,
+            'entradas_memoria': len(self.memoria),
+            'invalidaciones': self.invalidaciones,
+        }
+    
+    def limpiar(self):
+        """
+        Vacía la cache en memoria y en disco
+        """
+        self.memoria.clear()
+        if self.directorio is not None:
+            for ruta, _, _ in self._entradas_disco():
+                try:
+                    os.remove(ruta)
+                except OSError:
+                    pass
+            self._bytes_disco = 0
+    
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave[:2], clave)
+    
+    def _leer_disco(self, clave):
+        if self.directorio is None:
+            return None
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'rb') as archivo:
+                contenido = archivo.read()
+            os.utime(ruta)  # marcar como usada recientemente
+        except OSError:
+            return None
+        return contenido == b'1'
+    
+    def _escribir_disco(self, clave, resultado):
+        if self.directorio is None:
+            return
+        ruta = self._ruta(clave)
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(ruta, 'wb') as archivo:
+                archivo.write(b'1' if resultado else b'0')
+        except OSError:
+            return  # La cache en disco es opcional
+        if self._bytes_disco is None:
+            self._bytes_disco = sum(tamanio for _, tamanio, _ in self._entradas_disco())
+        else:
+            self._bytes_disco += TAM_ENTRADA_DISCO
+        if self._bytes_disco > self.tam_max_disco:
+            self._desalojar_disco()
+    
+    def _entradas_disco(self):
+        # Cada entrada ocupa al menos un bloque del sistema de archivos
+        for subdirectorio in os.scandir(self.directorio):
+            if subdirectorio.is_dir():
+                for entrada in os.scandir(subdirectorio.path):
+                    datos = entrada.stat()
+                    yield entrada.path, max(datos.st_size, TAM_ENTRADA_DISCO), datos.st_mtime
+    
+    def _desalojar_disco(self):
+        # Borrar las entradas usadas hace más tiempo hasta quedar en el 80% del límite
+        entradas = sorted(self._entradas_disco(), key=lambda entrada: entrada[2])
+        total = sum(tamanio for _, tamanio, _ in entradas)
+        objetivo = self.tam_max_disco * 0.8
+        for ruta, tamanio, _ in entradas:
+            if total <= objetivo:
+                break
+            try:
+                os.remove(ruta)
+                total -= tamanio
+            except OSError:
+                pass
+        self._bytes_disco = total
+
+
+def _separar_direccion(direccion):
+    # 'unix:/ruta/al/socket' -> ('unix', ruta); 'host:puerto' o 'puerto' -> ('tcp', (host, puerto))
+    if direccion.startswith('unix:'):
+        return 'unix', direccion[len('unix:'):]
+    host, _, puerto = direccion.rpartition(':')
+    return 'tcp', (host or '127.0.0.1', int(puerto))
+
+
+def responder_pedido(automata, pedido):
+    """
+    Resuelve un pedido del protocolo del servidor (un objeto JSON por línea):
+    - {"cadena": "..."} -> {"aceptada", "tokens", "rechazo"} (ver reconocer_con_posicion)
+    - {"cadenas": [...]} -> {"resultados": [...]} con un resultado por cadena
+    El campo "id" del pedido, si está, se copia en la respuesta. Una cadena que supera
+    los límites del autómata (LimiteExcedido) da {"error"}.
+    """
+    if not isinstance(pedido, dict):
+        return {'error': 'el pedido debe ser un objeto JSON'}
+    try:
+        if isinstance(pedido.get('cadena'), str):
+            respuesta = automata.reconocer_con_posicion(pedido['cadena'])
+        elif isinstance(pedido.get('cadenas'), list) and all(isinstance(cadena, str) for cadena in pedido['cadenas']):
+            respuesta = {'resultados': [automata.reconocer_con_posicion(cadena) for cadena in pedido['cadenas']]}
+        else:
+            respuesta = {'error': 'el pedido necesita "cadena" (texto) o "cadenas" (lista de textos)'}
+    except LimiteExcedido as error:
+        respuesta = {'error': str(error)}
+    if 'id' in pedido:
+        respuesta['id'] = pedido['id']
+    return respuesta
+
+
+async def _atender_conexion(automata, lector, escritor):
+    # Los pedidos de una conexión se responden en orden; el cliente puede enviar varios
+    # sin esperar las respuestas (pipelining)
+    try:
+        while True:
+            try:
+                linea = await lector.readline()
+            except ValueError:
+                escritor.write(b'{"error": "linea demasiado larga"}\n')
+                break
+            if not linea:
+                break
+            if not linea.strip():
+                continue
+            try:
+                respuesta = responder_pedido(automata, json.loads(linea))
+            except ValueError as error:
+                respuesta = {'error': f'JSON inválido: {error}'}
+            escritor.write(json.dumps(respuesta, ensure_ascii=False).encode('utf-8') + b'\n')
+            await escritor.drain()
+    except ConnectionError:
+        pass
+    finally:
+        escritor.close()
+
+
+async def servir(automata, direccion=DIRECCION_SERVIDOR, listo=None):
+    """
+    Atiende pedidos de reconocimiento en un socket local hasta que se cancela la tarea
+    El autómata se compila una sola vez y se comparte entre todas las conexiones.
+    """
+    import asyncio
+    
+    if isinstance(automata, AutomataPila):
+        automata._pila or automata.compilar_pila()
+    else:
+        automata._afd or automata.compilar()
+    
+    def atender(lector, escritor):
+        return _atender_conexion(automata, lector, escritor)
+    
+    tipo, destino = _separar_direccion(direccion)
+    if tipo == 'unix':
+        if os.path.exists(destino):
+            os.remove(destino)
+        servidor = await asyncio.start_unix_server(atender, destino, limit=LARGO_MAXIMO_PEDIDO)
+    else:
+        servidor = await asyncio.start_server(atender, *destino, limit=LARGO_MAXIMO_PEDIDO)
+    try:
+        async with servidor:
+            if listo is not None:
+                listo()
+            await servidor.serve_forever()
+    finally:
+        if tipo == 'unix' and os.path.exists(destino):
+            os.remove(destino)
+
+
+def ejecutar_servidor(automata, direccion=DIRECCION_SERVIDOR):
+    """
+    Ejecuta servir() hasta Ctrl+C o SIGTERM
+    """
+    import asyncio
+    import signal
+    
+    # SIGTERM termina igual que Ctrl+C (se borra el socket Unix al salir)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        asyncio.run(servir(automata, direccion,
+                           lambda: print(f"Servidor de reconocimiento escuchando en {direccion}", flush=True)))
+    except KeyboardInterrupt:
+        print("\nServidor detenido")
+
+
+class ClienteReconocedor:
+    """
+    Cliente asyncio del servidor de reconocimiento
+    Se pueden enviar varios pedidos sin esperar las respuestas: como el servidor responde
+    en orden, cada respuesta se asigna al pedido pendiente más antiguo.
+    """
+    def __init__(self, lector, escritor):
+        import asyncio
+        
+        self.lector = lector
+        self.escritor = escritor
+        self.pendientes = deque()  # futuros de los pedidos enviados, en orden
+        self._bucle = asyncio.get_running_loop()
+        self._recepcion = self._bucle.create_task(self._recibir())
+    
+    @classmethod
+    async def conectar(cls, direccion=DIRECCION_SERVIDOR):
+        """
+        Abre una conexión con el servidor
+        """
+        import asyncio
+        
+        tipo, destino = _separar_direccion(direccion)
+        if tipo == 'unix':
+            lector, escritor = await asyncio.open_unix_connection(destino, limit=LARGO_MAXIMO_PEDIDO)
+        else:
+            lector, escritor = await asyncio.open_connection(*destino, limit=LARGO_MAXIMO_PEDIDO)
+        return cls(lector, escritor)
+    
+    async def consultar(self, pedido):
+        """
+        Envía un pedido (diccionario) y devuelve la respuesta del servidor
+        """
+        futuro = self._bucle.create_future()
+        self.pendientes.append(futuro)
+        self.escritor.write(json.dumps(pedido, ensure_ascii=False).encode('utf-8') + b'\n')
+        await self.escritor.drain()
+        return await futuro
+    
+    async def reconocer(self, cadena):
+        """
+        Devuelve {'aceptada', 'tokens', 'rechazo'} para la cadena
+        """
+        return await self.consultar({'cadena': cadena})
+    
+    async def reconocer_varias(self, cadenas):
+        """
+        Reconoce varias cadenas con un solo pedido y devuelve la lista de resultados
+        """
+        return (await self.consultar({'cadenas': list(cadenas)}))['resultados']
+    
+    async def cerrar(self):
+        """
+        Cierra la conexión
+        """
+        self.escritor.close()
+        try:
+            await self.escritor.wait_closed()
+        except ConnectionError:
+            pass
+        self._recepcion.cancel()
+    
+    async def _recibir(self):
+        try:
+            while True:
+                linea = await self.lector.readline()
+                if not linea:
+                    break
+                self.pendientes.popleft().set_result(json.loads(linea))
+        finally:
+            while self.pendientes:
+                futuro = self.pendientes.popleft()
+                if not futuro.done():
+                    futuro.set_exception(ConnectionError("El servidor cerró la conexión"))
+
+
+def ejecutar_cliente(direccion=DIRECCION_SERVIDOR, entrada=None, salida=None):
+    """
+    Envía cada línea de la entrada (por defecto sys.stdin) como una cadena a reconocer
+    y escribe las respuestas como líneas JSON, en el mismo orden
+    """
+    import asyncio
+    import sys
+    
+    entrada = entrada or sys.stdin
+    salida = salida or sys.stdout
+    
+    async def enviar_todo():
+        cliente = await ClienteReconocedor.conectar(direccion)
+        try:
+            consultas = [asyncio.ensure_future(cliente.reconocer(linea.rstrip('\r\n')))
+                         for linea in entrada if linea.strip()]
+            for consulta in consultas:
+                salida.write(json.dumps(await consulta, ensure_ascii=False) + '\n')
+        finally:
+            await cliente.cerrar()
+    
+    asyncio.run(enviar_todo())
+
+
+class TablasCompartidas:
+    """
+    Tablas de un autómata publicadas en un segmento de memoria compartida
+    (multiprocessing.shared_memory) para que los procesos trabajadores no ejecuten
+    __init__ ni compilen, y no guarden cada uno una copia de la tabla del AFD
+    Formato del segmento: la cabecera (CABECERA); arreglos planos de enteros de 32 bits
+    con la tabla del AFD y, como índices en la lista de nombres, el índice de palabras
+    reservadas (palabra, categoría), las transiciones del AFND (origen, símbolo, destino),
+    la tabla de resolución de ELEMENTO (estado, símbolo), los estados y los estados
+    finales del AFND; los estados finales del AFD (un byte por estado) y los nombres en
+    UTF-8 separados por caracteres nulos, empezando por los símbolos del AFD en el orden
+    de sus códigos.
+    automata() usa la tabla y los estados finales del AFD directamente desde el segmento,
+    a través de memoryviews de solo lectura; las demás tablas se arman con los arreglos.
+    Solo guarda las tablas de AutomataReconocedor: una subclase con tablas propias
+    (AutomataPila) no se puede publicar.
+    El proceso que publica el segmento es su dueño: cerrar() lo elimina, y los autómatas
+    que leen de él dejan de funcionar.
+    """
+    # marca y versión; estados, símbolos, estado inicial y estado muerto del AFD; cantidad
+    # de nombres, palabras reservadas, transiciones del AFND, pares de la resolución de
+    # ELEMENTO, estados y estados finales del AFND; estado inicial del AFND; largo de los
+    # nombres en bytes; limite_caracteres y limite_tokens (-1 = sin límite)
+    CABECERA = struct.Struct('<8sI12i2q')
+    
+    def __init__(self, memoria, propietario):
+        self.memoria = memoria
+        self.propietario = propietario
+        self._vistas = []
+    
+    @property
+    def nombre(self):
+        return self.memoria.name
+    
+    @classmethod
+    def publicar(cls, automata):
+        """
+        Compila el autómata (si hace falta) y copia sus tablas a un segmento nuevo
+        ValueError si el autómata tiene tablas propias que el segmento no guarda.
+        """
+        from multiprocessing import shared_memory
+        
+        if type(automata).tablas_gramatica is not AutomataReconocedor.tablas_gramatica:
+            raise ValueError(f"{type(automata).__name__} tiene tablas que TablasCompartidas no guarda")
+        afd = automata._afd or automata.compilar()
+        nombres = sorted(afd.simbolos, key=afd.simbolos.get)
+        indices = {nombre: codigo for codigo, nombre in enumerate(nombres)}
+        
+        def indice(nombre):
+            if nombre not in indices:
+                indices[nombre] = len(nombres)
+                nombres.append(nombre)
+            return indices[nombre]
+        
+        palabras = [indice(nombre) for par in automata.palabras_validas.items() for nombre in par]
+        transiciones = [indice(nombre) for (origen, simbolo), destinos in automata.transiciones.items()
+                        for destino in sorted(destinos) for nombre in (origen, simbolo, destino)]
+        resolucion = [indice(nombre) for par in automata.resolucion_elemento for nombre in par]
+        estados = [indice(estado) for estado in sorted(automata.estados)]
+        finales = [indice(estado) for estado in sorted(automata.estados_finales)]
+        inicial = indice(automata.estado_inicial)
+        
+        enteros = array('i', afd.tabla)
+        for arreglo in (palabras, transiciones, resolucion, estados, finales):
+            enteros.extend(arreglo)
+        texto = '\0'.join(nombres).encode('utf-8')
+        contenido = enteros.tobytes() + bytes(afd.finales) + texto
+        limites = [-1 if limite is None else limite
+                   for limite in (automata.limite_caracteres, automata.limite_tokens)]
+        
+        inicio = cls.CABECERA.size
+        memoria = shared_memory.SharedMemory(create=True, size=inicio + len(contenido))
+        cls.CABECERA.pack_into(memoria.buf, 0, MARCA_COMPARTIDA, VERSION_COMPARTIDA,
+                               len(afd.finales), afd.n_simbolos, afd.estado_inicial, afd.estado_muerto,
+                               len(nombres), len(automata.palabras_validas), len(transiciones) // 3,
+                               len(automata.resolucion_elemento), len(estados), len(finales), inicial,
+                               len(texto), *limites)
+        memoria.buf[inicio:inicio + len(contenido)] = contenido
+        return cls(memoria, True)
+    
+    @classmethod
+    def adjuntar(cls, nombre):
+        """
+        Abre un segmento publicado por otro proceso (ValueError si no tiene este formato)
+        """
+        from multiprocessing import shared_memory
+        
+        compartidas = cls(shared_memory.SharedMemory(nombre), False)
+        marca, version = cls.CABECERA.unpack_from(compartidas.memoria.buf)[:2]
+        if marca != MARCA_COMPARTIDA or version != VERSION_COMPARTIDA:
+            compartidas.cerrar()
+            raise ValueError(f"El segmento {nombre} no contiene tablas de un autómata (versión {VERSION_COMPARTIDA})")
+        return compartidas
+    
+    def automata(self, clase=None):
+        """
+        Crea un autómata (por defecto, AutomataReconocedor) con las tablas del segmento
+        No ejecuta __init__ ni compila: los campos salen solo del segmento.
+        """
+        buffer = self.memoria.buf
+        (_, _, n_estados, n_simbolos, inicial_afd, muerto, n_nombres, n_palabras, n_transiciones,
+         n_resolucion, n_estados_afnd, n_finales, inicial, largo_nombres,
+         limite_caracteres, limite_tokens) = self.CABECERA.unpack_from(buffer)
+        inicio = self.CABECERA.size
+        fin_tabla = inicio + 4 * n_estados * n_simbolos
+        fin_indices = fin_tabla + 4 * (2 * n_palabras + 3 * n_transiciones + 2 * n_resolucion +
+                                       n_estados_afnd + n_finales)
+        fin_finales = fin_indices + n_estados
+        tabla = buffer[inicio:fin_tabla].cast('i').toreadonly()
+        finales_afd = buffer[fin_indices:fin_finales].cast('?').toreadonly()
+        self._vistas.extend((tabla, finales_afd))
+        nombres = str(buffer[fin_finales:fin_finales + largo_nombres], 'utf-8').split('\0')
+        if len(nombres) != n_nombres:
+            raise ValueError(f"El segmento {self.nombre} tiene {len(nombres)} nombres y la cabecera indica {n_nombres}")
+        valores = [nombres[i] for i in buffer[fin_tabla:fin_indices].cast('i').tolist()]
+        
+        posicion = 0
+        
+        def tomar(cantidad):
+            nonlocal posicion
+            posicion += cantidad
+            return valores[posicion - cantidad:posicion]
+        
+        palabras = tomar(2 * n_palabras)
+        transiciones = tomar(3 * n_transiciones)
+        resolucion = tomar(2 * n_resolucion)
+        
+        automata = (clase or AutomataReconocedor)._sin_tablas()
+        automata.palabras_validas = dict(zip(palabras[0::2], palabras[1::2]))
+        automata.transiciones = {}
+        for origen, simbolo, destino in zip(transiciones[0::3], transiciones[1::3], transiciones[2::3]):
+            automata.transiciones.setdefault((origen, simbolo), set()).add(destino)
+        automata.resolucion_elemento = list(zip(resolucion[0::2], resolucion[1::2]))
+        automata.estados = set(tomar(n_estados_afnd))
+        automata.estados_finales = set(tomar(n_finales))
+        automata.estado_inicial = nombres[inicial]
+        automata.limite_caracteres = None if limite_caracteres < 0 else limite_caracteres
+        automata.limite_tokens = None if limite_tokens < 0 else limite_tokens
+        automata.trazador = Trazador.apagado()
+        simbolos = {simbolo: codigo for codigo, simbolo in enumerate(nombres[:n_simbolos])}
+        automata._afd = AFDCompilado(simbolos, tabla, inicial_afd, muerto, finales_afd)
+        automata._compartidas = self
+        return automata
+    
+    def cerrar(self):
+        """
+        Libera las vistas del segmento y lo cierra; el dueño además lo elimina
+        """
+        for vista in self._vistas:
+            vista.release()
+        self._vistas = []
+        self.memoria.close()
+        if self.propietario:
+            self.propietario = False
+            self.memoria.unlink()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *excepcion):
+        self.cerrar()
+        return False
+
+
+# Autómata de cada proceso trabajador de reconocer_lote (se crea una vez por proceso)
+_automata_trabajador = None
+
+
+def _inicializar_trabajador(automata):
+    global _automata_trabajador
+    _automata_trabajador = automata if automata is not None else AutomataReconocedor()
+    _automata_trabajador.compilar()
+
+
+def _adjuntar_trabajador(nombre, clase):
+    global _automata_trabajador
+    _automata_trabajador = TablasCompartidas.adjuntar(nombre).automata(clase)
+
+
+@contextlib.contextmanager
+def _pool_trabajadores(procesos, automata, compartir):
+    # Pool de reconocer_lote y validar_archivos. Con compartir=True las tablas se publican
+    # en memoria compartida y los trabajadores se adjuntan en lugar de compilar (si el
+    # sistema no tiene memoria compartida o el autómata tiene tablas que el segmento no
+    # guarda, como AutomataPila, cada uno compila su copia); además el pool se
+    # crea con los objetos del proceso congelados (gc.freeze), así el recolector de los
+    # trabajadores creados con fork no los recorre y sus páginas siguen compartidas
+    import gc
+    import multiprocessing
+    
+    compartidas = None
+    if compartir:
+        try:
+            compartidas = TablasCompartidas.publicar(automata or AutomataReconocedor())
+        except (OSError, ValueError):
+            pass
+    try:
+        if compartidas is None:
+            pool = multiprocessing.Pool(procesos, initializer=_inicializar_trabajador, initargs=(automata,))
+        else:
+            clase = type(automata) if automata is not None else AutomataReconocedor
+            gc.freeze()
+            try:
+                pool = multiprocessing.Pool(procesos, initializer=_adjuntar_trabajador,
+                                            initargs=(compartidas.nombre, clase))
+            finally:
+                gc.unfreeze()
+        with pool:
+            yield pool
+    finally:
+        if compartidas is not None:
+            compartidas.cerrar()
+
+
+def _reconocer_en_trabajador(cadena):
+    return _automata_trabajador.reconocer(cadena)
+
+
+def _reconocer_indexado_en_trabajador(tarea):
+    indice, cadena = tarea
+    return indice, _automata_trabajador.reconocer(cadena)
+
+
+def reconocer_lote(cadenas, procesos=None, tam_lote=64, ordenado=True, automata=None, compartir=True):
+    """
+    Reconoce muchas cadenas repartiéndolas en un pool de procesos
+    Con compartir=True el autómata (por defecto, AutomataReconocedor()) se compila una sola
+    vez y sus tablas se publican en memoria compartida (TablasCompartidas), de donde las
+    leen los procesos; con compartir=False cada proceso compila su copia.
+    - ordenado=True: devuelve la lista de resultados en el orden de entrada
+    - ordenado=False: devuelve un iterador de (indice, resultado) a medida que terminan
+    Con procesos=1 se reconoce en el proceso actual, sin pool, con el mismo autómata (que
+    se compila la primera vez que hace falta, si todavía no se compiló).
+    """
+    if procesos == 1:
+        # Cada llamada usa su autómata (no _automata_trabajador): el iterador de
+        # ordenado=False sigue usándolo aunque después haya otras llamadas
+        reconocer = (automata if automata is not None else AutomataReconocedor()).reconocer
+        if ordenado:
+            return [reconocer(cadena) for cadena in cadenas]
+        return ((indice, reconocer(cadena)) for indice, cadena in enumerate(cadenas))
+    
+    if ordenado:
+        with _pool_trabajadores(procesos, automata, compartir) as pool:
+            return pool.map(_reconocer_en_trabajador, cadenas, tam_lote)
+    
+    def resultados():
+        with _pool_trabajadores(procesos, automata, compartir) as pool:
+            yield from pool.imap_unordered(_reconocer_indexado_en_trabajador, enumerate(cadenas), tam_lote)
+    return resultados()
+
+
+def leer_lineas_mapeadas(ruta_archivo, tam_bloque=TAM_BLOQUE_LECTURA):
+    """
+    Genera el texto de un archivo UTF-8 como pares (texto, fin_de_linea) leyendo un mapa
+    de memoria. Cada trozo se decodifica directamente desde el mapa: nunca se arma el
+    contenido completo. Las líneas de más de tam_bloque bytes se entregan en varios trozos
+    (fin_de_linea es False en todos menos el último). El texto no incluye el fin de línea.
+    """
+    with open(ruta_archivo, 'rb') as archivo:
+        try:
+            mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return  # Archivo vacío (no se puede mapear)
+    with mapa:
+        vista = memoryview(mapa)
+        try:
+            inicio = 0
+            n = len(mapa)
+            retorno = False  # el trozo anterior terminó en '\r' (puede seguir un '\n')
+            while inicio < n:
+                fin = mapa.find(b'\n', inicio, inicio + tam_bloque)
+                if fin != -1:
+                    corte, siguiente, termina = fin, fin + 1, True
+                else:
+                    corte = min(inicio + tam_bloque, n)
+                    # No cortar en medio de un caracter UTF-8 (bytes de continuación 10xxxxxx)
+                    while inicio < corte < n and mapa[corte] & 0xC0 == 0x80:
+                        corte -= 1
+                    if corte == inicio:  # Bloque menor que un caracter: tomarlo completo
+                        corte += 1
+                        while corte < n and mapa[corte] & 0xC0 == 0x80:
+                            corte += 1
+                    siguiente, termina = corte, corte == n
+                texto = str(vista[inicio:corte], 'utf-8')
+                if retorno and fin == inicio:
+                    # '\r\n' cortado entre dos trozos: el '\n' no es otra línea
+                    retorno = False
+                    inicio = siguiente
+                    continue
+                retorno = False
+                # Fines de línea universales, como al leer en modo texto ('\r\n' es uno solo)
+                if '\r' in texto:
+                    partes = texto.split('\r')
+                    for parte in partes[:-1]:
+                        yield parte, True
+                    texto = partes[-1]
+                    if not texto:
+                        retorno = not termina
+                        inicio = siguiente
+                        continue
+                yield texto, termina
+                inicio = siguiente
+        finally:
+            vista.release()
+
+
+class _BloqueArchivo:
+    """
+    Un bloque de líneas de un archivo mientras se lee (ver reconocer_bloques)
+    Cada línea elige su tokenizador: si tiene un ' ' se separa en palabras por espacios
+    y si no se usa el tokenizador sin espacios (PascalCase concatenado, como 'leer<x>;').
+    Hasta encontrar un ' ' la línea se guarda, como mucho TAM_BLOQUE_LECTURA caracteres;
+    una línea más larga sin espacios se tokeniza sin espacios (y sus ' ' se quitan).
+    Un fin de línea termina el token, salvo dentro de un elemento <...>, que puede seguir
+    en las líneas siguientes. Los ' ' dentro de un elemento se quitan: '<cualquier cosa>'
+    es un solo elemento, como cuando el archivo completo se leía sin espacios.
+    """
+    def __init__(self, automata, linea):
+        self.automata = automata
+        self.linea_inicio = self.linea_fin = linea
+        self.reconocedor = ReconocedorIncremental(automata, 'espacios')
+        self.modo = None          # tokenizador de la línea actual (None: todavía no se decidió)
+        self.modos = set()        # tokenizadores usados en el bloque
+        self.indecisa = ''        # texto de la línea actual mientras no se decidió el modo
+        self.nueva_linea = True   # lo próximo que llegue al reconocedor empieza una línea
+        self.lineas = []          # (posición en la entrada del reconocedor, línea) desde el último corte
+        self.vista_previa = ''
+        self.en_elemento = False  # el texto recibido termina dentro de un <...>
+    
+    def agregar(self, texto, linea):
+        """
+        Agrega parte de una línea (sin los espacios del principio y del final de la línea)
+        """
+        self.linea_fin = linea
+        if self.modo is None:
+            self.indecisa += texto
+            if ' ' in texto:
+                self._decidir('espacios')
+            elif len(self.indecisa) > TAM_BLOQUE_LECTURA:
+                self._decidir('sin_espacios')
+            return
+        if self.modo == 'sin_espacios':
+            texto = texto.replace(' ', '')
+        self._alimentar(texto)
+    
+    def terminar_linea(self):
+        if self.modo is None and self.indecisa:
+            self._decidir('sin_espacios')
+        # Fuera de un elemento el fin de línea termina el token; las posiciones de las
+        # líneas anteriores ya no hacen falta
+        if not self.en_elemento and self.reconocedor.cortar():
+            self.lineas = []
+        self.modo = None
+        self.nueva_linea = True
+    
+    def terminar(self):
+        """
+        Devuelve el resultado del bloque
+        {'linea_inicio', 'linea_fin', 'modo', 'aceptada', 'tokens', 'rechazo', 'vista_previa'};
+        modo es 'espacios', 'sin_espacios' o 'mixto' (líneas con y sin espacios) y rechazo
+        es None o {'indice', 'lexema', 'linea'} (linea: donde empieza el token rechazado, o
+        la última línea si el bloque terminó antes de completar el pseudocódigo).
+        """
+        if self.modo is None and self.indecisa:
+            self._decidir('sin_espacios')
+        reconocedor = self.reconocedor
+        aceptada = reconocedor.finalizar()
+        rechazo = None
+        if reconocedor.rechazo is not None:
+            linea = self.linea_fin
+            if reconocedor.rechazo['lexema'] is not None:
+                linea = next((numero for inicio, numero in reversed(self.lineas)
+                              if inicio <= reconocedor.inicio_rechazo), self.linea_fin)
+            rechazo = dict(reconocedor.rechazo, linea=linea)
+        vista_previa = self.vista_previa
+        if len(vista_previa) == LARGO_VISTA_PREVIA:
+            vista_previa += '...'
+        modo = self.modos.pop() if len(self.modos) == 1 else 'mixto'
+        return {'linea_inicio': self.linea_inicio, 'linea_fin': self.linea_fin, 'modo': modo,
+                'aceptada': aceptada, 'tokens': reconocedor.tokens, 'rechazo': rechazo,
+                'vista_previa': vista_previa}
+    
+    def _decidir(self, modo):
+        self.modo = modo
+        self.modos.add(modo)
+        self.reconocedor.modo = modo
+        texto = self.indecisa
+        self.indecisa = ''
+        self._alimentar(texto)
+    
+    def _unir_elementos(self, texto):
+        # Quita los ' ' de los elementos <...> (que pueden seguir en el próximo texto)
+        if ' ' not in texto:
+            # Nada que quitar: solo importa si el texto termina dentro de un elemento
+            cierre = texto.rfind('>')
+            apertura = texto.rfind('<')
+            if apertura > cierre:
+                self.en_elemento = True
+            elif cierre != -1:
+                self.en_elemento = False
+            return texto
+        if not self.en_elemento and '<' not in texto:
+            return texto
+        partes = []
+        i = 0
+        n = len(texto)
+        while i < n:
+            if self.en_elemento:
+                fin = texto.find('>', i)
+                fin = n if fin == -1 else fin + 1
+                partes.append(texto[i:fin].replace(' ', ''))
+                self.en_elemento = fin == n and texto[-1] != '>'
+            else:
+                fin = texto.find('<', i)
+                if fin == -1:
+                    fin = n
+                else:
+                    self.en_elemento = True
+                partes.append(texto[i:fin])
+            i = fin
+        return ''.join(partes)
+    
+    def _alimentar(self, texto):
+        reconocedor = self.reconocedor
+        continua = self.en_elemento  # la línea sigue un elemento de la anterior
+        texto = self._unir_elementos(texto)
+        if len(self.vista_previa) < LARGO_VISTA_PREVIA:
+            if self.nueva_linea and self.vista_previa and not continua:
+                texto_previa = ' ' + texto
+            else:
+                texto_previa = texto
+            self.vista_previa += texto_previa[:LARGO_VISTA_PREVIA - len(self.vista_previa)]
+        if reconocedor.rechazada:
+            return
+        if self.nueva_linea:
+            self.lineas.append((reconocedor.caracteres, self.linea_fin))
+        self.nueva_linea = False
+        reconocedor.alimentar(texto)
+
+
+def reconocer_bloques(automata, ruta_archivo, por_linea=False):
+    """
+    Divide el archivo en bloques de líneas separados por líneas vacías o comentarios (#)
+    y genera el resultado de cada bloque en cuanto termina (ver _BloqueArchivo.terminar).
+    Con por_linea=True cada línea es un bloque. Las líneas se leen por trozos de un mapa de
+    memoria y cada bloque se tokeniza a medida que llega, por lo que la memoria no depende
+    del tamaño del archivo ni de la cantidad de bloques.
+    """
+    bloque = None
+    numero = 1
+    inicio_linea = True       # en la línea solo hubo espacios en blanco
+    comentario = False
+    espacios_finales = ''     # espacios en blanco que solo se conservan si la línea sigue
+    for texto, fin_de_linea in leer_lineas_mapeadas(ruta_archivo):
+        if inicio_linea:
+            texto = texto.lstrip()
+            if texto:
+                inicio_linea = False
+                if texto[0] == '#':
+                    comentario = True
+                    if bloque is not None:
+                        yield bloque.terminar()
+                        bloque = None
+                elif bloque is None:
+                    bloque = _BloqueArchivo(automata, numero)
+        if texto and not comentario:
+            texto = espacios_finales + texto
+            contenido = texto.rstrip()
+            espacios_finales = texto[len(contenido):]
+            if contenido:
+                bloque.agregar(contenido, numero)
+        if fin_de_linea:
+            if bloque is not None:
+                if inicio_linea or por_linea:  # Línea vacía: termina el bloque
+                    yield bloque.terminar()
+                    bloque = None
+                else:
+                    bloque.terminar_linea()
+            numero += 1
+            inicio_linea = True
+            comentario = False
+            espacios_finales = ''
+    if bloque is not None:
+        yield bloque.terminar()
+
+
+def procesar_archivo(automata, ruta_archivo, modo='multilinea'):
+    """
+    Procesa el archivo de texto mostrando el resultado de cada pseudocódigo a medida que se
+    reconoce: en modo 'multilinea' un pseudocódigo puede ocupar varias líneas (bloques
+    separados por líneas vacías o comentarios) y en modo 'individual' cada línea es uno.
+    Cada línea elige su tokenizador (ver _BloqueArchivo): una línea con un ' ' se
+    tokeniza por palabras, como analizar_palabras con espacios, y una sin espacios como
+    'leer<x>;' se lee sin espacios (PascalCase concatenado).
+    Devuelve {'aceptados', 'rechazados'}.
+    """
+    try:
+        print(f"\nPROCESANDO ARCHIVO: {ruta_archivo}")
+        print("=" * 50)
+        
+        if modo == 'individual':
+            return procesar_modo_individual(automata, ruta_archivo)
+        return procesar_modo_multilinea(automata, ruta_archivo)
             
     except FileNotFoundError:
         print(f"Error: No se pudo encontrar el archivo '{ruta_archivo}'")
         print("Asegúrate de que el archivo existe y la ruta es correcta.")
     except Exception as e:
         print(f"Error al procesar el archivo: {e}")
-def procesar_modo_individual(automata, lineas):
+
+
+def expandir_rutas(argumentos, extension='.txt'):
     """
-    Procesa el archivo en modo líneas individuales (modo tradicional)
+    Genera los archivos a validar a partir de rutas, directorios (recorridos en forma
+    recursiva, solo archivos con la extensión indicada) y patrones glob ('ejemplo*.txt', '**/*.txt')
     """
-    for i, linea in enumerate(lineas, 1):
-        cadena = linea.strip()
-        if not cadena or cadena.startswith('#'):  # Ignorar líneas vacías y comentarios
-            continue
-            
-        print(f"\nLínea {i}: '{cadena}'")
-        resultado = automata.procesar_cadena(cadena)
-        print(f"Resultado: {'ACEPTADA' if resultado else 'RECHAZADA'}")
-        print("-" * 30)
+    import glob
+    
+    for argumento in argumentos:
+        if glob.has_magic(argumento):
+            for ruta in sorted(glob.iglob(argumento, recursive=True)):
+                if os.path.isdir(ruta):
+                    yield from expandir_rutas([ruta], extension)
+                else:
+                    yield ruta
+        elif os.path.isdir(argumento):
+            for directorio, subdirectorios, archivos in os.walk(argumento):
+                subdirectorios.sort()
+                for nombre in sorted(archivos):
+                    if nombre.endswith(extension):
+                        yield os.path.join(directorio, nombre)
+        else:
+            yield argumento
+
+
+def _validar_en_trabajador(ruta_archivo):
+    # Un registro por bloque del archivo; los errores de lectura también son un registro
+    return list(_registros_archivo(_automata_trabajador, ruta_archivo))
+
 
-def procesar_modo_multilinea(automata, contenido):
+def _registros_archivo(automata, ruta_archivo):
+    inicio = time.perf_counter()
+    bloques = 0
+    try:
+        for resultado in reconocer_bloques(automata, ruta_archivo):
+            fin = time.perf_counter()
+            bloques += 1
+            yield {'archivo': ruta_archivo, 'linea_inicio': resultado['linea_inicio'],
+                   'linea_fin': resultado['linea_fin'], 'aceptada': resultado['aceptada'],
+                   'tokens': resultado['tokens'], 'rechazo': resultado['rechazo'], 'segundos': fin - inicio}
+            inicio = fin
+    except (OSError, UnicodeDecodeError, LimiteExcedido) as error:
+        yield {'archivo': ruta_archivo, 'aceptada': None, 'error': str(error),
+               'segundos': time.perf_counter() - inicio}
+        return
+    if not bloques:  # vacío o solo comentarios
+        yield {'archivo': ruta_archivo, 'aceptada': None, 'tokens': 0, 'rechazo': None,
+               'segundos': time.perf_counter() - inicio}
+
+
+def validar_archivos(rutas, procesos=None, tam_lote=16, automata=None, compartir=True):
     """
-    Procesa el archivo en modo multi-línea donde un pseudocódigo
-    puede estar dividido en múltiples líneas
-    """
-    # Dividir por bloques separados por líneas vacías o comentarios
-    bloques = []
-    bloque_actual = []
-    
-    for linea in contenido.split('\n'):
-        linea_limpia = linea.strip()
-        
-        # Si es línea vacía o comentario, finalizar bloque actual
-        if not linea_limpia or linea_limpia.startswith('#'):
-            if bloque_actual:
-                # Unir todas las líneas del bloque en una sola cadena
-                pseudocodigo = ' '.join(bloque_actual)
-                bloques.append(pseudocodigo)
-                bloque_actual = []
+    Valida muchos archivos (ver reconocer_bloques) en un pool de procesos
+    Genera un registro por bloque a medida que terminan los archivos (no necesariamente
+    en orden): {'archivo', 'linea_inicio', 'linea_fin', 'aceptada', 'tokens', 'rechazo',
+    'segundos'}, o {'archivo', 'aceptada': None, 'error', ...} si no se pudo leer o un bloque
+    supera los límites del autómata (los bloques siguientes no se validan). Un archivo
+    vacío o con solo comentarios da un registro con aceptada None. Con procesos=1 (o una
+    sola CPU) se valida en el proceso actual y los registros salen a medida que se leen.
+    compartir: como en reconocer_lote (tablas en memoria compartida o una copia por proceso).
+    """
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1:
+        automata = automata if automata is not None else AutomataReconocedor()
+        for ruta in rutas:
+            yield from _registros_archivo(automata, ruta)
+        return
+    with _pool_trabajadores(procesos, automata, compartir) as pool:
+        for registros in pool.imap_unordered(_validar_en_trabajador, rutas, tam_lote):
+            yield from registros
+
+
+def ejecutar_validacion(argumentos, salida=None, automata=None):
+    """
+    Modo --validar: valida los archivos, directorios o patrones indicados y escribe una
+    línea JSON por bloque en la salida (por defecto stdout); el resumen va a stderr
+    Opciones: --procesos N
+    """
+    import sys
+    
+    salida = salida or sys.stdout
+    procesos = None
+    rutas = []
+    argumentos = iter(argumentos)
+    for argumento in argumentos:
+        if argumento == '--procesos':
+            procesos = int(next(argumentos, '0'))
+        elif argumento.startswith('--procesos='):
+            procesos = int(argumento.partition('=')[2])
         else:
-            bloque_actual.append(linea_limpia)
+            rutas.append(argumento)
     
-    # Procesar último bloque si existe
-    if bloque_actual:
-        pseudocodigo = ' '.join(bloque_actual)
-        bloques.append(pseudocodigo)
+    inicio = time.perf_counter()
+    conteo = {'aceptados': 0, 'rechazados': 0, 'omitidos': 0, 'errores': 0}
+    for registro in validar_archivos(expandir_rutas(rutas), procesos, automata=automata):
+        salida.write(json.dumps(registro, ensure_ascii=False) + '\n')
+        if 'error' in registro:
+            conteo['errores'] += 1
+        elif registro['aceptada'] is None:
+            conteo['omitidos'] += 1
+        else:
+            conteo['aceptados' if registro['aceptada'] else 'rechazados'] += 1
+    salida.flush()
+    total = sum(conteo.values())
+    print(f"{total} registros en {time.perf_counter() - inicio:.2f} s: " +
+          ", ".join(f"{cantidad} {nombre}" for nombre, cantidad in conteo.items()), file=sys.stderr)
+    return conteo
+
+
+def leer_cantidad(texto):
+    """
+    Convierte una cantidad de la línea de comandos en un entero ('64K', '16M', '1G' o '1000')
+    """
+    multiplo = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}.get(texto[-1:].upper(), 1)
+    return int(texto.rstrip('kKmMgG')) * multiplo
+
+
+def ejecutar_generacion(argumentos, salida=None):
+    """
+    Modo --generar: escribe programas generados en la salida (por defecto stdout)
+    Opciones: --programas N, --bytes N (admite K, M y G), --tokens N, --estilos a,b,
+    --mutados P (proporción de programas mutados), --semilla S y --etiquetas RUTA
+    (una línea JSON por programa). Sin --programas ni --bytes genera 10 programas.
+    """
+    import sys
     
-    # Si solo hay un bloque, procesar todo como una sola cadena
-    if len(bloques) == 1:
-        print(f"\nPseudocódigo completo: '{bloques[0]}'")
-        resultado = automata.procesar_cadena(bloques[0])
-        print(f"Resultado: {'ACEPTADA' if resultado else 'RECHAZADA'}")
+    salida = salida or sys.stdout
+    opciones = {'programas': None, 'bytes': None, 'tokens': '50', 'estilos': 'espaciado',
+                'mutados': '0', 'semilla': None, 'etiquetas': None}
+    argumentos = iter(argumentos)
+    for argumento in argumentos:
+        nombre, igual, valor = argumento[2:].partition('=')
+        if not argumento.startswith('--') or nombre not in opciones:
+            raise ValueError(f"Opción de --generar desconocida: {argumento}")
+        opciones[nombre] = valor if igual else next(argumentos, None)
+    
+    bytes_objetivo = opciones['bytes']
+    if bytes_objetivo is not None:
+        bytes_objetivo = leer_cantidad(bytes_objetivo)
+    programas = int(opciones['programas']) if opciones['programas'] is not None else None
+    if programas is None and bytes_objetivo is None:
+        programas = 10
+    semilla = int(opciones['semilla']) if opciones['semilla'] is not None else None
+    
+    generador = GeneradorProgramas(semilla=semilla)
+    etiquetas = open(opciones['etiquetas'], 'w', encoding='utf-8') if opciones['etiquetas'] else None
+    try:
+        escritos = generador.escribir_corpus(salida, programas, bytes_objetivo, int(opciones['tokens']),
+                                             tuple(opciones['estilos'].split(',')),
+                                             float(opciones['mutados']), etiquetas)
+    finally:
+        if etiquetas is not None:
+            etiquetas.close()
+    salida.flush()
+    print(f"{escritos} programas generados", file=sys.stderr)
+    return escritos
+
+
+def procesar_modo_individual(automata, ruta_archivo):
+    """
+    Procesa el archivo en modo líneas individuales: cada línea es un pseudocódigo
+    """
+    return mostrar_bloques(reconocer_bloques(automata, ruta_archivo, por_linea=True))
+
+def procesar_modo_multilinea(automata, ruta_archivo):
+    """
+    Procesa el archivo en modo multi-línea donde un pseudocódigo
+    puede estar dividido en múltiples líneas (bloques separados por
+    líneas vacías o comentarios)
+    """
+    return mostrar_bloques(reconocer_bloques(automata, ruta_archivo))
+
+def mostrar_bloques(resultados):
+    """
+    Muestra cada resultado de reconocer_bloques a medida que llega
+    Devuelve {'aceptados', 'rechazados'}.
+    """
+    conteo = {'aceptados': 0, 'rechazados': 0}
+    for numero, resultado in enumerate(resultados, 1):
+        inicio, fin = resultado['linea_inicio'], resultado['linea_fin']
+        lineas = f"línea {inicio}" if inicio == fin else f"líneas {inicio}-{fin}"
+        print(f"\nPseudocódigo {numero} ({lineas}): '{resultado['vista_previa']}'")
+        print(f"Tokens procesados: {resultado['tokens']}")
+        rechazo = resultado['rechazo']
+        if rechazo is not None:
+            if rechazo['lexema'] is None:
+                print(f"Rechazo: terminó antes de completar el pseudocódigo (línea {rechazo['linea']})")
+            else:
+                print(f"Rechazo: token {rechazo['indice'] + 1} '{rechazo['lexema']}' (línea {rechazo['linea']})")
+        print(f"Resultado: {'ACEPTADA' if resultado['aceptada'] else 'RECHAZADA'}")
         print("-" * 30)
-    else:
-        # Procesar cada bloque por separado
-        for i, pseudocodigo in enumerate(bloques, 1):
-            print(f"\nPseudocódigo {i}: '{pseudocodigo}'")
-            resultado = automata.procesar_cadena(pseudocodigo)
-            print(f"Resultado: {'ACEPTADA' if resultado else 'RECHAZADA'}")
-            print("-" * 30)
+        conteo['aceptados' if resultado['aceptada'] else 'rechazados'] += 1
+    return conteo
 
 def mostrar_opciones():
     # Preguntar al usuario qué modo quiere usar
@@ -611,6 +3808,44 @@ def main():
     
     automata = AutomataReconocedor()
     
+    # --stats o --stats=json: tiempos por fase y contadores al terminar
+    formato_estadisticas = None
+    for argumento in list(sys.argv[1:]):
+        if argumento == '--stats' or argumento.startswith('--stats='):
+            formato_estadisticas = argumento.partition('=')[2] or 'texto'
+            sys.argv.remove(argumento)
+    if formato_estadisticas is not None:
+        if formato_estadisticas not in ('texto', 'json'):
+            print(f"Formato de --stats desconocido: {formato_estadisticas} (usar --stats o --stats=json)")
+            return
+        automata.estadisticas = Estadisticas()
+    
+    # --limite-caracteres=N y --limite-tokens=N (admiten K, M y G): tamaño máximo de cada entrada
+    for argumento in list(sys.argv[1:]):
+        nombre, igual, valor = argumento.partition('=')
+        if igual and nombre in ('--limite-caracteres', '--limite-tokens'):
+            setattr(automata, nombre[2:].replace('-', '_'), leer_cantidad(valor))
+            sys.argv.remove(argumento)
+    
+    # Validación de muchos archivos: solo líneas JSON en la salida
+    if len(sys.argv) > 1 and sys.argv[1] == '--validar':
+        ejecutar_validacion(sys.argv[2:], automata=automata)
+        return
+    
+    # Generación de programas: la salida es el corpus
+    if len(sys.argv) > 1 and sys.argv[1] == '--generar':
+        ejecutar_generacion(sys.argv[2:])
+        return
+    
+    # Servidor y cliente: sin encabezado ni tablas, la salida es del protocolo
+    if len(sys.argv) > 1 and sys.argv[1] in ('--servidor', '--cliente'):
+        direccion = sys.argv[2] if len(sys.argv) > 2 else DIRECCION_SERVIDOR
+        if sys.argv[1] == '--servidor':
+            ejecutar_servidor(automata, direccion)
+        else:
+            ejecutar_cliente(direccion)
+        return
+    
     print("RECONOCEDOR DE GRAMÁTICA")
     print("=" * 50)
     
@@ -620,25 +3855,41 @@ def main():
             print("Uso del programa:")
             print("  python reconocedor_gramatica.py                    # Modo interactivo")
             print("  python reconocedor_gramatica.py <archivo.txt>      # Procesar archivo")
+            print("  python reconocedor_gramatica.py <archivo.txt> --por-linea  # Cada línea es un pseudocódigo")
             print("  python reconocedor_gramatica.py --test             # Ejecutar pruebas automáticas")
+            print("  python reconocedor_gramatica.py --validar [--procesos N] <rutas, directorios o patrones>")
+            print("                                                      # Una línea JSON por bloque")
+            print("  python reconocedor_gramatica.py --generar [--programas N | --bytes 1G] [--tokens N]")
+            print("      [--estilos espaciado,multilinea,pascal] [--mutados 0.3] [--semilla S] [--etiquetas ruta]")
+            print("                                                      # Programas generados desde el autómata")
+            print("  python reconocedor_gramatica.py --servidor [dir]   # Servidor JSON por líneas (host:puerto o unix:ruta)")
+            print("  python reconocedor_gramatica.py --cliente [dir]    # Enviar las líneas de stdin al servidor")
             print("  python reconocedor_gramatica.py --help             # Mostrar esta ayuda")
+            print("  Agregar --stats (o --stats=json) muestra tiempos por fase y contadores al terminar")
+            print("  Agregar --limite-caracteres=N o --limite-tokens=N (admiten K, M y G) rechaza las")
+            print("    entradas (o bloques de un archivo) más grandes sin terminar de procesarlas")
             print("\nFormato del archivo .txt:")
-            print("  - Una cadena por línea")
-            print("  - Las líneas que comienzan con # son comentarios y se ignoran")
-            print("  - Las líneas vacías se ignoran")
+            print("  - Un pseudocódigo puede ocupar varias líneas; los pseudocódigos se separan")
+            print("    con líneas vacías o comentarios (líneas que comienzan con #)")
+            print("  - Una línea con espacios se separa en palabras; una sin espacios se lee como")
+            print("    PascalCase concatenado ('leer<x>;'). Un fin de línea termina la palabra,")
+            print("    salvo dentro de un elemento <...>, que puede seguir en la línea siguiente")
             return
         elif sys.argv[1] == '--test':
             # Mostrar información del autómata y ejecutar pruebas
             automata.mostrar_automata()
             print("\n" + "=" * 50)
             ejecutar_pruebas_automaticas(automata)
+            mostrar_estadisticas(automata, formato_estadisticas)
             return
         else:
             # Procesar archivo
             ruta_archivo = sys.argv[1]
+            modo = 'individual' if '--por-linea' in sys.argv[2:] else 'multilinea'
             automata.mostrar_automata()
             print("\n" + "=" * 50)
-            procesar_archivo(automata, ruta_archivo)
+            procesar_archivo(automata, ruta_archivo, modo)
+            mostrar_estadisticas(automata, formato_estadisticas)
             return
     
     # Modo por defecto: mostrar información y modo interactivo
@@ -674,85 +3925,38 @@ def main():
         except KeyboardInterrupt:
             print("\n\n¡Hasta luego!")
             break
+    
+    mostrar_estadisticas(automata, formato_estadisticas)
+
+def mostrar_estadisticas(automata, formato):
+    """
+    Imprime las estadísticas del autómata (si están activadas) como texto o como una línea JSON
+    """
+    if automata.estadisticas is None:
+        return
+    if formato == 'json':
+        print(json.dumps(automata.estadisticas.como_dict(), ensure_ascii=False))
+    else:
+        print("\n" + automata.estadisticas.resumen())
 
 def ejecutar_pruebas_automaticas(automata):
     """
     Ejecuta las pruebas automáticas predefinidas
     """
-    # Ejemplos de prueba
-    ejemplos = [
-        "comienza termina",
-        "comienza leer <x> termina",
-        "comienza leer <variable1> leer <y> termina",
-        "comienza leer <a> leer <b> leer <c> termina",
-        "comienza escribir <mensaje>; termina",  # Nuevo: usando escribir con punto y coma
-        "comienza escribir <resultado>; termina",  # Nuevo: escribir expresión con punto y coma
-        "comienza leer <x> escribir <x>; termina",  # Nuevo: combinando leer y escribir
-        "comienza escribir <saludo>; leer <nombre> escribir <despedida>; termina",  # Nuevo: múltiples operaciones
-        "comienza <x>=<5>; termina",  # Nuevo: asignación simple con punto y coma
-        "comienza <resultado>=<suma>; termina",  # Nuevo: asignación con nombres largos
-        "comienza leer <a> <b>=<a>; termina",  # Nuevo: combinando leer y asignación
-        "comienza <x>=<10>; escribir <x>; termina",  # Nuevo: asignación y escritura
-        "comienza <a>=<1>; <b>=<2>; <c>=<suma>; termina",  # Nuevo: múltiples asignaciones
-        "comienza si <condicion1> entonces <accion1> finsi termina",  # Nuevo: condicional simple
-        "comienza si <x> entonces <y>=<10> finsi termina",  # Nuevo: condicional con asignación
-        "comienza si <edad> entonces escribir <mensaje> finsi termina",  # Nuevo: condicional con escritura
-        "comienza si <test> entonces <inst1> <inst2> finsi termina",  # Nuevo: múltiples instrucciones
-        "comienza leer <x> si <x> entonces escribir <x> finsi termina",  # Nuevo: combinando todo
-        "comienza si <condicion> entonces <accion1> sino <accion2> finsi termina",  # Nuevo: condicional doble
-        "comienza si <x> entonces <inst1> sino <inst2> finsi termina",  # Nuevo: if-else simple
-        "comienza si <edad> entonces <msg1> <msg2> sino <msg3> finsi termina",  # Nuevo: múltiples instrucciones en ambas ramas
-        "comienza leer <x> si <x> entonces <y> sino <z> finsi termina",  # Nuevo: combinando leer con if-else
-        "comienza mientras <condicion1> hacer <accion1> finmientras termina",  # Nuevo: bucle while simple
-        "comienza mientras <x> hacer <inst1> <inst2> finmientras termina",  # Nuevo: múltiples instrucciones en while
-        "comienza leer <x> mientras <x> hacer <y>=<10> finmientras termina",  # Nuevo: combinando leer con while
-        "comienza mientras <contador> hacer <incremento> finmientras escribir <resultado> termina",  # Nuevo: while con escritura
-        "comienza repetir <accion1> hastaque <condicion1> termina",  # Nuevo: do-while simple
-        "comienza repetir <inst1> <inst2> hastaque <test> termina",  # Nuevo: múltiples instrucciones en do-while
-        "comienza leer <x> repetir <proceso> hastaque <fin> termina",  # Nuevo: combinando leer con do-while
-        "comienza repetir <calculo> hastaque <limite> escribir <resultado> termina",  # Nuevo: do-while con escritura
-        "comienza si <condicion> entonces mientras <cond2> hacer <inst> finmientras finsi termina",  # Nuevo: while dentro de if
-        "comienza mientras <condicion> hacer si <cond2> entonces <inst> finsi finmientras termina",  # Nuevo: if dentro de while
-        "comienza mientras <condicion> hacer si <cond2> entonces <inst1> sino <inst2> finsi finmientras termina",  # Nuevo: if-else dentro de while
-        # Ejemplos con PascalCase sin espacios
-        "ComenzaLeer<x>Termina",  # Nuevo: PascalCase sin espacios
-        "ComenzaEscribir<mensaje>;Termina",  # Nuevo: PascalCase escribir con punto y coma
-        "Comienza<x>=<5>;Termina",  # Nuevo: PascalCase asignación con punto y coma
-        "ComenzaSi<condicion>Entonces<accion>FinSiTermina",  # Nuevo: PascalCase condicional
-        "ComenzaMientras<contador>Hacer<incremento>FinMientrasTermina",  # Nuevo: PascalCase while
-        "ComenzaRepetir<calculo>Hasta<limite>Termina",  # Nuevo: PascalCase do-while
-        "leer <x> termina",  # Inválido: no comienza con "comienza"
-        "comienza leer termina",  # Inválido: falta variable después de leer
-        "comienza escribir termina",  # Inválido: falta expresión después de escribir
-        "comienza escribir <mensaje> termina",  # Inválido: falta punto y coma después de expresión
-        "comienza <x>=<5> termina",  # Inválido: falta punto y coma después de asignación
-        "comienza <x>= termina",  # Inválido: asignación incompleta
-        "comienza =<5> termina",  # Inválido: falta variable en asignación
-        "comienza si <cond> entonces finsi termina",  # Inválido: falta instrucción
-        "comienza si entonces <inst> finsi termina",  # Inválido: falta condición
-        "comienza si <cond> <inst> finsi termina",  # Inválido: falta 'entonces'
-        "comienza si <cond> entonces <inst> termina",  # Inválido: falta 'finsi'
-        "comienza si <cond> entonces <inst1> sino termina",  # Inválido: falta instrucción después de sino
-        "comienza si <cond> entonces sino <inst> finsi termina",  # Inválido: falta instrucción antes de sino
-        "comienza si <cond> sino <inst> finsi termina",  # Inválido: falta 'entonces'
-        "comienza mientras <cond> <inst> finmientras termina",  # Inválido: falta 'hacer'
-        "comienza mientras hacer <inst> finmientras termina",  # Inválido: falta condición
-        "comienza mientras <cond> hacer finmientras termina",  # Inválido: falta instrucción
-        "comienza mientras <cond> hacer <inst> termina",  # Inválido: falta 'finmientras'
-        "comienza repetir hastaque <cond> termina",  # Inválido: falta instrucción
-        "comienza repetir <inst> <cond> termina",  # Inválido: falta 'hastaque'
-        "comienza repetir <inst> hastaque termina",  # Inválido: falta condición
-        "comienza leer <x>",  # Inválido: no termina con "termina" 
-        "comienza termina leer <x>",  # Inválido: orden incorrecto
-    ]
-    
     print("\nPRUEBAS AUTOMÁTICAS:")
     print("-" * 30)
-    for i, ejemplo in enumerate(ejemplos, 1):
+    for i, ejemplo in enumerate(EJEMPLOS_PRUEBA, 1):
         print(f"\nPrueba {i}: '{ejemplo}'")
         resultado = automata.procesar_cadena(ejemplo)
         print(f"Resultado: {'ACEPTADA' if resultado else 'RECHAZADA'}")
         print("-" * 30)
+    
+    diferencias = diferencias_gramatica_jff()
+    if diferencias:
+        print(f"\n{os.path.basename(RUTA_JFF_GRAMATICA)} NO coincide con las tablas del "
+              f"autómata ({', '.join(diferencias)}): volver a generarlo con exportar_jff")
+    else:
+        print(f"\n{os.path.basename(RUTA_JFF_GRAMATICA)} coincide con las tablas del autómata")
 
 def modo_interactivo(automata):
     """
@@ -0,0 +1,128 @@
+import io
+import os
+import tempfile
+import time
+import unittest
+
+import reconocedor_gramatica_pseudocodigo_FTI_2025 as reconocedor
+
+
+# Entradas hostiles según el largo en caracteres (las mismas que benchmark_adversario)
+ADVERSARIOS = {
+    "'<' sin cerrar": lambda largo: '<' * largo,
+    "'<a' sin cerrar": lambda largo: '<a' * (largo // 2),
+    'sin delimitador': lambda largo: 'a' * largo,
+    "'a=' sin cerrar": lambda largo: 'a=' * (largo // 2) + '<',
+    "'<a>=<' sin cerrar": lambda largo: '<a>=<' * (largo // 5),
+    'casi reservadas': lambda largo: 'FinMientra' * (largo // 10),
+    'elemento abierto': lambda largo: 'ComienzaEscribir<' + ('a' * 15 + ';') * (largo // 16),
+    'segmento abierto': lambda largo: 'ComienzaLeer' + 'a' * largo,
+    'palabra gigante': lambda largo: 'comienza ' + 'a' * largo + ' termina',
+    'elemento gigante': lambda largo: 'comienza escribir <' + 'a' * largo + ' termina',
+    'ambiguo': lambda largo: 'SiSinoHastaHastaQue' * (largo // 19),
+}
+
+# Largos medidos: con la entrada x8 el tiempo tiene que crecer menos de x24 (lineal es x8,
+# cuadrático x64)
+LARGO_CORTO = 10_000
+ESCALA = 8
+CRECIMIENTO_MAXIMO = 24
+
+
+def mejor_tiempo(funcion, argumento, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(argumento)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+class PruebasAdversarios(unittest.TestCase):
+    """
+    Cada camino de tokenización y reconocimiento escala linealmente con entradas hostiles
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.automata = reconocedor.AutomataReconocedor()
+        cls.automata.compilar()
+        cls.directorio = tempfile.TemporaryDirectory()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.directorio.cleanup()
+    
+    def caminos(self):
+        automata = self.automata
+        generado = automata.reconocedor_generado(directorio_cache=None)
+        ruta = os.path.join(self.directorio.name, 'adversario.txt')
+        
+        def flujo(cadena):
+            modo = 'espacios' if ' ' in cadena else 'sin_espacios'
+            return automata.reconocer_flujo(io.StringIO(cadena), 16, modo)
+        
+        def documento(cadena):
+            return reconocedor.DocumentoIncremental(automata, cadena).aceptada()
+        
+        def bloques(cadena):
+            with open(ruta, 'w', encoding='utf-8') as archivo:
+                archivo.write(cadena)
+            return list(reconocedor.reconocer_bloques(automata, ruta))
+        
+        # DocumentoIncremental mira hasta LARGO_MAXIMO_ALCANCE caracteres por token
+        return [('analizar_palabras', automata.analizar_palabras, 1),
+                ('reconocer', automata.reconocer, 1),
+                ('reconocer_con_posicion', automata.reconocer_con_posicion, 1),
+                ('generado', generado, 1),
+                ('flujo', flujo, 1),
+                ('bloques', bloques, 1),
+                ('documento', documento, 10)]
+    
+    def test_escalado_lineal(self):
+        for camino, funcion, reduccion in self.caminos():
+            for nombre, generador in ADVERSARIOS.items():
+                with self.subTest(camino=camino, entrada=nombre):
+                    corta = generador(LARGO_CORTO // reduccion)
+                    larga = generador(LARGO_CORTO * ESCALA // reduccion)
+                    tiempo_corto = mejor_tiempo(funcion, corta, 3)
+                    tiempo_largo = mejor_tiempo(funcion, larga, 2)
+                    self.assertLess(tiempo_largo, CRECIMIENTO_MAXIMO * tiempo_corto + 0.01,
+                                    f"{camino} con {nombre!r}: {tiempo_corto:.4f} s -> {tiempo_largo:.4f} s")
+    
+    def test_limites_fallan_rapido(self):
+        limitado = reconocedor.AutomataReconocedor()
+        limitado.limite_caracteres = 1 << 20
+        limitado.limite_tokens = 10_000
+        sin_limite = reconocedor.AutomataReconocedor()
+        for nombre, cadena, limite in (('caracteres', 'a' * (16 << 20), 'caracteres'),
+                                       ('tokens sin espacios', 'a' * (1 << 20), 'tokens'),
+                                       ('tokens espaciados', 'a ' * (1 << 19), 'tokens'),
+                                       ('tokens con ;', 'a; ' * 300_000, 'tokens')):
+            with self.subTest(entrada=nombre):
+                inicio = time.perf_counter()
+                with self.assertRaises(reconocedor.LimiteExcedido) as contexto:
+                    limitado.reconocer(cadena)
+                fallo = time.perf_counter() - inicio
+                self.assertEqual(contexto.exception.limite, limite)
+                # Falla sin procesar toda la entrada
+                if len(cadena) <= limitado.limite_caracteres:
+                    self.assertLess(fallo, mejor_tiempo(sin_limite.reconocer, cadena, 1) / 2)
+                else:
+                    self.assertLess(fallo, 0.01)
+    
+    def test_limites_en_cada_camino(self):
+        limitado = reconocedor.AutomataReconocedor()
+        limitado.limite_tokens = 100
+        cadena = 'Comienza ' + 'leer <x>; ' * 100 + 'Termina'
+        with self.assertRaises(reconocedor.LimiteExcedido):
+            limitado.reconocer(cadena)
+        with self.assertRaises(reconocedor.LimiteExcedido):
+            limitado.reconocer_con_posicion(cadena)
+        with self.assertRaises(reconocedor.LimiteExcedido):
+            limitado.reconocedor_generado(directorio_cache=None)(cadena)
+        with self.assertRaises(reconocedor.LimiteExcedido):
+            limitado.reconocer(cadena.replace(' ', ''))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import random
+import time
+import tracemalloc
+import unittest
+
+import reconocedor_gramatica_pseudocodigo_FTI_2025 as reconocedor
+
+
+def dividir_enumerando(palabras_validas, texto):
+    """
+    La versión anterior de dividir_pascal_case: enumera todas las divisiones y se queda
+    con la de más palabras (la primera, probando las palabras más largas primero)
+    """
+    palabras = sorted((p for p in palabras_validas if p != ';'), key=len, reverse=True)
+    posibles = []
+    
+    def buscar_division(inicio, actuales):
+        if inicio == len(texto):
+            posibles.append(actuales[:])
+            return
+        for palabra in palabras:
+            if texto[inicio:inicio + len(palabra)].lower() == palabra:
+                actuales.append(texto[inicio:inicio + len(palabra)])
+                buscar_division(inicio + len(palabra), actuales)
+                actuales.pop()
+    
+    buscar_division(0, [])
+    return max(posibles, key=len) if posibles else []
+
+
+class PruebasDividirPascalCase(unittest.TestCase):
+    def setUp(self):
+        self.automata = reconocedor.AutomataReconocedor()
+    
+    def comparar(self, texto):
+        self.assertEqual(self.automata.dividir_pascal_case(texto),
+                         dividir_enumerando(self.automata.palabras_validas, texto), texto)
+    
+    def test_ambiguos_cortos(self):
+        for texto in ('SiSino', 'SinoSi', 'SiSiSinoSino', 'SINOsi', 'sinosino', 'Sin', 'SiNo',
+                      'HastaQue', 'Hasta', 'HastaQueHastaQue', 'HastaHastaQue', 'RepetirHastaQue',
+                      'SiEntoncesSinoFinSi', 'FinSiSino', 'Si=Si', '=', ''):
+            self.comparar(texto)
+    
+    def test_corridas_aleatorias(self):
+        azar = random.Random(3)
+        piezas = ['Si', 'Sino', 'SI', 'sino', 'Hasta', 'HastaQue', 'Que', 'FinSi', 'Fin', '=',
+                  'Entonces', 'Mientras', 'FinMientras', 'x', 'Termina']
+        for _ in range(500):
+            self.comparar(''.join(azar.choice(piezas) for _ in range(azar.randint(1, 7))))
+    
+    def test_corrida_larga_lineal(self):
+        # O(n·k): los pasos contados no pasan de (k + 1) por caracter
+        k = max(len(palabra) for palabra in self.automata.palabras_validas)
+        texto = 'SiSinoHastaQueFinSi' * 20000
+        self.automata.estadisticas = reconocedor.Estadisticas()
+        palabras = self.automata.dividir_pascal_case(texto)
+        self.assertEqual(len(palabras), 4 * 20000)
+        self.assertLessEqual(self.automata.estadisticas.pasos_segmentacion, (k + 1) * len(texto))
+    
+    def test_corrida_larga_memoria_y_tiempo(self):
+        # Una sola elección por posición: la memoria crece linealmente con la entrada
+        corto = 'SinoSi' * 5000
+        largo = corto * 8
+        self.automata.dividir_pascal_case('SinoSi')  # construir el trie antes de medir
+        
+        def tiempo(texto):
+            inicio = time.perf_counter()
+            self.automata.dividir_pascal_case(texto)
+            return time.perf_counter() - inicio
+        
+        def pico_memoria(texto):
+            tracemalloc.start()
+            try:
+                self.automata.dividir_pascal_case(texto)
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        
+        # 8 veces la entrada: lineal es 8 veces el tiempo (cuadrático sería 64)
+        self.assertLess(min(tiempo(largo) for _ in range(3)),
+                        20 * min(tiempo(corto) for _ in range(3)) + 0.05)
+        pico_largo = pico_memoria(largo)
+        self.assertLess(pico_largo, 200 * len(largo))
+        self.assertLess(pico_largo, 10 * pico_memoria(corto))
+    
+    def test_sin_division(self):
+        # Una corrida que no se puede dividir por el final: sin backtracking exponencial
+        self.assertEqual(self.automata.dividir_pascal_case('SinoSi' * 10000 + 'Sin'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+
+import reconocedor_gramatica_pseudocodigo_FTI_2025 as reconocedor
+
+
+class PruebasGramaticaJff(unittest.TestCase):
+    """
+    gramatica_tokens.jff y las tablas de AutomataReconocedor.__init__ describen la misma gramática
+    """
+    def test_jff_coincide_con_las_tablas(self):
+        diferencias = reconocedor.diferencias_gramatica_jff()
+        self.assertEqual(diferencias, [], "gramatica_tokens.jff no coincide con __init__: "
+                                          "volver a generarlo con exportar_jff")
+    
+    def test_misma_huella(self):
+        automata = reconocedor.AutomataReconocedor()
+        del_jff = reconocedor.AutomataReconocedor.desde_jff(reconocedor.RUTA_JFF_GRAMATICA,
+                                                            directorio_cache=None)
+        self.assertEqual(automata.huella_gramatica(), del_jff.huella_gramatica())
+    
+    def test_detecta_un_cambio(self):
+        automata = reconocedor.AutomataReconocedor()
+        automata.estados_finales = automata.estados_finales | {automata.estado_inicial}
+        self.assertEqual(reconocedor.diferencias_gramatica_jff(automata=automata),
+                         ['estados_finales'])
+    
+    def test_cache_de_desde_jff(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            for _ in range(2):  # la segunda vez se carga de la cache
+                automata = reconocedor.AutomataReconocedor.desde_jff(
+                    reconocedor.RUTA_JFF_GRAMATICA, directorio_cache=directorio)
+                self.assertEqual(automata.huella_gramatica(),
+                                 reconocedor.AutomataReconocedor().huella_gramatica())
+            self.assertEqual(len(os.listdir(directorio)), 1)
+    
+    def test_diseno_por_caracteres(self):
+        ruta = os.path.join(os.path.dirname(reconocedor.RUTA_JFF_GRAMATICA), 'tp_final.jff')
+        with self.assertRaisesRegex(ValueError, 'gramatica_tokens.jff'):
+            reconocedor.AutomataReconocedor.desde_jff(ruta, directorio_cache=None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import glob
+import os
+import random
+import tempfile
+import unittest
+
+import reconocedor_gramatica_pseudocodigo_FTI_2025 as reconocedor
+
+
+def corpus_ejemplos():
+    directorio = os.path.dirname(os.path.abspath(reconocedor.__file__))
+    programas = list(reconocedor.EJEMPLOS_PRUEBA)
+    for ruta in sorted(glob.glob(os.path.join(directorio, 'ejemplo*.txt'))):
+        with open(ruta, encoding='utf-8') as archivo:
+            programas.append(archivo.read())
+    return programas
+
+
+def sopa_de_tokens(azar, cantidad):
+    """
+    Entradas al azar con palabras reservadas en cualquier capitalización, elementos,
+    asignaciones, basura y separadores variados (con y sin espacios)
+    """
+    piezas = ['Comienza', 'Termina', 'leer', 'ESCRIBIR', 'si', 'Entonces', 'sino', 'FinSi',
+              'Mientras', 'hacer', 'FinMientras', 'Repetir', 'HastaQue', 'Hasta', ';', '=',
+              '<x>', '<condicion>', 'x=1', 'x=<y>', 'x', '<', '>', '<sin cerrar', 'ñandú',
+              '#', '12', '_', 'Sin', 'FinMientrasSi']
+    cadenas = []
+    for _ in range(cantidad):
+        separador = azar.choice([' ', '', '\n', '  ', '\t', ' ;'])
+        cadenas.append(separador.join(azar.choice(piezas) for _ in range(azar.randint(0, 12))))
+    return cadenas
+
+
+def variantes(azar, texto):
+    """
+    Variantes de un programa: capitalización, espacios en blanco, sin espacios y sin un token
+    """
+    palabras = texto.split()
+    casi = [palabra.upper() if azar.random() < 0.2 else palabra for palabra in palabras]
+    yield ' '.join(casi)
+    yield ''.join(azar.choice([' ', '  ', '\t', '\n', ' \r\n']) + palabra for palabra in casi)
+    yield ''.join(palabras)
+    if palabras:
+        del palabras[azar.randrange(len(palabras))]
+        yield ' '.join(palabras)
+
+
+class PruebasReconocedorGenerado(unittest.TestCase):
+    """
+    El reconocedor generado (generar_codigo + exec) da el mismo resultado que reconocer()
+    """
+    def setUp(self):
+        self.automata = reconocedor.AutomataReconocedor()
+        self.generado = self.automata.reconocedor_generado(directorio_cache=None)
+    
+    def comparar(self, cadenas, automata=None, generado=None):
+        automata = automata or self.automata
+        generado = generado or self.generado
+        for cadena in cadenas:
+            self.assertEqual(generado(cadena), automata.reconocer(cadena), repr(cadena[:200]))
+    
+    def test_corpus_generado(self):
+        generador = reconocedor.GeneradorProgramas(self.automata, semilla=6)
+        mutaciones = [None] + sorted(reconocedor.GeneradorProgramas.MUTACIONES)
+        azar = random.Random(6)
+        corpus = [generador.programa(azar.randint(1, 80), reconocedor.GeneradorProgramas.ESTILOS[numero % 3],
+                                     mutaciones[numero % len(mutaciones)])[0]
+                  for numero in range(3000)]
+        self.comparar(corpus)
+    
+    def test_ejemplos(self):
+        self.comparar(corpus_ejemplos())
+    
+    def test_sopa_de_tokens(self):
+        self.comparar(sopa_de_tokens(random.Random(22), 5000))
+    
+    def test_variantes_casi_validas(self):
+        generador = reconocedor.GeneradorProgramas(self.automata, semilla=9)
+        azar = random.Random(9)
+        corpus = []
+        for _ in range(1000):
+            texto, _ = generador.programa(azar.randint(1, 40), 'espaciado')
+            corpus.extend(variantes(azar, texto))
+        self.assertTrue(any(map(self.automata.reconocer, corpus)))
+        self.comparar(corpus)
+    
+    def test_limites(self):
+        self.automata.limite_tokens = 5
+        for cadena in ('Comienza leer <x>; escribir <y>; Termina', 'ComienzaLeer<x>;Escribir<y>;Termina'):
+            with self.assertRaises(reconocedor.LimiteExcedido):
+                self.automata.reconocer(cadena)
+            with self.assertRaises(reconocedor.LimiteExcedido):
+                self.generado(cadena)
+    
+    def test_cache_en_disco(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            primero = reconocedor.AutomataReconocedor().reconocedor_generado(directorio)
+            archivos = os.listdir(directorio)
+            self.assertEqual(archivos, [f"reconocedor_{self.automata.huella_generado()}.py"])
+            segundo = reconocedor.AutomataReconocedor().reconocedor_generado(directorio)  # desde la cache
+            for cadena in corpus_ejemplos():
+                self.assertEqual(primero(cadena), segundo(cadena))
+            self.assertEqual(os.listdir(directorio), archivos)
+    
+    def test_gramatica_modificada(self):
+        # Otra gramática: otra huella y el código generado sigue a las tablas
+        otro = reconocedor.AutomataReconocedor()
+        otro.estados_finales = otro.estados_finales | {'q1'}
+        otro.compilar()
+        self.assertNotEqual(otro.huella_generado(), self.automata.huella_generado())
+        generado = otro.reconocedor_generado(directorio_cache=None)
+        self.assertTrue(generado('Comienza'))
+        self.comparar(corpus_ejemplos() + sopa_de_tokens(random.Random(7), 1000), otro, generado)
+
+
+if __name__ == '__main__':
+    unittest.main()